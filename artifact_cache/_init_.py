@@ -0,0 +1,2 @@
+from .artifact_cache import ArtifactCache
+from .track_store import save_tracks, load_tracks, save_keypoints, load_keypoints, tracks_to_columns, columns_to_tracks
@@ -0,0 +1,193 @@
+import os
+import json
+import pickle
+import shutil
+import hashlib
+import sys
+sys.path.append('../')
+from artifact_cache.track_store import save_tracks, load_tracks, save_keypoints, load_keypoints
+
+
+def _save_pickle(path, value):
+    # Write to a temporary file first so an interrupted run never leaves a broken artifact
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(value, f)
+    os.replace(tmp_path, path)
+
+
+def _load_pickle(path, start=0, stop=None):
+    with open(path, 'rb') as f:
+        value = pickle.load(f)
+    if start or stop is not None:
+        value = value[start:stop]
+    return value
+
+
+# Storage formats by name: (file suffix, save function, load function)
+CODECS = {
+    "pickle": (".pkl", _save_pickle, _load_pickle),
+    "tracks": (".tracks", save_tracks, load_tracks),
+    "keypoints": (".keypoints", save_keypoints, load_keypoints),
+}
+
+
+class ArtifactCache:
+    """
+    Content-addressed cache for the outputs of the pipeline stages.
+
+    Every artifact is stored under a key that hashes the stage name, the stage version,
+    the stage parameters and the keys of everything the stage reads (file digests of the
+    input video and model weights, or the keys of upstream stages). Because downstream
+    keys contain upstream keys, changing a threshold only invalidates that stage and the
+    stages after it, while a different video or new weights never reuse stale results.
+
+    Artifacts are stored as cache_dir/<stage>/<key><suffix>, where the suffix depends on
+    the codec: pickled objects by default, or the columnar stores of track_store for
+    tracks ("tracks") and court keypoints ("keypoints"), which can be read per frame range.
+
+    Attributes:
+        cache_dir (str): Root directory of the cache.
+        version (int): Global cache format version, part of every key.
+    """
+    version = 1
+
+    def __init__(self, cache_dir="stubs/cache"):
+        self.cache_dir = cache_dir
+        self.digest_index_path = os.path.join(cache_dir, "file_digests.json")
+        self.digest_index = {}
+        if os.path.exists(self.digest_index_path):
+            with open(self.digest_index_path, 'r', encoding="utf-8") as f:
+                self.digest_index = json.load(f)
+
+    def file_digest(self, path):
+        """
+        SHA-256 of a file's content.
+
+        Digests are remembered by path, size and modification time, so large videos are
+        only hashed again when they change.
+
+        Args:
+            path (str): Path to the file.
+
+        Returns:
+            str: Hex digest of the file content.
+        """
+        abs_path = os.path.abspath(path)
+        stat = os.stat(abs_path)
+        entry = self.digest_index.get(abs_path)
+        if entry and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+            return entry["digest"]
+
+        sha = hashlib.sha256()
+        with open(abs_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                sha.update(chunk)
+        digest = sha.hexdigest()
+
+        self.digest_index[abs_path] = {"size": stat.st_size, "mtime": stat.st_mtime, "digest": digest}
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(self.digest_index_path, 'w', encoding="utf-8") as f:
+            json.dump(self.digest_index, f, indent=2)
+        return digest
+
+    def stage_key(self, stage, inputs, params=None, stage_version=1):
+        """
+        Compute the key of a stage's artifact.
+
+        Args:
+            stage (str): Name of the stage, e.g. "player_tracks".
+            inputs (list of str): File digests and upstream stage keys the stage depends on.
+            params (dict, optional): JSON serialisable parameters that change the output.
+            stage_version (int): Bump when the stage's code changes its output.
+
+        Returns:
+            str: Hex digest identifying the artifact.
+        """
+        description = {
+            "cache_version": self.version,
+            "stage": stage,
+            "stage_version": stage_version,
+            "inputs": list(inputs),
+            "params": params or {},
+        }
+        encoded = json.dumps(description, sort_keys=True, default=str).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    def artifact_path(self, stage, key, codec="pickle"):
+        return os.path.join(self.cache_dir, stage, key + CODECS[codec][0])
+
+    def load(self, stage, key, codec="pickle", start=0, stop=None):
+        """
+        Load an artifact, or the frames start:stop of it.
+
+        Args:
+            stage (str): Name of the stage.
+            key (str): Key from stage_key.
+            codec (str): Storage format the artifact was saved with, a key of CODECS.
+            start (int): First frame to load.
+            stop (int, optional): Frame after the last one to load. None means the end.
+
+        Returns:
+            The cached object, or None if it is not cached.
+        """
+        path = self.artifact_path(stage, key, codec)
+        if not os.path.exists(path):
+            return None
+        return CODECS[codec][2](path, start, stop)
+
+    def save(self, stage, key, value, codec="pickle"):
+        """
+        Store an artifact.
+
+        Args:
+            stage (str): Name of the stage.
+            key (str): Key from stage_key.
+            value: The object to store.
+            codec (str): Storage format, a key of CODECS.
+        """
+        path = self.artifact_path(stage, key, codec)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        CODECS[codec][1](path, value)
+
+    def cached(self, stage, inputs, compute, params=None, stage_version=1, codec="pickle"):
+        """
+        Return a stage's artifact from the cache, computing and storing it if missing.
+
+        Args:
+            stage (str): Name of the stage.
+            inputs (list of str): File digests and upstream stage keys the stage depends on.
+            compute (callable): Function without arguments that produces the artifact.
+            params (dict, optional): JSON serialisable parameters that change the output.
+            stage_version (int): Bump when the stage's code changes its output.
+            codec (str): Storage format, a key of CODECS.
+
+        Returns:
+            tuple: (value, key). Pass key as an input of downstream stages.
+        """
+        key = self.stage_key(stage, inputs, params, stage_version)
+        value = self.load(stage, key, codec)
+        if value is None:
+            value = compute()
+            self.save(stage, key, value, codec)
+        return value, key
+
+    def invalidate(self, stage):
+        """
+        Remove every cached artifact of a stage.
+
+        Downstream stages are recomputed automatically, since their keys would change
+        once the stage is recomputed with different results.
+
+        Args:
+            stage (str): Name of the stage.
+        """
+        stage_dir = os.path.join(self.cache_dir, stage)
+        if not os.path.isdir(stage_dir):
+            return
+        for file_name in os.listdir(stage_dir):
+            path = os.path.join(stage_dir, file_name)
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            else:
+                os.remove(path)
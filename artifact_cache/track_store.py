@@ -0,0 +1,190 @@
+"""
+Columnar on-disk format for tracks and court keypoints.
+
+A store is a directory with one .npy file per column, so every column can be opened
+with np.load(mmap_mode='r') and only the rows of the requested frames are read.
+
+Tracks (player or ball) are stored as:
+    frame_offsets.npy  int64   (F + 1,)  rows of frame f are frame_offsets[f]:frame_offsets[f+1]
+    track_id.npy       int64   (N,)
+    bbox.npy           float32 (N, 4)    x1, y1, x2, y2
+    conf.npy           float32 (N,)      NaN when the track has no confidence
+
+Court keypoints are stored as:
+    frame_offsets.npy  int64   (F + 1,)  detected court instances per frame
+    keypoints.npy      float32 (N, K, D) Ultralytics keypoint data (x, y[, conf])
+    orig_shape.npy     int64   (2,)      frame height and width
+"""
+
+import os
+import shutil
+import numpy as np
+
+
+def _write_columns(path, columns):
+    # Write into a temporary directory first so an interrupted run never leaves a broken store
+    tmp_path = path + ".tmp"
+    if os.path.exists(tmp_path):
+        shutil.rmtree(tmp_path)
+    os.makedirs(tmp_path)
+    for name, values in columns.items():
+        np.save(os.path.join(tmp_path, f"{name}.npy"), values)
+    if os.path.exists(path):
+        shutil.rmtree(path)
+    os.replace(tmp_path, path)
+
+
+def _read_column(path, name):
+    return np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r')
+
+
+def _frame_rows(frame_offsets, start, stop):
+    num_frames = len(frame_offsets) - 1
+    stop = num_frames if stop is None else min(stop, num_frames)
+    start = min(start, stop)
+    return start, stop, int(frame_offsets[start]), int(frame_offsets[stop])
+
+
+def tracks_to_columns(tracks):
+    """
+    Convert tracks to columns.
+
+    Args:
+        tracks (list): One dictionary per frame mapping track IDs to {"bbox": [...]},
+            optionally with a "conf" entry.
+
+    Returns:
+        dict: Column name to numpy array, as described in the module docstring.
+    """
+    frame_offsets = np.zeros(len(tracks) + 1, dtype=np.int64)
+    track_ids = []
+    bboxes = []
+    confs = []
+    for frame_num, frame_tracks in enumerate(tracks):
+        frame_offsets[frame_num + 1] = frame_offsets[frame_num] + len(frame_tracks)
+        for track_id, track in frame_tracks.items():
+            track_ids.append(track_id)
+            bboxes.append(track["bbox"])
+            confs.append(track.get("conf", np.nan))
+
+    return {
+        "frame_offsets": frame_offsets,
+        "track_id": np.asarray(track_ids, dtype=np.int64),
+        "bbox": np.asarray(bboxes, dtype=np.float32).reshape(-1, 4),
+        "conf": np.asarray(confs, dtype=np.float32),
+    }
+
+
+def columns_to_tracks(columns, start=0, stop=None):
+    """
+    Convert columns back to tracks.
+
+    Args:
+        columns (dict): Columns as returned by tracks_to_columns or read from a store.
+        start (int): First frame to convert.
+        stop (int, optional): Frame after the last one to convert. None means the end.
+
+    Returns:
+        list: One dictionary per frame mapping track IDs to {"bbox": [...]}, plus "conf"
+            when it was stored.
+    """
+    frame_offsets = np.asarray(columns["frame_offsets"])
+    start, stop, first_row, last_row = _frame_rows(frame_offsets, start, stop)
+
+    # Read the rows of the range once, then split them per frame
+    track_ids = np.asarray(columns["track_id"][first_row:last_row]).tolist()
+    bboxes = np.asarray(columns["bbox"][first_row:last_row]).tolist()
+    confs = np.asarray(columns["conf"][first_row:last_row])
+    has_conf = ~np.isnan(confs)
+    confs = confs.tolist()
+
+    tracks = []
+    for frame_num in range(start, stop):
+        frame_tracks = {}
+        for row in range(int(frame_offsets[frame_num]) - first_row, int(frame_offsets[frame_num + 1]) - first_row):
+            track = {"bbox": bboxes[row]}
+            if has_conf[row]:
+                track["conf"] = confs[row]
+            frame_tracks[track_ids[row]] = track
+        tracks.append(frame_tracks)
+    return tracks
+
+
+def save_tracks(path, tracks):
+    """
+    Write tracks to a columnar store.
+
+    Args:
+        path (str): Directory of the store.
+        tracks (list): One dictionary per frame mapping track IDs to {"bbox": [...]}.
+    """
+    _write_columns(path, tracks_to_columns(tracks))
+
+
+def load_tracks(path, start=0, stop=None):
+    """
+    Read the tracks of a frame range from a columnar store.
+
+    Args:
+        path (str): Directory of the store.
+        start (int): First frame to read.
+        stop (int, optional): Frame after the last one to read. None means the end.
+
+    Returns:
+        list: One dictionary per frame mapping track IDs to {"bbox": [...]}.
+    """
+    columns = {name: _read_column(path, name) for name in ("frame_offsets", "track_id", "bbox", "conf")}
+    return columns_to_tracks(columns, start, stop)
+
+
+def save_keypoints(path, court_keypoints):
+    """
+    Write court keypoints to a columnar store.
+
+    Args:
+        path (str): Directory of the store.
+        court_keypoints (list): Ultralytics Keypoints objects, one per frame.
+    """
+    frame_offsets = np.zeros(len(court_keypoints) + 1, dtype=np.int64)
+    data = []
+    orig_shape = (0, 0)
+    for frame_num, keypoints in enumerate(court_keypoints):
+        frame_data = keypoints.data.cpu().numpy()
+        frame_offsets[frame_num + 1] = frame_offsets[frame_num] + len(frame_data)
+        data.append(frame_data)
+        orig_shape = keypoints.orig_shape
+
+    _write_columns(path, {
+        "frame_offsets": frame_offsets,
+        "keypoints": np.concatenate(data).astype(np.float32) if data else np.zeros((0, 0, 3), dtype=np.float32),
+        "orig_shape": np.asarray(orig_shape, dtype=np.int64),
+    })
+
+
+def load_keypoints(path, start=0, stop=None):
+    """
+    Read the court keypoints of a frame range from a columnar store.
+
+    Args:
+        path (str): Directory of the store.
+        start (int): First frame to read.
+        stop (int, optional): Frame after the last one to read. None means the end.
+
+    Returns:
+        list: Ultralytics Keypoints objects, one per frame.
+    """
+    import torch
+    from ultralytics.engine.results import Keypoints
+
+    frame_offsets = np.asarray(_read_column(path, "frame_offsets"))
+    keypoints = _read_column(path, "keypoints")
+    orig_shape = tuple(int(size) for size in _read_column(path, "orig_shape"))
+
+    start, stop, first_row, last_row = _frame_rows(frame_offsets, start, stop)
+    data = torch.from_numpy(np.array(keypoints[first_row:last_row]))
+
+    court_keypoints = []
+    for frame_num in range(start, stop):
+        rows = slice(int(frame_offsets[frame_num]) - first_row, int(frame_offsets[frame_num + 1]) - first_row)
+        court_keypoints.append(Keypoints(data[rows].clone(), orig_shape))
+    return court_keypoints
@@ -1,6 +1,8 @@
 import sys 
+import numpy as np
 sys.path.append('../')
 from utils.bbox_utils import measure_distance, get_center_of_bbox
+from trackers.track_table import TrackTable
 
 class BallAquisitionDetector:
     """
@@ -185,50 +187,187 @@ class BallAquisitionDetector:
             or -1 if no one is determined to have possession in that frame.
         """
         num_frames = len(ball_tracks)
-        possession_list = [-1] * num_frames
-        consecutive_possession_count = {}
+        player_table = TrackTable.from_tracks(player_tracks[:num_frames])
+        ball_table = TrackTable.from_tracks(ball_tracks)
+        return self.detect_possession_in_table(player_table, ball_table).tolist()
+
+    def detect_possession_in_table(self, player_table, ball_table, possession_state=None):
+        """
+        Vectorized detect_ball_possession over track tables.
+
+        Args:
+            player_table (TrackTable): Player tracks.
+            ball_table (TrackTable): Ball tracks, the ball having track ID 1.
+            possession_state (dict, optional): The running candidate and its count of
+                consecutive frames, carried across chunks of a video. Updated in place.
+
+        Returns:
+            numpy.ndarray: The player_id who has possession in every frame, or -1.
+        """
+        num_frames = ball_table.num_frames
+        ball_bboxes = np.full((num_frames, 4), np.nan)
+        ball_frames, ball_slots = np.nonzero(ball_table.track_ids == 1)
+        ball_bboxes[ball_frames] = ball_table.bboxes[ball_frames, ball_slots]
+
+        candidates = self.find_candidates_in_table(player_table, ball_bboxes)
+        return self.confirm_possession(candidates, possession_state)
+
+    def find_candidates_in_table(self, player_table, ball_bboxes):
+        """
+        Vectorized find_best_candidate_for_possession for every frame at once.
+
+        Args:
+            player_table (TrackTable): Player tracks, with at least as many frames as ball_bboxes.
+            ball_bboxes (numpy.ndarray): Ball boxes of shape (F, 4), NaN in frames without a ball.
+
+        Returns:
+            numpy.ndarray: The best candidate player_id of every frame, or -1.
+        """
+        num_frames = len(ball_bboxes)
+        track_ids = player_table.track_ids[:num_frames]
+        if track_ids.shape[1] == 0:
+            return np.full(num_frames, -1, dtype=np.int64)
+
+        has_ball = ~np.isnan(ball_bboxes).any(axis=1)
+        bx1, by1, bx2, by2 = (ball_bboxes[:, i:i+1] for i in range(4))
+        px1, py1, px2, py2 = (player_table.bboxes[:num_frames, :, i] for i in range(4))
+
+        # Ball center truncated to integers like get_center_of_bbox
+        ball_x = np.broadcast_to(np.trunc((bx1 + bx2) / 2), px1.shape)
+        ball_y = np.broadcast_to(np.trunc((by1 + by2) / 2), px1.shape)
+
+        # Containment ratio of the ball in every player box
+        intersection_x1 = np.maximum(px1, bx1)
+        intersection_y1 = np.maximum(py1, by1)
+        intersection_x2 = np.minimum(px2, bx2)
+        intersection_y2 = np.minimum(py2, by2)
+        disjoint = (intersection_x2 < intersection_x1) | (intersection_y2 < intersection_y1)
+        intersection_area = np.where(disjoint, 0.0, (intersection_x2 - intersection_x1) * (intersection_y2 - intersection_y1))
+        ball_area = (bx2 - bx1) * (by2 - by1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            containment = np.where(ball_area > 0, intersection_area / ball_area, 0.0)
+
+        # Distance to the same key points as get_key_basketball_player_assignment_points
+        half_width = np.floor((px2 - px1) / 2)
+        half_height = np.floor((py2 - py1) / 2)
+        third_height = np.floor((py2 - py1) / 3)
+        key_x = np.stack([
+            px1, px2, ball_x, ball_x,
+            px1 + half_width, px2, px1, px2, px1, px1 + half_width, px2, px1, px1 + half_width, px1 + half_width
+        ], axis=-1)
+        key_y = np.stack([
+            ball_y, ball_y, py1, py2,
+            py1, py1, py1, py1 + half_height, py1 + half_height, py1 + half_height, py2, py2, py2, py1 + third_height
+        ], axis=-1)
+        distances = np.hypot(key_x - ball_x[..., None], key_y - ball_y[..., None])
+
+        # The first four key points only exist when the ball is level with the box
+        inside_y = (ball_y > py1) & (ball_y < py2)
+        inside_x = (ball_x > px1) & (ball_x < px2)
+        distances[..., 0:2] = np.where(inside_y[..., None], distances[..., 0:2], np.inf)
+        distances[..., 2:4] = np.where(inside_x[..., None], distances[..., 2:4], np.inf)
+        min_distance = distances.min(axis=-1)
+
+        valid = (track_ids >= 0) & has_ball[:, None]
+        high_containment = valid & (containment > self.containment_threshold)
+        regular = valid & ~high_containment
+
+        # Highest distance among high containment players, else the closest regular player
+        frames = np.arange(num_frames)
+        best_high = np.where(high_containment, min_distance, -np.inf).argmax(axis=1)
+        regular_distance = np.where(regular, min_distance, np.inf)
+        best_regular = regular_distance.argmin(axis=1)
+
+        has_high = high_containment.any(axis=1)
+        best_slot = np.where(has_high, best_high, best_regular)
+        has_candidate = has_high | (regular_distance[frames, best_regular] < self.possession_threshold)
+        return np.where(has_candidate, track_ids[frames, best_slot], -1)
+
+    def confirm_possession(self, candidates, possession_state=None):
+        """
+        Keep only candidates that were the best candidate for at least min_frames
+        consecutive frames.
+
+        Args:
+            candidates (numpy.ndarray): The best candidate of every frame, or -1.
+            possession_state (dict, optional): {"candidate": player_id, "count": frames} of
+                the run at the end of the previous chunk. Updated in place.
+
+        Returns:
+            numpy.ndarray: The player_id with confirmed possession in every frame, or -1.
+        """
+        if possession_state is None:
+            possession_state = {"candidate": -1, "count": 0}
+        candidates = np.asarray(candidates, dtype=np.int64)
+        if len(candidates) == 0:
+            return candidates
+
+        # A run of the same candidate is broken by another candidate or by a frame without one
+        previous = np.concatenate([[possession_state["candidate"]], candidates[:-1]])
+        run_start = (candidates != previous) | (candidates == -1)
+        frames = np.arange(len(candidates))
+        start_frame = np.maximum.accumulate(np.where(run_start, frames, -1))
+        run_length = np.where(start_frame >= 0, frames - start_frame + 1, frames + 1 + possession_state["count"])
+
+        possession_state["candidate"] = int(candidates[-1])
+        possession_state["count"] = int(run_length[-1]) if candidates[-1] != -1 else 0
+
+        return np.where((candidates != -1) & (run_length >= self.min_frames), candidates, -1)
+
+    def detect_frame_possession(self, player_tracks_frame, ball_tracks_frame, consecutive_possession_count):
+        """
+        Detect which player has the ball in a single frame.
+
+        The consecutive possession counts are carried by the caller, so frames can be
+        processed one at a time (or chunk by chunk) with the same result as
+        detect_ball_possession over the whole video.
+
+        Args:
+            player_tracks_frame (dict): Mapping from player_id to player information including 'bbox'.
+            ball_tracks_frame (dict): Mapping from ball_id to ball information including 'bbox'.
+            consecutive_possession_count (dict): Mapping from player_id to the number of
+                consecutive frames that player was the best candidate. Updated in place.
+
+        Returns:
+            int: The player_id who has confirmed possession, or -1 if none.
+        """
+        ball_info = ball_tracks_frame.get(1, {})
+        if not ball_info:
+            # If no ball info, no one has possession, reset all counts
+            for player_id in consecutive_possession_count:
+                consecutive_possession_count[player_id] = 0
+            return -1
+            
+        ball_bbox = ball_info.get('bbox', [])
+        if not ball_bbox:
+            # If no ball bbox, no one has possession, reset all counts
+            for player_id in consecutive_possession_count:
+                consecutive_possession_count[player_id] = 0
+            return -1
+            
+        ball_center = get_center_of_bbox(ball_bbox)
         
-        for frame_num in range(num_frames):
-            ball_info = ball_tracks[frame_num].get(1, {})
-            if not ball_info:
-                # If no ball info, no one has possession, reset all counts
-                for player_id in consecutive_possession_count:
-                    consecutive_possession_count[player_id] = 0
-                continue
-                
-            ball_bbox = ball_info.get('bbox', [])
-            if not ball_bbox:
-                # If no ball bbox, no one has possession, reset all counts
-                for player_id in consecutive_possession_count:
-                    consecutive_possession_count[player_id] = 0
-                continue
-                
-            ball_center = get_center_of_bbox(ball_bbox)
+        best_player_id = self.find_best_candidate_for_possession(
+            ball_center, 
+            player_tracks_frame, 
+            ball_bbox
+        )
+
+        if best_player_id != -1:
+            # Increment count for the best player
+            consecutive_possession_count[best_player_id] = consecutive_possession_count.get(best_player_id, 0) + 1
             
-            best_player_id = self.find_best_candidate_for_possession(
-                ball_center, 
-                player_tracks[frame_num], 
-                ball_bbox
-            )
-
-            if best_player_id != -1:
-                # Increment count for the best player
-                consecutive_possession_count[best_player_id] = consecutive_possession_count.get(best_player_id, 0) + 1
-                
-                # Reset counts for all other players
-                for player_id in list(consecutive_possession_count.keys()):
-                    if player_id != best_player_id:
-                        consecutive_possession_count[player_id] = 0
-
-                if consecutive_possession_count[best_player_id] >= self.min_frames:
-                    possession_list[frame_num] = best_player_id
-                else:
-                    # If not enough consecutive frames, no one has confirmed possession yet
-                    possession_list[frame_num] = -1
-            else:
-                # If no best player found, reset all counts
-                for player_id in consecutive_possession_count:
+            # Reset counts for all other players
+            for player_id in list(consecutive_possession_count.keys()):
+                if player_id != best_player_id:
                     consecutive_possession_count[player_id] = 0
-                possession_list[frame_num] = -1 # Explicitly set to -1 if no one has the ball
-    
-        return possession_list
\ No newline at end of file
+
+            if consecutive_possession_count[best_player_id] >= self.min_frames:
+                return best_player_id
+            # If not enough consecutive frames, no one has confirmed possession yet
+            return -1
+
+        # If no best player found, reset all counts
+        for player_id in consecutive_possession_count:
+            consecutive_possession_count[player_id] = 0
+        return -1 # Explicitly -1 if no one has the ball
\ No newline at end of file
@@ -1,8 +1,8 @@
-from ultralytics import YOLO
 import supervision as sv
 import sys 
 sys.path.append('../')
 from utils.stubs_utils import read_stub, save_stub
+from inference.model_backend import load_model
 
 
 class CourtKeypointDetector:
@@ -10,8 +10,14 @@ class CourtKeypointDetector:
     The CourtKeypointDetector class uses a YOLO model to detect court keypoints in image frames. 
     It also provides functionality to draw these detected keypoints on the frames.
     """
-    def __init__(self, model_path):
-        self.model = YOLO(model_path)
+    def __init__(self, model_path, backend="torch", int8=False):
+        """
+        Args:
+            model_path (str): Path to the YOLO pose model weights.
+            backend (str): Inference backend, "torch", "onnx" or "openvino".
+            int8 (bool): Whether to use an INT8 quantized model on the ONNX/OpenVINO backends.
+        """
+        self.model = load_model(model_path, "pose", backend=backend, int8=int8)
     
     def get_court_keypoints(self, frames,read_from_stub=False, stub_path=None):
         """
@@ -33,13 +39,38 @@ class CourtKeypointDetector:
             if len(court_keypoints) == len(frames):
                 return court_keypoints
         
+        court_keypoints = self.detect_keypoints(frames)
+
+        save_stub(stub_path,court_keypoints)
+        
+        return court_keypoints
+
+    def detect_keypoints(self, frames):
+        """
+        Detect court keypoints for a sequence of frames without any caching.
+
+        Args:
+            frames (list of numpy.ndarray): A list of frames (images) on which to detect keypoints.
+
+        Returns:
+            list: A list of detected keypoints for each input frame.
+        """
         batch_size=20
         court_keypoints = []
         for i in range(0,len(frames),batch_size):
             detections_batch = self.model.predict(frames[i:i+batch_size],conf=0.5)
-            for detection in detections_batch:
-                court_keypoints.append(detection.keypoints)
+            court_keypoints += self.keypoints_from_detections(detections_batch)
 
-        save_stub(stub_path,court_keypoints)
-        
-        return court_keypoints
\ No newline at end of file
+        return court_keypoints
+
+    def keypoints_from_detections(self, detections):
+        """
+        Extract court keypoints from precomputed YOLO results, e.g. from an InferenceScheduler.
+
+        Args:
+            detections (list): YOLO pose results for each frame, in frame order.
+
+        Returns:
+            list: A list of detected keypoints for each frame.
+        """
+        return [detection.keypoints for detection in detections]
\ No newline at end of file
@@ -5,4 +5,7 @@ from .team_ball_control_drawer import TeamBallControlDrawer
 from .frame_number_drawer import FrameNumberDrawer
 from .pass_and_interceptions_drawer import PassInterceptionDrawer
 from .tactical_view_drawer import TacticalViewDrawer
-from .speed_and_distance_drawer import SpeedAndDistanceDrawer
\ No newline at end of file
+from .speed_and_distance_drawer import SpeedAndDistanceDrawer
+from .frame_compositor import FrameCompositor
+from .heatmap_overlay_drawer import HeatmapOverlayDrawer
+from .sprite_cache import SpriteCache
\ No newline at end of file
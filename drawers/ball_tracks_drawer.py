@@ -29,14 +29,31 @@ class BallTracksDrawer:
         output_video_frames = []
         for frame_num, frame in enumerate(video_frames):
             frame = frame.copy()
-            ball_dict = tracks[frame_num]
-
-            # Draw ball 
-            for _, ball in ball_dict.items():
-                if ball["bbox"] is None:
-                    continue
-                frame = draw_traingle(frame, ball["bbox"],self.ball_pointer_color)
+            frame = self.draw_frame(frame, frame_num, tracks)
 
             output_video_frames.append(frame)
             
-        return output_video_frames
\ No newline at end of file
+        return output_video_frames
+
+    def draw_frame(self, frame, frame_num, tracks):
+        """
+        Draws the ball pointer of a single frame in place.
+
+        Args:
+            frame (numpy.ndarray): The frame to draw on.
+            frame_num (int): Index of the frame in tracks.
+            tracks (list): A list of dictionaries where each dictionary contains ball information
+                for the corresponding frame.
+
+        Returns:
+            numpy.ndarray: The same frame with the ball pointer drawn.
+        """
+        ball_dict = tracks[frame_num]
+
+        # Draw ball 
+        for _, ball in ball_dict.items():
+            if ball["bbox"] is None:
+                continue
+            frame = draw_traingle(frame, ball["bbox"],self.ball_pointer_color)
+
+        return frame
\ No newline at end of file
@@ -9,6 +9,8 @@ class CourtKeypointDrawer:
     """
     def __init__(self):
         self.keypoint_color = '#ff2c2c'
+        self.vertex_annotator = None
+        self.vertex_label_annotator = None
 
     def draw(self, frames, court_keypoints):
         """
@@ -22,33 +24,49 @@ class CourtKeypointDrawer:
         Returns:
             list: A list of frames with keypoints drawn on them.
         """
-        vertex_annotator = sv.VertexAnnotator(
-            color=sv.Color.from_hex(self.keypoint_color),
-            radius=8)
-        
-        vertex_label_annotator = sv.VertexLabelAnnotator(
-            color=sv.Color.from_hex(self.keypoint_color),
-            text_color=sv.Color.WHITE,
-            text_scale=0.5,
-            text_thickness=1
-        )
-        
         output_frames = []
         for index,frame in enumerate(frames):
             annotated_frame = frame.copy()
-
-            keypoints = court_keypoints[index]
-            # Draw dots
-            annotated_frame = vertex_annotator.annotate(
-                scene=annotated_frame,
-                key_points=keypoints)
-            # Draw labels
-            # Convert PyTorch tensor to numpy array
-            keypoints_numpy = keypoints.cpu().numpy()
-            annotated_frame = vertex_label_annotator.annotate(
-                scene=annotated_frame,
-                key_points=keypoints_numpy)
+            annotated_frame = self.draw_frame(annotated_frame, index, court_keypoints)
 
             output_frames.append(annotated_frame)
 
-        return output_frames
\ No newline at end of file
+        return output_frames
+
+    def draw_frame(self, frame, frame_num, court_keypoints):
+        """
+        Draws the court keypoints of a single frame in place.
+
+        Args:
+            frame (numpy.ndarray): The frame to draw on.
+            frame_num (int): Index of the frame in court_keypoints.
+            court_keypoints (list): A list of court keypoints for each frame.
+
+        Returns:
+            numpy.ndarray: The annotated frame.
+        """
+        if self.vertex_annotator is None:
+            self.vertex_annotator = sv.VertexAnnotator(
+                color=sv.Color.from_hex(self.keypoint_color),
+                radius=8)
+            
+            self.vertex_label_annotator = sv.VertexLabelAnnotator(
+                color=sv.Color.from_hex(self.keypoint_color),
+                text_color=sv.Color.WHITE,
+                text_scale=0.5,
+                text_thickness=1
+            )
+
+        keypoints = court_keypoints[frame_num]
+        # Draw dots
+        annotated_frame = self.vertex_annotator.annotate(
+            scene=frame,
+            key_points=keypoints)
+        # Draw labels
+        # Convert PyTorch tensor to numpy array
+        keypoints_numpy = keypoints.cpu().numpy()
+        annotated_frame = self.vertex_label_annotator.annotate(
+            scene=annotated_frame,
+            key_points=keypoints_numpy)
+
+        return annotated_frame
\ No newline at end of file
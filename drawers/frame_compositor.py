@@ -0,0 +1,152 @@
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+class FrameCompositor:
+    """
+    Composites several drawers into a single output buffer per frame.
+
+    Each drawer is registered as a layer together with the per-video data it needs.
+    For every input frame the compositor makes one copy and lets every layer paint into
+    it in registration order, instead of every drawer copying the frame and building its
+    own list of frames.
+
+    A layer is any object with a draw_frame(frame, frame_num, *args, **kwargs) method
+    that draws in place and returns the frame, which all the classes in drawers/ provide.
+
+    Frames can be rendered by a pool of threads, since OpenCV releases the GIL while
+    drawing. Layers whose drawer has a true `sequential` attribute keep state between
+    frames and must see them in order. In parallel rendering only the layers registered
+    before the first sequential layer are painted by the pool; that layer and every layer
+    after it are painted in registration and frame order by the thread consuming the
+    results, so the output is the same as with render.
+    """
+    def __init__(self):
+        self.layers = []
+
+    def add_layer(self, drawer, *args, frame_offset=0, **kwargs):
+        """
+        Register a drawer as the next layer.
+
+        Args:
+            drawer: An object with a draw_frame(frame, frame_num, *args, **kwargs) method.
+            *args: Positional data passed to draw_frame after frame_num.
+            frame_offset (int): Video frame index of the first entry of the layer's
+                per-frame data. The layer receives frame_num - frame_offset, so data that
+                only covers part of the video (e.g. one streaming window) can be registered.
+            **kwargs: Keyword data passed to draw_frame.
+
+        Returns:
+            FrameCompositor: self, so layers can be chained.
+        """
+        self.layers.append((drawer, args, kwargs, frame_offset))
+        return self
+
+    def clear(self):
+        """
+        Remove every registered layer.
+        """
+        self.layers = []
+
+    def render_frame(self, frame, frame_num):
+        """
+        Paint every layer onto a single copy of the frame.
+
+        Args:
+            frame (numpy.ndarray): The input video frame. It is not modified.
+            frame_num (int): Index of the frame in the video.
+
+        Returns:
+            numpy.ndarray: The composited frame.
+        """
+        return self.paint_layers(frame.copy(), frame_num, self.layers)
+
+    def paint_layers(self, frame, frame_num, layers):
+        """
+        Paint the given layers onto a frame in place.
+
+        Args:
+            frame (numpy.ndarray): The frame to paint on.
+            frame_num (int): Index of the frame in the video.
+            layers (list): Layers as registered by add_layer.
+
+        Returns:
+            numpy.ndarray: The painted frame.
+        """
+        for drawer, args, kwargs, frame_offset in layers:
+            frame = drawer.draw_frame(frame, frame_num - frame_offset, *args, **kwargs)
+        return frame
+
+    def render_parallel(self, video_frames, start_frame=0, num_workers=None, max_pending=None):
+        """
+        Lazily composite a sequence of frames on a thread pool, yielding them in order.
+
+        Frames are submitted as they are read and results are handed out in frame order
+        as soon as they are done, so a writer can encode them while later frames are still
+        rendering. At most max_pending frames are in flight, which bounds the reorder buffer.
+
+        Args:
+            video_frames (iterable): Input video frames.
+            start_frame (int): Video frame index of the first input frame.
+            num_workers (int, optional): Number of render threads, the CPU count if None.
+            max_pending (int, optional): Maximum number of frames in flight, twice the
+                number of workers if None.
+
+        Yields:
+            numpy.ndarray: The composited frames, in order.
+        """
+        num_workers = num_workers or os.cpu_count() or 1
+        max_pending = max_pending or 2 * num_workers
+        if num_workers == 1:
+            yield from self.render(video_frames, start_frame)
+            return
+
+        # Layers on top of a sequential layer must be painted after it, so only the layers
+        # below the first sequential layer can be painted out of order
+        num_parallel = next(
+            (i for i, layer in enumerate(self.layers) if getattr(layer[0], "sequential", False)),
+            len(self.layers)
+        )
+        parallel_layers = self.layers[:num_parallel]
+        sequential_layers = self.layers[num_parallel:]
+
+        with ThreadPoolExecutor(max_workers=num_workers) as executor:
+            pending = deque()
+            for i, frame in enumerate(video_frames):
+                frame_num = start_frame + i
+                pending.append((frame_num, executor.submit(self.paint_layers, frame.copy(), frame_num, parallel_layers)))
+                if len(pending) >= max_pending:
+                    frame_num, future = pending.popleft()
+                    yield self.paint_layers(future.result(), frame_num, sequential_layers)
+            while pending:
+                frame_num, future = pending.popleft()
+                yield self.paint_layers(future.result(), frame_num, sequential_layers)
+
+    def render(self, video_frames, start_frame=0):
+        """
+        Lazily composite a sequence of frames.
+
+        Args:
+            video_frames (iterable): Input video frames.
+            start_frame (int): Video frame index of the first input frame.
+
+        Yields:
+            numpy.ndarray: The composited frames, in order.
+        """
+        for i, frame in enumerate(video_frames):
+            yield self.render_frame(frame, start_frame + i)
+
+    def draw(self, video_frames, start_frame=0, num_workers=1):
+        """
+        Composite a list of frames, with the same interface as the other drawers.
+
+        Args:
+            video_frames (list): Input video frames.
+            start_frame (int): Video frame index of the first input frame.
+            num_workers (int, optional): Number of render threads, see render_parallel.
+
+        Returns:
+            list: The composited frames.
+        """
+        return list(self.render_parallel(video_frames, start_frame, num_workers))
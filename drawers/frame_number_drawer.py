@@ -3,11 +3,16 @@ class FrameNumberDrawer:
     def __init__(self):
         pass
 
-    def draw(self,frames):
+    def draw(self,frames,start_frame=0):
         # Write the frame number on the top left corner of the frame
         output_frames = []
         for i in range(len(frames)):
             frame = frames[i].copy()
-            cv2.putText(frame, str(i), (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+            frame = self.draw_frame(frame, start_frame+i)
             output_frames.append(frame)
-        return output_frames
\ No newline at end of file
+        return output_frames
+
+    def draw_frame(self,frame,frame_num):
+        # Write the frame number on a single frame in place
+        cv2.putText(frame, str(frame_num), (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+        return frame
\ No newline at end of file
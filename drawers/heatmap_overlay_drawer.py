@@ -0,0 +1,137 @@
+import cv2
+import numpy as np
+
+
+class HeatmapOverlayDrawer:
+    """
+    Draws a live heatmap of all players, one team or one player into the video.
+
+    The drawer feeds every frame's tactical positions into a PlayerHeatmapGenerator, so
+    frames must be drawn in order and only once. Blurring and colour-mapping the heatmap
+    is far more expensive than blending it, so the BGR tile is only re-rendered every
+    refresh_interval frames, or earlier when the normalised histogram moved by more than
+    change_threshold. In between, the last tile is blended as is.
+    """
+    # Needs the frames in order, see FrameCompositor
+    sequential = True
+
+    def __init__(self,
+                 heatmap_generator,
+                 team_id=None,
+                 player_id=None,
+                 refresh_interval=15,
+                 change_threshold=0.25,
+                 top_left=(20, 220),
+                 opacity=0.8):
+        """
+        Initialize the HeatmapOverlayDrawer.
+
+        Args:
+            heatmap_generator (PlayerHeatmapGenerator): Generator the positions are added to.
+            team_id (int, optional): Only show the players of this team.
+            player_id (int, optional): Only show this player. Takes precedence over team_id.
+            refresh_interval (int): Maximum number of frames between two re-renders.
+            change_threshold (float, optional): L1 distance between the normalised current
+                and last rendered histograms that triggers an early re-render. None disables it.
+            top_left (tuple): (x, y) position of the heatmap in the frame.
+            opacity (float): Weight of the heatmap when blending it into the frame.
+        """
+        self.heatmap_generator = heatmap_generator
+        self.team_id = team_id
+        self.player_id = player_id
+        self.refresh_interval = refresh_interval
+        self.change_threshold = change_threshold
+        self.top_left = top_left
+        self.opacity = opacity
+
+        self.player_teams = {}
+        self.tile = None
+        self.rendered_histogram = None
+        self.frames_since_render = 0
+        self.num_renders = 0
+
+    def draw(self, video_frames, tactical_player_positions, player_assignment):
+        """
+        Draw the live heatmap on a list of video frames.
+
+        Args:
+            video_frames (list): List of video frames to draw on.
+            tactical_player_positions (list): List of dictionaries mapping player IDs to their
+                positions in tactical view coordinates.
+            player_assignment (list): List of dictionaries mapping player IDs to team assignments.
+
+        Returns:
+            list: List of frames with the heatmap drawn on them.
+        """
+        output_video_frames = []
+        for frame_num, frame in enumerate(video_frames):
+            frame = frame.copy()
+            frame = self.draw_frame(frame, frame_num, tactical_player_positions, player_assignment)
+            output_video_frames.append(frame)
+        return output_video_frames
+
+    def draw_frame(self, frame, frame_num, tactical_player_positions, player_assignment):
+        """
+        Add the positions of a frame to the heatmap and blend the heatmap into the frame in place.
+
+        Args:
+            frame (numpy.ndarray): The video frame to draw on.
+            frame_num (int): Index of the frame in tactical_player_positions.
+            tactical_player_positions (list): List of dictionaries mapping player IDs to their
+                positions in tactical view coordinates.
+            player_assignment (list): List of dictionaries mapping player IDs to team assignments.
+
+        Returns:
+            numpy.ndarray: The frame with the heatmap drawn on it.
+        """
+        self.heatmap_generator.add_frame_positions(tactical_player_positions[frame_num])
+        self.player_teams.update(player_assignment[frame_num])
+        self.frames_since_render += 1
+
+        histogram = self.heatmap_generator.get_histogram(self.get_player_ids())
+        total = histogram.sum()
+        if total > 0:
+            histogram /= total
+
+        if self.needs_render(histogram):
+            self.tile = self.heatmap_generator.render_histogram(histogram)
+            self.rendered_histogram = histogram
+            self.frames_since_render = 0
+            self.num_renders += 1
+
+        x0, y0 = self.top_left
+        h, w = self.tile.shape[:2]
+        if 0 <= x0 and 0 <= y0 and x0 + w <= frame.shape[1] and y0 + h <= frame.shape[0]:
+            roi = frame[y0:y0 + h, x0:x0 + w]
+            cv2.addWeighted(self.tile, self.opacity, roi, 1 - self.opacity, 0, roi)
+        return frame
+
+    def get_player_ids(self):
+        """
+        Player IDs whose positions make up the shown heatmap.
+
+        Returns:
+            list or None: The selected player IDs, or None for all players.
+        """
+        if self.player_id is not None:
+            return [self.player_id]
+        if self.team_id is not None:
+            return [pid for pid, team in self.player_teams.items() if team == self.team_id]
+        return None
+
+    def needs_render(self, histogram):
+        """
+        Whether the tile must be re-rendered for the current normalised histogram.
+
+        Args:
+            histogram (numpy.ndarray): The normalised current histogram.
+
+        Returns:
+            bool: True if there is no tile yet, the refresh interval elapsed or the histogram
+                changed by more than change_threshold since the last render.
+        """
+        if self.tile is None or self.frames_since_render >= self.refresh_interval:
+            return True
+        if self.change_threshold is None:
+            return False
+        return float(np.abs(histogram - self.rendered_histogram).sum()) > self.change_threshold
@@ -1,5 +1,6 @@
 import cv2
 import numpy as np
+from .sprite_cache import SpriteCache
 
 class PassInterceptionDrawer:
     """
@@ -7,7 +8,7 @@ class PassInterceptionDrawer:
     on a sequence of video frames.
     """
     def __init__(self):
-        pass
+        self.sprite_cache = SpriteCache()
 
     def get_stats(self, passes, interceptions):
         """
@@ -42,6 +43,35 @@ class PassInterceptionDrawer:
                 
         return len(team1_passes), len(team2_passes), len(team1_interceptions), len(team2_interceptions)
 
+    def get_cumulative_stats(self, passes, interceptions, previous_counts=None):
+        """
+        Running totals of passes and interceptions of both teams, computed once with
+        cumulative sums so the stats of any frame are a single lookup.
+
+        Args:
+            passes (list): Pass events at each frame, as for get_stats.
+            interceptions (list): Interception events at each frame, as for get_stats.
+            previous_counts (numpy.ndarray, optional): Last row of the counts of the preceding
+                frames, to continue the counts across chunks of a video.
+
+        Returns:
+            numpy.ndarray: Integer array of shape (F, 4) holding, for each frame, the totals
+                up to and including it in the order of get_stats (team1_pass_total,
+                team2_pass_total, team1_interception_total, team2_interception_total).
+        """
+        passes = np.asarray(passes).reshape(-1)
+        interceptions = np.asarray(interceptions).reshape(-1)
+        per_frame = np.stack([
+            passes == 1,
+            passes == 2,
+            interceptions == 1,
+            interceptions == 2
+        ], axis=1).astype(np.int64)
+        counts = np.cumsum(per_frame, axis=0).reshape(-1, 4)
+        if previous_counts is not None:
+            counts += np.asarray(previous_counts, dtype=np.int64)
+        return counts
+
     def draw(self, video_frames, passes, interceptions):
         """
         Draw pass and interception statistics on a list of video frames.
@@ -56,35 +86,36 @@ class PassInterceptionDrawer:
         Returns:
             list: A list of frames with pass and interception statistics drawn on them.
         """
+        pass_and_interception_counts = self.get_cumulative_stats(passes, interceptions)
+
         output_video_frames = []
         for frame_num, frame in enumerate(video_frames):
             if frame_num == 0:
                 continue
             
-            frame_drawn = self.draw_frame(frame, frame_num, passes, interceptions)
+            frame_drawn = self.draw_frame(frame, frame_num, pass_and_interception_counts)
             output_video_frames.append(frame_drawn)
         return output_video_frames
     
-    def draw_frame(self, frame, frame_num, passes, interceptions):
+    def draw_frame(self, frame, frame_num, pass_and_interception_counts):
         """
         Draw a semi-transparent overlay of pass and interception counts on a single frame.
 
         Args:
             frame (numpy.ndarray): The current video frame on which the overlay will be drawn.
             frame_num (int): The index of the current frame.
-            passes (list): A list of pass events up to this frame.
-            interceptions (list): A list of interception events up to this frame.
+            pass_and_interception_counts (numpy.ndarray): Running totals of shape (F, 4)
+                from get_cumulative_stats.
 
         Returns:
             numpy.ndarray: The frame with the semi-transparent overlay and statistics.
         """
         # Draw a semi-transparent rectangle
-        overlay = frame.copy()
         font_scale = 0.7
         font_thickness=2
 
         # Overlay Position
-        frame_height, frame_width = overlay.shape[:2]
+        frame_height, frame_width = frame.shape[:2]
         rect_x1 = int(frame_width * 0.01) 
         rect_y1 = int(frame_height * 0.75)
         rect_x2 = int(frame_width * 0.40)  
@@ -94,18 +125,12 @@ class PassInterceptionDrawer:
         text_y1 = int(frame_height * 0.80)  
         text_y2 = int(frame_height * 0.88)
 
-        cv2.rectangle(overlay, (rect_x1, rect_y1), (rect_x2, rect_y2), (255,255,255), -1)
+        # Only the panel's pixels are blended, with a cached white sprite
         alpha = 0.8
-        cv2.addWeighted(overlay, alpha, frame, 1 - alpha, 0, frame)
+        self.sprite_cache.blend_panel(frame, (rect_x1, rect_y1), (rect_x2, rect_y2), (255,255,255), alpha)
 
         # Get stats until current frame
-        passes_till_frame = passes[:frame_num+1]
-        interceptions_till_frame = interceptions[:frame_num+1]
-        
-        team1_passes, team2_passes, team1_interceptions, team2_interceptions = self.get_stats(
-            passes_till_frame, 
-            interceptions_till_frame
-        )
+        team1_passes, team2_passes, team1_interceptions, team2_interceptions = pass_and_interception_counts[frame_num]
 
         cv2.putText(
             frame, 
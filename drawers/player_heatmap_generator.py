@@ -1,3 +1,4 @@
+from typing import Optional
 import numpy as np
 import cv2
 from scipy.ndimage import gaussian_filter
@@ -8,6 +9,12 @@ class PlayerHeatmapGenerator:
     It can also draw the heat-map as a semi-transparent overlay on the tactical court.
 
     Uses Turbo colormap and smooth blending (Option #2 + Option #4).
+
+    Decay is lazy: the histograms of all players share one scale factor, so a frame only
+    multiplies that factor instead of every histogram, and new positions are added as
+    1 / scale. The histograms are renormalised when the scale gets too small. Players not
+    seen for `evict_after_frames` frames are moved to an archive and no longer cost
+    anything per frame; they are restored if their ID comes back.
     """
     def __init__(self,
                  court_w: int = 300,
@@ -15,35 +22,164 @@ class PlayerHeatmapGenerator:
                  grid_x: int = 60,
                  grid_y: int = 32,
                  blur_sigma: float = 1.2,
-                 court_image_path: str = r'D:\basketball ml - Copy\images\basketball_court.png'):
+                 court_image_path: str = r'D:\basketball ml - Copy\images\basketball_court.png',
+                 evict_after_frames: Optional[int] = 900,
+                 archive_evicted: bool = True):
         self.court_w = court_w
         self.court_h = court_h
         self.grid_x = grid_x
         self.grid_y = grid_y
         self.blur_sigma = blur_sigma
-        self.accumulators = {}  # player_id → 2-D histogram
         self.decay = 0.985
+        self.renormalize_below = 1e-6
+        self.evict_after_frames = evict_after_frames
+        self.archive_evicted = archive_evicted
+
+        self.grids = np.zeros((0, self.grid_y, self.grid_x), dtype=np.float64)  # scaled 2-D histograms
+        self.player_rows = {}  # player_id → row of self.grids
+        self.free_rows = []
+        self.last_seen = {}  # player_id → frame index
+        self.archived = {}  # player_id → (2-D histogram, frame index when archived)
+        self.scale = 1.0
+        self.frame_count = 0
         self.base_court = cv2.imread(court_image_path)
         if self.base_court is None:
             raise FileNotFoundError(f"Could not load court image at {court_image_path}")
         self.base_court = cv2.resize(self.base_court, (self.court_w, self.court_h))
 
+    @property
+    def accumulators(self) -> dict[int, np.ndarray]:
+        """
+        {player_id: (grid_y, grid_x) float32 histogram} with the decay applied up to the
+        current frame, for active and archived players.
+        """
+        output = {}
+        for pid, (hist, archived_frame) in self.archived.items():
+            output[pid] = (hist * self.decay ** (self.frame_count - archived_frame)).astype(np.float32)
+        for pid, row in self.player_rows.items():
+            output[pid] = (self.grids[row] * self.scale).astype(np.float32)
+        return output
+
     def add_frame_positions(self, tactical_positions: dict[int, list[float]]):
         """
         tactical_positions : {player_id: [x, y], ...}  (tactical coords)
         Applies temporal decay to create smooth heatmap accumulation over time.
         """
-        for pid in set(self.accumulators) | set(tactical_positions):
-            if pid not in self.accumulators:
-                self.accumulators[pid] = np.zeros((self.grid_y, self.grid_x), dtype=np.float32)
-            else:
-                self.accumulators[pid] *= self.decay  # Apply decay
+        self.add_positions_batch([tactical_positions])
+
+    def add_positions_batch(self, tactical_positions_per_frame: list[dict[int, list[float]]]):
+        """
+        Adds the positions of consecutive frames with one histogram update per chunk.
+        Gives the same heat-maps as calling add_frame_positions for every frame.
+        """
+        # Largest chunk whose decay does not push the scale below renormalize_below
+        chunk_size = len(tactical_positions_per_frame)
+        if self.decay < 1:
+            chunk_size = int(np.log(self.renormalize_below) / np.log(self.decay))
+        chunk_size = max(1, chunk_size)
+        for start in range(0, len(tactical_positions_per_frame), chunk_size):
+            self.bin_positions(tactical_positions_per_frame[start:start + chunk_size])
+            self.evict_stale_players()
+
+    def bin_positions(self, tactical_positions_per_frame: list[dict[int, list[float]]]):
+        """
+        Decays and bins one chunk of frames with a single np.add.at.
+        """
+        num_frames = len(tactical_positions_per_frame)
+        if num_frames == 0:
+            return
+        if self.scale * self.decay ** num_frames < self.renormalize_below:
+            self.renormalize()
+
+        # Scale after the decay of each frame of the chunk
+        frame_scales = self.scale * self.decay ** np.arange(1, num_frames + 1)
+
+        rows, offsets, xs, ys = [], [], [], []
+        for offset, tactical_positions in enumerate(tactical_positions_per_frame):
+            for pid, (x, y) in tactical_positions.items():
+                rows.append(self.row_of(pid))
+                offsets.append(offset)
+                xs.append(x)
+                ys.append(y)
+                self.last_seen[pid] = self.frame_count + offset
+
+        if rows:
+            ix = np.clip(np.array(xs, dtype=np.float64) / self.court_w * self.grid_x, 0, self.grid_x - 1).astype(int)
+            iy = np.clip(np.array(ys, dtype=np.float64) / self.court_h * self.grid_y, 0, self.grid_y - 1).astype(int)
+            np.add.at(self.grids, (np.array(rows), iy, ix), 1 / frame_scales[offsets])
+
+        self.scale = float(frame_scales[-1])
+        self.frame_count += num_frames
+
+    def row_of(self, pid: int) -> int:
+        """
+        Returns the row of `pid` in self.grids, allocating one (and restoring an archived
+        histogram) for players that are not active.
+        """
+        row = self.player_rows.get(pid)
+        if row is not None:
+            return row
+
+        if not self.free_rows:
+            capacity = len(self.grids)
+            self.grids = np.concatenate([self.grids, np.zeros_like(self.grids, shape=(max(capacity, 16),) + self.grids.shape[1:])])
+            self.free_rows = list(range(len(self.grids) - 1, capacity - 1, -1))
+        row = self.free_rows.pop()
+        self.player_rows[pid] = row
+
+        if pid in self.archived:
+            hist, archived_frame = self.archived.pop(pid)
+            self.grids[row] = hist * self.decay ** (self.frame_count - archived_frame) / self.scale
+        return row
+
+    def renormalize(self):
+        """
+        Folds the shared scale factor into the histograms.
+        """
+        self.grids *= self.scale
+        self.scale = 1.0
+
+    def evict_stale_players(self):
+        """
+        Archives (or drops) the players not seen for `evict_after_frames` frames.
+        """
+        if self.evict_after_frames is None:
+            return
+        stale = [pid for pid, frame in self.last_seen.items() if self.frame_count - 1 - frame > self.evict_after_frames]
+        for pid in stale:
+            row = self.player_rows.pop(pid)
+            del self.last_seen[pid]
+            if self.archive_evicted:
+                self.archived[pid] = ((self.grids[row] * self.scale).astype(np.float32), self.frame_count)
+            self.grids[row] = 0
+            self.free_rows.append(row)
 
-        for pid, (x, y) in tactical_positions.items():
-            ix = int(np.clip(x / self.court_w * self.grid_x, 0, self.grid_x - 1))
-            iy = int(np.clip(y / self.court_h * self.grid_y, 0, self.grid_y - 1))
-            self.accumulators[pid][iy, ix] += 1
 
+    def get_histogram(self, player_ids=None) -> np.ndarray:
+        """
+        Returns the summed (grid_y, grid_x) float32 histogram of the active players in
+        `player_ids`, or of all active players if None. Archived players are left out,
+        their decayed weight is negligible.
+        """
+        if player_ids is None:
+            rows = list(self.player_rows.values())
+        else:
+            rows = [self.player_rows[pid] for pid in player_ids if pid in self.player_rows]
+        if not rows:
+            return np.zeros((self.grid_y, self.grid_x), dtype=np.float32)
+        return (self.grids[rows].sum(axis=0) * self.scale).astype(np.float32)
+
+    def render_histogram(self, hist: np.ndarray,
+                         color_map: int = cv2.COLORMAP_TURBO,
+                         alpha: float = 0.7) -> np.ndarray:
+        """
+        Blurs, normalises and colour-maps one histogram onto the tactical court,
+        returning a BGR uint8 image of size (court_h, court_w, 3).
+        """
+        blurred = gaussian_filter(hist, self.blur_sigma)
+        if blurred.max() > 0:
+            blurred /= blurred.max()
+        return self.heatmap_to_bgr(blurred, color_map, alpha)
 
     def get_heatmaps(self) -> dict[int, np.ndarray]:
         """
@@ -58,6 +194,16 @@ class PlayerHeatmapGenerator:
             output[pid] = blurred
         return output
 
+    def get_zone_shares(self, court_zones, hoop_side: str = "right") -> dict[int, dict[str, float]]:
+        """
+        Returns {player_id: {zone_name: share}} with the fraction of each player's
+        (decayed) presence in every court zone, using a CourtZones lookup.
+        """
+        return {
+            pid: court_zones.zone_shares(hist, hoop_side)
+            for pid, hist in self.accumulators.items()
+        }
+
     def heatmap_to_bgr(self, heat: np.ndarray,
                        color_map: int = cv2.COLORMAP_TURBO,
                        alpha: float = 0.7) -> np.ndarray:
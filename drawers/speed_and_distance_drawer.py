@@ -3,33 +3,34 @@ import cv2
 class SpeedAndDistanceDrawer():
     def __init__(self):
         pass 
-    def draw(self, video_frames,player_tracks,player_distances_per_frame,player_speed_per_frame):
+    def draw(self, video_frames,player_tracks,movement_ledger):
         output_video_frames = []
-        total_distances = {}
-
-        for frame,player_tracks,player_distance,player_speed in zip(video_frames,player_tracks,player_distances_per_frame,player_speed_per_frame):            
+        for frame_num, frame in enumerate(video_frames):            
             output_frame = frame.copy()
+            output_frame = self.draw_frame(output_frame,frame_num,player_tracks,movement_ledger)
+            
+            output_video_frames.append(output_frame)
 
-            # Get Total Distance
-            for player_id, distance in player_distance.items():
-                if player_id not in total_distances:
-                    total_distances[player_id]=0
-                total_distances[player_id]+=distance
+        return output_video_frames
 
-            
-            for player_id,bbox in player_tracks.items():
-                x1,y1,x2,y2 = bbox['bbox']
-                position = [int((x1+x2)/2),int(y2)]
-                position[1]+=40
+    def draw_frame(self, frame,frame_num,player_tracks,movement_ledger,ledger_frame_offset=0):
+        # Draws a single frame in place. Running totals come from the MovementLedger, which
+        # is indexed from the start of the video, so ledger_frame_offset gives the video
+        # frame of player_tracks[0] when drawing one chunk of a video.
+        player_tracks = player_tracks[frame_num]
 
-                distance = total_distances.get(player_id,None)
-                speed = player_speed.get(player_id,None)
-                if speed is not None:
-                    cv2.putText(output_frame, f"{speed:.2f} km/h",position,cv2.FONT_HERSHEY_SIMPLEX,0.5,(0,0,0),2)
-                if distance is not None:
-                    cv2.putText(output_frame, f"{distance:.2f} m",(position[0],position[1]+20),cv2.FONT_HERSHEY_SIMPLEX,0.5,(0,0,0),2)
+        for player_id,bbox in player_tracks.items():
+            x1,y1,x2,y2 = bbox['bbox']
+            position = [int((x1+x2)/2),int(y2)]
+            position[1]+=40
 
-            
-            output_video_frames.append(output_frame)
+            stats = movement_ledger.get(frame_num + ledger_frame_offset, player_id)
+            if stats is None:
+                continue
+            speed = stats["speed"]
+            distance = stats["total_distance"]
+            if speed is not None:
+                cv2.putText(frame, f"{speed:.2f} km/h",position,cv2.FONT_HERSHEY_SIMPLEX,0.5,(0,0,0),2)
+            cv2.putText(frame, f"{distance:.2f} m",(position[0],position[1]+20),cv2.FONT_HERSHEY_SIMPLEX,0.5,(0,0,0),2)
 
-        return output_video_frames
\ No newline at end of file
+        return frame
\ No newline at end of file
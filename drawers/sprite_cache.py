@@ -0,0 +1,93 @@
+import cv2
+import numpy as np
+
+
+class SpriteCache:
+    """
+    Pre-rendered overlay images, rendered once per key and reused for every frame.
+
+    Keys hold everything a sprite depends on (its size, colour, the keypoints drawn on
+    it, ...), so a new sprite is only rendered when the resolution or content changes.
+    Sprites are blended or pasted into their region of interest only, so the cost of an
+    overlay grows with its area and not with the frame size.
+    """
+    def __init__(self):
+        self.sprites = {}
+
+    def get(self, key, render):
+        """
+        Get a sprite, rendering it on first use.
+
+        Args:
+            key (hashable): Everything the sprite depends on.
+            render (callable): Function without arguments returning the sprite.
+
+        Returns:
+            The cached sprite.
+        """
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            sprite = self.sprites[key] = render()
+        return sprite
+
+    def clear(self):
+        """
+        Remove every cached sprite.
+        """
+        self.sprites = {}
+
+    def blend_panel(self, frame, top_left, bottom_right, color, alpha):
+        """
+        Alpha-blend a filled rectangle into the frame in place, touching only its pixels.
+
+        Gives the same result as drawing the filled rectangle on a copy of the whole frame
+        and blending that copy back with cv2.addWeighted.
+
+        Args:
+            frame (numpy.ndarray): The frame to draw on.
+            top_left (tuple): (x, y) of the top left corner.
+            bottom_right (tuple): (x, y) of the bottom right corner, inclusive as in cv2.rectangle.
+            color (tuple): Colour of the panel in BGR format.
+            alpha (float): Opacity of the panel.
+
+        Returns:
+            numpy.ndarray: The frame with the panel blended in.
+        """
+        frame_height, frame_width = frame.shape[:2]
+        x1, y1 = max(top_left[0], 0), max(top_left[1], 0)
+        x2, y2 = min(bottom_right[0] + 1, frame_width), min(bottom_right[1] + 1, frame_height)
+        if x2 <= x1 or y2 <= y1:
+            return frame
+
+        roi = frame[y1:y2, x1:x2]
+        panel = self.get(
+            ("panel", roi.shape, tuple(color), frame.dtype.str),
+            lambda: np.full(roi.shape, color, dtype=frame.dtype)
+        )
+        frame[y1:y2, x1:x2] = cv2.addWeighted(panel, alpha, roi, 1 - alpha, 0)
+        return frame
+
+    def paste(self, frame, sprite, mask, top_left):
+        """
+        Copy the masked pixels of a sprite into the frame in place, clipped to the frame.
+
+        Args:
+            frame (numpy.ndarray): The frame to draw on.
+            sprite (numpy.ndarray): Sprite image of shape (H, W, 3).
+            mask (numpy.ndarray): Boolean mask of shape (H, W) of the sprite pixels to copy.
+            top_left (tuple): (x, y) of the sprite's top left corner in the frame.
+
+        Returns:
+            numpy.ndarray: The frame with the sprite pasted in.
+        """
+        frame_height, frame_width = frame.shape[:2]
+        x0, y0 = top_left
+        x1, y1 = max(x0, 0), max(y0, 0)
+        x2, y2 = min(x0 + sprite.shape[1], frame_width), min(y0 + sprite.shape[0], frame_height)
+        if x2 <= x1 or y2 <= y1:
+            return frame
+
+        sprite_region = (slice(y1 - y0, y2 - y0), slice(x1 - x0, x2 - x0))
+        roi_mask = mask[sprite_region]
+        frame[y1:y2, x1:x2][roi_mask] = sprite[sprite_region][roi_mask]
+        return frame
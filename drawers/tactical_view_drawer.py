@@ -1,4 +1,6 @@
 import cv2 
+import numpy as np
+from .sprite_cache import SpriteCache
 
 class TacticalViewDrawer:
     def __init__(self, team_1_color=[255, 245, 238], team_2_color=[128, 0, 0]):
@@ -6,6 +8,9 @@ class TacticalViewDrawer:
         self.start_y = 40
         self.team_1_color = team_1_color
         self.team_2_color = team_2_color
+        # Court keypoint labels may reach past the court image, so their sprite is padded
+        self.keypoint_sprite_padding = 30
+        self.sprite_cache = SpriteCache()
 
     def draw(self, 
              video_frames, 
@@ -33,57 +38,134 @@ class TacticalViewDrawer:
         Returns:
             list: List of frames with tactical view drawn on them.
         """
-        court_image = cv2.imread(court_image_path)
-        court_image = cv2.resize(court_image, (width, height))
+        court_image = self.load_court_image(court_image_path, width, height)
 
         output_video_frames = []
         for frame_idx, frame in enumerate(video_frames):
             frame = frame.copy()
+            frame = self.draw_frame(
+                frame,
+                frame_idx,
+                court_image,
+                tactical_court_keypoints,
+                tactical_player_positions,
+                player_assignment,
+                ball_acquisition
+            )
+            output_video_frames.append(frame)
 
-            y1 = self.start_y
-            y2 = self.start_y+height
-            x1 = self.start_x
-            x2 = self.start_x+width
-            
-            alpha = 0.6  # Transparency factor
-            overlay = frame[y1:y2, x1:x2].copy()
-            cv2.addWeighted(court_image, alpha, overlay, 1 - alpha, 0, frame[y1:y2, x1:x2])
-            
-            # Draw court keypoints
-            for keypoint_index, keypoint in enumerate(tactical_court_keypoints):
-                x, y = keypoint
-                x += self.start_x
-                y += self.start_y
-                cv2.circle(frame, (x, y), 5, (0, 0, 255), -1)
-                cv2.putText(frame, str(keypoint_index), (x, y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
+        return output_video_frames
+
+    def load_court_image(self, court_image_path, width, height):
+        """
+        Load the court image resized to the tactical view size.
+
+        Args:
+            court_image_path (str): Path to the court image.
+            width (int): Width of the tactical view.
+            height (int): Height of the tactical view.
+
+        Returns:
+            numpy.ndarray: The resized court image.
+        """
+        court_image = cv2.imread(court_image_path)
+        court_image = cv2.resize(court_image, (width, height))
+        return court_image
+
+    def get_keypoint_sprite(self, court_shape, tactical_court_keypoints):
+        """
+        Get the court keypoint circles and labels as a cached sprite.
+
+        Args:
+            court_shape (tuple): Shape of the court image.
+            tactical_court_keypoints (list): List of court keypoints in tactical view.
+
+        Returns:
+            tuple: (sprite, mask) of the keypoints drawn on a canvas padded by
+                keypoint_sprite_padding on every side of the court image.
+        """
+        keypoints = tuple((int(x), int(y)) for x, y in tactical_court_keypoints)
+
+        def render():
+            padding = self.keypoint_sprite_padding
+            height, width = court_shape[:2]
+            sprite = np.zeros((height + 2 * padding, width + 2 * padding, 3), dtype=np.uint8)
+            mask = np.zeros(sprite.shape[:2], dtype=np.uint8)
+            for keypoint_index, (x, y) in enumerate(keypoints):
+                x += padding
+                y += padding
+                for canvas, circle_color, text_color in ((sprite, (0, 0, 255), (0, 255, 0)), (mask, 255, 255)):
+                    cv2.circle(canvas, (x, y), 5, circle_color, -1)
+                    cv2.putText(canvas, str(keypoint_index), (x, y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, text_color, 2)
+            return sprite, mask.astype(bool)
+
+        return self.sprite_cache.get(("court_keypoints", court_shape[:2], keypoints), render)
+
+    def draw_frame(self,
+                   frame,
+                   frame_idx,
+                   court_image,
+                   tactical_court_keypoints,
+                   tactical_player_positions=None,
+                   player_assignment=None,
+                   ball_acquisition=None):
+        """
+        Draw the tactical view of a single frame in place.
+
+        Args:
+            frame (numpy.ndarray): The frame to draw on.
+            frame_idx (int): Index of the frame in the per-frame lists.
+            court_image (numpy.ndarray): Court image from load_court_image.
+            tactical_court_keypoints (list): List of court keypoints in tactical view.
+            tactical_player_positions (list, optional): List of dictionaries mapping player IDs to 
+                their positions in tactical view coordinates.
+            player_assignment (list, optional): List of dictionaries mapping player IDs to team assignments.
+            ball_acquisition (list, optional): List indicating which player has the ball in each frame.
+
+        Returns:
+            numpy.ndarray: The frame with the tactical view drawn on it.
+        """
+        height, width = court_image.shape[:2]
+
+        y1 = self.start_y
+        y2 = self.start_y+height
+        x1 = self.start_x
+        x2 = self.start_x+width
+        
+        alpha = 0.6  # Transparency factor
+        overlay = frame[y1:y2, x1:x2].copy()
+        cv2.addWeighted(court_image, alpha, overlay, 1 - alpha, 0, frame[y1:y2, x1:x2])
+        
+        # Draw court keypoints from a sprite rendered once per court size and keypoint set
+        keypoint_sprite, keypoint_mask = self.get_keypoint_sprite(court_image.shape, tactical_court_keypoints)
+        padding = self.keypoint_sprite_padding
+        self.sprite_cache.paste(frame, keypoint_sprite, keypoint_mask, (self.start_x - padding, self.start_y - padding))
+        
+        # Draw player positions in tactical view if available
+        if tactical_player_positions and player_assignment and frame_idx < len(tactical_player_positions):
+            frame_positions = tactical_player_positions[frame_idx]
+            frame_assignments = player_assignment[frame_idx] if frame_idx < len(player_assignment) else {}
+            player_with_ball = ball_acquisition[frame_idx] if ball_acquisition and frame_idx < len(ball_acquisition) else -1
             
-            # Draw player positions in tactical view if available
-            if tactical_player_positions and player_assignment and frame_idx < len(tactical_player_positions):
-                frame_positions = tactical_player_positions[frame_idx]
-                frame_assignments = player_assignment[frame_idx] if frame_idx < len(player_assignment) else {}
-                player_with_ball = ball_acquisition[frame_idx] if ball_acquisition and frame_idx < len(ball_acquisition) else -1
+            for player_id, position in frame_positions.items():
+                # Get player's team
+                team_id = frame_assignments.get(player_id, 1)  # Default to team 1 if not assigned
                 
-                for player_id, position in frame_positions.items():
-                    # Get player's team
-                    team_id = frame_assignments.get(player_id, 1)  # Default to team 1 if not assigned
-                    
-                    # Set color based on team
-                    color = self.team_1_color if team_id == 1 else self.team_2_color
-                    
-                    # Adjust position to overlay coordinates
-                    x, y = int(position[0]) + self.start_x, int(position[1]) + self.start_y
-                    
-                    # Draw player circle
-                    player_radius = 8
-                    cv2.circle(frame, (x, y), player_radius, color, -1)
-                    
-                    # Add player ID
-                    #cv2.putText(frame, str(player_id), (x-4, y+4), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0, 0, 0), 1)
-                    
-                    # Highlight player with ball
-                    if player_id == player_with_ball:
-                        cv2.circle(frame, (x, y), player_radius+3, (0, 0, 255), 2)
-            
-            output_video_frames.append(frame)
+                # Set color based on team
+                color = self.team_1_color if team_id == 1 else self.team_2_color
+                
+                # Adjust position to overlay coordinates
+                x, y = int(position[0]) + self.start_x, int(position[1]) + self.start_y
+                
+                # Draw player circle
+                player_radius = 8
+                cv2.circle(frame, (x, y), player_radius, color, -1)
+                
+                # Add player ID
+                #cv2.putText(frame, str(player_id), (x-4, y+4), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0, 0, 0), 1)
+                
+                # Highlight player with ball
+                if player_id == player_with_ball:
+                    cv2.circle(frame, (x, y), player_radius+3, (0, 0, 255), 2)
 
-        return output_video_frames
+        return frame
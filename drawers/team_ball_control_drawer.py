@@ -1,12 +1,13 @@
 import cv2 
 import numpy as np
+from .sprite_cache import SpriteCache
 
 class TeamBallControlDrawer:
     """
     A class responsible for calculating and drawing team ball control statistics on video frames.
     """
     def __init__(self):
-        pass
+        self.sprite_cache = SpriteCache()
 
     def get_team_ball_control(self,player_assignment,ball_aquisition):
         """
@@ -38,6 +39,44 @@ class TeamBallControlDrawer:
         team_ball_control= np.array(team_ball_control) 
         return team_ball_control
 
+    def get_ball_control_counts(self,team_ball_control,previous_counts=None):
+        """
+        Running number of frames seen and of frames each team had ball control, computed
+        once with cumulative sums so the percentages of any frame are a single lookup.
+
+        Args:
+            team_ball_control (numpy.ndarray): Ball control per frame from get_team_ball_control.
+            previous_counts (numpy.ndarray, optional): Last row of the counts of the preceding
+                frames, to continue the counts across chunks of a video.
+
+        Returns:
+            numpy.ndarray: Integer array of shape (F, 3) holding, for each frame, the number
+                of frames up to and including it and the frames of Team 1 and Team 2 control.
+        """
+        team_ball_control = np.asarray(team_ball_control)
+        per_frame = np.stack([
+            np.ones(len(team_ball_control), dtype=np.int64),
+            team_ball_control == 1,
+            team_ball_control == 2
+        ], axis=1).astype(np.int64)
+        counts = np.cumsum(per_frame, axis=0).reshape(-1, 3)
+        if previous_counts is not None:
+            counts += np.asarray(previous_counts, dtype=np.int64)
+        return counts
+
+    def get_ball_control_percentages(self,ball_control_counts):
+        """
+        Ball control percentage of each team up to every frame, e.g. for exports.
+
+        Args:
+            ball_control_counts (numpy.ndarray): Counts of shape (F, 3) from get_ball_control_counts.
+
+        Returns:
+            numpy.ndarray: Percentages of shape (F, 2) for Team 1 and Team 2.
+        """
+        ball_control_counts = np.asarray(ball_control_counts, dtype=np.float64).reshape(-1, 3)
+        return ball_control_counts[:, 1:] / ball_control_counts[:, :1] * 100
+
     def draw(self,video_frames,player_assignment,ball_aquisition):
         """
         Draw team ball control statistics on a list of video frames.
@@ -53,36 +92,36 @@ class TeamBallControlDrawer:
         """
         
         team_ball_control = self.get_team_ball_control(player_assignment,ball_aquisition)
+        ball_control_counts = self.get_ball_control_counts(team_ball_control)
 
         output_video_frames= []
         for frame_num, frame in enumerate(video_frames):
             if frame_num == 0:
                 continue
 
-            frame_drawn = self.draw_frame(frame,frame_num,team_ball_control)
+            frame_drawn = self.draw_frame(frame,frame_num,ball_control_counts)
             output_video_frames.append(frame_drawn)
         return output_video_frames
     
-    def draw_frame(self,frame,frame_num,team_ball_control):
+    def draw_frame(self,frame,frame_num,ball_control_counts):
         """
         Draw a semi-transparent overlay of team ball control percentages on a single frame.
 
         Args:
             frame (numpy.ndarray): The current video frame on which the overlay will be drawn.
             frame_num (int): The index of the current frame.
-            team_ball_control (numpy.ndarray): An array indicating which team has ball control for each frame.
+            ball_control_counts (numpy.ndarray): Cumulative counts of shape (F, 3) from get_ball_control_counts.
 
         Returns:
             numpy.ndarray: The frame with the semi-transparent overlay and statistics.
         """
         
         # Draw a semi-transparent rectaggle 
-        overlay = frame.copy()
         font_scale = 0.7
         font_thickness=2
         
         # Overlay Position
-        frame_height, frame_width = overlay.shape[:2]
+        frame_height, frame_width = frame.shape[:2]
         rect_x1 = int(frame_width * 0.44) 
         rect_y1 = int(frame_height * 0.75)
         rect_x2 = int(frame_width * 0.75)  
@@ -93,16 +132,14 @@ class TeamBallControlDrawer:
         text_y2 = int(frame_height * 0.88)
 
 
-        cv2.rectangle(overlay, (rect_x1, rect_y1), (rect_x2, rect_y2), (255,255,255), -1 )
+        # Only the panel's pixels are blended, with a cached white sprite
         alpha = 0.8
-        cv2.addWeighted(overlay, alpha, frame, 1 - alpha, 0, frame)
+        self.sprite_cache.blend_panel(frame, (rect_x1, rect_y1), (rect_x2, rect_y2), (255,255,255), alpha)
 
-        team_ball_control_till_frame = team_ball_control[:frame_num+1]
         # Get the number of time each team had ball control
-        team_1_num_frames = team_ball_control_till_frame[team_ball_control_till_frame==1].shape[0]
-        team_2_num_frames = team_ball_control_till_frame[team_ball_control_till_frame==2].shape[0]
-        team_1 = team_1_num_frames/(team_ball_control_till_frame.shape[0])
-        team_2 = team_2_num_frames/(team_ball_control_till_frame.shape[0])
+        num_frames, team_1_num_frames, team_2_num_frames = ball_control_counts[frame_num]
+        team_1 = team_1_num_frames/num_frames
+        team_2 = team_2_num_frames/num_frames
 
         cv2.putText(frame, f"Team 1 Ball Control: {team_1*100:.2f}%",(text_x, text_y1), cv2.FONT_HERSHEY_SIMPLEX, font_scale, (0,0,0), font_thickness)
         cv2.putText(frame, f"Team 2 Ball Control: {team_2*100:.2f}%",(text_x, text_y2), cv2.FONT_HERSHEY_SIMPLEX, font_scale, (0,0,0), font_thickness)
@@ -0,0 +1,2 @@
+from .inference_scheduler import InferenceScheduler
+from .model_backend import load_model, export_model
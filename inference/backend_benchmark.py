@@ -0,0 +1,186 @@
+"""
+Compares inference backends against the PyTorch path on frames of a real video.
+
+For every backend it reports throughput (frames per second) and how well its
+predictions agree with PyTorch: box precision/recall and mean IoU of matched boxes for
+detection models, detection agreement and mean pixel error of keypoints for the court
+keypoint model.
+
+Usage:
+    python -m inference.backend_benchmark --video input_videos/video_1.mp4 \
+        --model models/player_detector.pt --task detect --backends onnx openvino --int8
+"""
+
+import argparse
+import sys
+import time
+import numpy as np
+sys.path.append('../')
+from inference.model_backend import load_model
+from streaming_pipeline.video_stream import read_video_stream
+
+
+def box_iou(boxes_a, boxes_b):
+    """
+    Pairwise IoU between two sets of (x1, y1, x2, y2) boxes.
+
+    Args:
+        boxes_a (numpy.ndarray): Array of shape (N, 4).
+        boxes_b (numpy.ndarray): Array of shape (M, 4).
+
+    Returns:
+        numpy.ndarray: IoU matrix of shape (N, M).
+    """
+    x1 = np.maximum(boxes_a[:, None, 0], boxes_b[None, :, 0])
+    y1 = np.maximum(boxes_a[:, None, 1], boxes_b[None, :, 1])
+    x2 = np.minimum(boxes_a[:, None, 2], boxes_b[None, :, 2])
+    y2 = np.minimum(boxes_a[:, None, 3], boxes_b[None, :, 3])
+    intersection = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+
+    area_a = (boxes_a[:, 2] - boxes_a[:, 0]) * (boxes_a[:, 3] - boxes_a[:, 1])
+    area_b = (boxes_b[:, 2] - boxes_b[:, 0]) * (boxes_b[:, 3] - boxes_b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - intersection
+    return intersection / np.maximum(union, 1e-9)
+
+
+def run_backend(model, frames, batch_size, conf):
+    """
+    Run a model over the frames and time it.
+
+    Returns:
+        tuple: (results, fps)
+    """
+    # Warm up outside of the timed section
+    model.predict(frames[:1], conf=conf, verbose=False)
+
+    results = []
+    start = time.perf_counter()
+    for i in range(0, len(frames), batch_size):
+        results += model.predict(frames[i:i+batch_size], conf=conf, verbose=False)
+    elapsed = time.perf_counter() - start
+    return results, len(frames) / elapsed
+
+
+def detection_agreement(reference_results, results, iou_threshold=0.5):
+    """
+    Greedy same-class IoU matching of boxes against the reference backend.
+
+    Returns:
+        dict: precision, recall and mean IoU of matched boxes.
+    """
+    matched = 0
+    num_reference = 0
+    num_predicted = 0
+    matched_ious = []
+
+    for reference, result in zip(reference_results, results):
+        reference_boxes = reference.boxes.xyxy.cpu().numpy()
+        reference_classes = reference.boxes.cls.cpu().numpy()
+        boxes = result.boxes.xyxy.cpu().numpy()
+        classes = result.boxes.cls.cpu().numpy()
+
+        num_reference += len(reference_boxes)
+        num_predicted += len(boxes)
+        if len(reference_boxes) == 0 or len(boxes) == 0:
+            continue
+
+        ious = box_iou(reference_boxes, boxes)
+        ious[reference_classes[:, None] != classes[None, :]] = 0
+
+        while True:
+            i, j = np.unravel_index(np.argmax(ious), ious.shape)
+            if ious[i, j] < iou_threshold:
+                break
+            matched += 1
+            matched_ious.append(ious[i, j])
+            ious[i, :] = 0
+            ious[:, j] = 0
+
+    return {
+        "precision": matched / num_predicted if num_predicted else 1.0,
+        "recall": matched / num_reference if num_reference else 1.0,
+        "mean_iou": float(np.mean(matched_ious)) if matched_ious else 0.0,
+    }
+
+
+def keypoint_agreement(reference_results, results):
+    """
+    Compare court keypoints against the reference backend.
+
+    Returns:
+        dict: fraction of keypoints whose detected/undetected state agrees, and mean pixel
+            error of keypoints detected by both.
+    """
+    agreeing = 0
+    total = 0
+    errors = []
+
+    for reference, result in zip(reference_results, results):
+        reference_xy = reference.keypoints.xy.cpu().numpy()
+        xy = result.keypoints.xy.cpu().numpy()
+        if reference_xy.shape[0] == 0 and xy.shape[0] == 0:
+            continue
+        if reference_xy.shape[0] == 0 or xy.shape[0] == 0:
+            # Only one backend found the court, so none of its keypoints agree
+            total += (reference_xy if reference_xy.shape[0] else xy).shape[1]
+            continue
+
+        # The court model predicts a single court instance per frame
+        reference_xy, xy = reference_xy[0], xy[0]
+        reference_detected = (reference_xy > 0).all(axis=1)
+        detected = (xy > 0).all(axis=1)
+
+        agreeing += int((reference_detected == detected).sum())
+        total += len(reference_detected)
+
+        both = reference_detected & detected
+        if both.any():
+            errors += np.linalg.norm(reference_xy[both] - xy[both], axis=1).tolist()
+
+    return {
+        "detection_agreement": agreeing / total if total else 1.0,
+        "mean_pixel_error": float(np.mean(errors)) if errors else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark inference backends against PyTorch")
+    parser.add_argument("--video", required=True, help="Video to take the benchmark frames from")
+    parser.add_argument("--model", required=True, help="Path to the PyTorch (.pt) weights")
+    parser.add_argument("--task", default="detect", choices=["detect", "pose"])
+    parser.add_argument("--backends", nargs="+", default=["onnx", "openvino"])
+    parser.add_argument("--int8", action="store_true", help="Also benchmark the INT8 variant of each backend")
+    parser.add_argument("--num-frames", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=20)
+    parser.add_argument("--conf", type=float, default=0.5)
+    args = parser.parse_args()
+
+    frames = []
+    for frame in read_video_stream(args.video):
+        frames.append(frame)
+        if len(frames) == args.num_frames:
+            break
+
+    reference_model = load_model(args.model, args.task, backend="torch")
+    reference_results, reference_fps = run_backend(reference_model, frames, args.batch_size, args.conf)
+    print(f"{'torch':<16} {reference_fps:8.2f} fps  (reference)")
+
+    variants = [(backend, False) for backend in args.backends]
+    if args.int8:
+        variants += [(backend, True) for backend in args.backends]
+
+    for backend, int8 in variants:
+        name = f"{backend}{'-int8' if int8 else ''}"
+        model = load_model(args.model, args.task, backend=backend, int8=int8)
+        results, fps = run_backend(model, frames, args.batch_size, args.conf)
+
+        if args.task == "pose":
+            agreement = keypoint_agreement(reference_results, results)
+        else:
+            agreement = detection_agreement(reference_results, results)
+        agreement_text = "  ".join(f"{key}={value:.3f}" for key, value in agreement.items())
+        print(f"{name:<16} {fps:8.2f} fps  x{fps / reference_fps:5.2f}  {agreement_text}")
+
+
+if __name__ == "__main__":
+    main()
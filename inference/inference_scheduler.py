@@ -0,0 +1,275 @@
+import time
+from itertools import chain
+import cv2
+from ultralytics.engine.results import Results
+
+
+class InferenceScheduler:
+    """
+    Runs several YOLO models over the same frames with shared, letterboxed batches.
+
+    Each frame is traversed and letterboxed once to the common input size. Every batch is
+    then handed to all registered models, and the results are mapped back to the original
+    frame coordinates, so downstream code receives the same Results objects as with
+    model.predict on the raw frames.
+
+    Like Ultralytics' LetterBox(auto=True), frames are only padded up to the smallest
+    stride-aligned rectangle (e.g. 640x384 for 16:9 video) instead of a full square, and
+    every frame of a batch is padded to the same shape. Square padding is only used for
+    models exported with a fixed input shape.
+
+    Attributes:
+        imgsz (int): Size of the longest side every frame is letterboxed to.
+        batch_size (int or None): Frames per batch. None means auto-tune on the first frames.
+        max_batch_size (int): Upper bound used when auto-tuning the batch size.
+        rect (bool): Pad to the smallest stride-aligned rectangle. False pads to a
+            imgsz x imgsz square, for backends exported with a fixed input shape.
+        stride (int): Model stride the rectangular input sides are a multiple of.
+        models (dict): Registered models by name, each with its predict keyword arguments.
+    """
+    def __init__(self, imgsz=640, batch_size=None, max_batch_size=64, rect=True, stride=32):
+        self.imgsz = imgsz
+        self.batch_size = batch_size
+        self.max_batch_size = max_batch_size
+        self.rect = rect
+        self.stride = stride
+        self.models = {}
+
+    def register(self, name, model, conf=0.5, **predict_kwargs):
+        """
+        Register a model to run on every batch.
+
+        Args:
+            name (str): Key of the model's results in the output of run.
+            model (YOLO): An Ultralytics model (detection or pose).
+            conf (float): Confidence threshold passed to model.predict.
+            **predict_kwargs: Extra keyword arguments for model.predict.
+        """
+        self.models[name] = (model, dict(predict_kwargs, conf=conf))
+
+    def resized_shape(self, frame):
+        """
+        Size of a frame once resized to fit imgsz x imgsz keeping its aspect ratio.
+
+        Args:
+            frame (numpy.ndarray): The original BGR frame.
+
+        Returns:
+            tuple: (ratio, (new_width, new_height)).
+        """
+        height, width = frame.shape[:2]
+        ratio = min(self.imgsz / height, self.imgsz / width)
+        return ratio, (int(round(width * ratio)), int(round(height * ratio)))
+
+    def letterbox_shape(self, frame):
+        """
+        Padded input shape of a frame.
+
+        Args:
+            frame (numpy.ndarray): The original BGR frame.
+
+        Returns:
+            tuple: (width, height) of the letterboxed frame, the smallest stride-aligned
+                rectangle holding the resized frame, or imgsz x imgsz if rect is False.
+        """
+        if not self.rect:
+            return self.imgsz, self.imgsz
+        _, (new_width, new_height) = self.resized_shape(frame)
+        # Same padding as LetterBox(auto=True)
+        return (
+            new_width + (self.imgsz - new_width) % self.stride,
+            new_height + (self.imgsz - new_height) % self.stride
+        )
+
+    def letterbox_batch(self, frames):
+        """
+        Letterbox the frames of one batch to a common shape.
+
+        Args:
+            frames (list): The original BGR frames.
+
+        Returns:
+            list: Tuples (letterboxed_frame, ratio, pad) from letterbox, one per frame.
+        """
+        shapes = [self.letterbox_shape(frame) for frame in frames]
+        shape = (max(width for width, _ in shapes), max(height for _, height in shapes))
+        return [self.letterbox(frame, shape) for frame in frames]
+
+    def letterbox(self, frame, shape=None):
+        """
+        Resize a frame to fit imgsz x imgsz keeping its aspect ratio, and pad it to shape.
+
+        Args:
+            frame (numpy.ndarray): The original BGR frame.
+            shape (tuple, optional): (width, height) to pad to, letterbox_shape if None.
+
+        Returns:
+            tuple: (letterboxed_frame, ratio, (pad_x, pad_y)) where ratio and padding map
+                original coordinates to letterboxed ones.
+        """
+        if shape is None:
+            shape = self.letterbox_shape(frame)
+        height, width = frame.shape[:2]
+        ratio, (new_width, new_height) = self.resized_shape(frame)
+
+        pad_x = (shape[0] - new_width) / 2
+        pad_y = (shape[1] - new_height) / 2
+
+        if (new_width, new_height) != (width, height):
+            frame = cv2.resize(frame, (new_width, new_height), interpolation=cv2.INTER_LINEAR)
+
+        top, bottom = int(round(pad_y - 0.1)), int(round(pad_y + 0.1))
+        left, right = int(round(pad_x - 0.1)), int(round(pad_x + 0.1))
+        frame = cv2.copyMakeBorder(frame, top, bottom, left, right, cv2.BORDER_CONSTANT, value=(114, 114, 114))
+        return frame, ratio, (left, top)
+
+    def restore_result(self, result, frame, ratio, pad):
+        """
+        Map a result predicted on a letterboxed frame back to the original frame.
+
+        Args:
+            result (Results): The Ultralytics result for the letterboxed frame.
+            frame (numpy.ndarray): The original frame.
+            ratio (float): Scale from original to letterboxed coordinates.
+            pad (tuple): (pad_x, pad_y) added by the letterbox.
+
+        Returns:
+            Results: A result with boxes and keypoints in original frame coordinates.
+        """
+        pad_x, pad_y = pad
+        height, width = frame.shape[:2]
+
+        boxes = None
+        if result.boxes is not None:
+            boxes = result.boxes.data.clone()
+            boxes[:, [0, 2]] = ((boxes[:, [0, 2]] - pad_x) / ratio).clamp(0, width)
+            boxes[:, [1, 3]] = ((boxes[:, [1, 3]] - pad_y) / ratio).clamp(0, height)
+
+        keypoints = None
+        if result.keypoints is not None:
+            keypoints = result.keypoints.data.clone()
+            # Undetected keypoints are (0, 0) and must stay that way
+            missing = (keypoints[..., 0] == 0) & (keypoints[..., 1] == 0)
+            keypoints[..., 0] = (keypoints[..., 0] - pad_x) / ratio
+            keypoints[..., 1] = (keypoints[..., 1] - pad_y) / ratio
+            keypoints[..., 0][missing] = 0
+            keypoints[..., 1][missing] = 0
+
+        return Results(
+            orig_img=frame,
+            path=result.path,
+            names=result.names,
+            boxes=boxes,
+            keypoints=keypoints
+        )
+
+    def predict_batch(self, frames, letterboxed):
+        """
+        Run every registered model on one prepared batch.
+
+        Args:
+            frames (list): The original frames of the batch.
+            letterboxed (list): Tuples (letterboxed_frame, ratio, pad) from letterbox_batch,
+                so that every frame of the batch has its own ratio and padding.
+
+        Returns:
+            dict: Mapping of model name to a list of Results in original frame coordinates.
+        """
+        batch = [item[0] for item in letterboxed]
+        # The batch is already padded, so the model must not letterbox it again
+        batch_shape = batch[0].shape[:2]
+        outputs = {}
+        for name, (model, predict_kwargs) in self.models.items():
+            results = model.predict(batch, imgsz=batch_shape, verbose=False, **predict_kwargs)
+            outputs[name] = [
+                self.restore_result(result, frame, ratio, pad)
+                for result, frame, (_, ratio, pad) in zip(results, frames, letterboxed)
+            ]
+        return outputs
+
+    def auto_tune_batch_size(self, frames):
+        """
+        Pick the batch size with the best per-frame latency on a sample of frames.
+
+        Batch sizes are doubled until the per-frame time stops improving, the sample is
+        exhausted, max_batch_size is reached or the device runs out of memory.
+
+        Args:
+            frames (list): Sample of original frames, ideally max_batch_size of them.
+
+        Returns:
+            int: The selected batch size.
+        """
+        letterboxed = self.letterbox_batch(frames)
+
+        # Warm up so lazy initialisation does not count against the first candidate
+        self.predict_batch(frames[:1], letterboxed[:1])
+
+        best_batch_size = 1
+        best_time_per_frame = float('inf')
+        batch_size = 1
+        while batch_size <= min(len(frames), self.max_batch_size):
+            try:
+                start = time.perf_counter()
+                self.predict_batch(frames[:batch_size], letterboxed[:batch_size])
+                time_per_frame = (time.perf_counter() - start) / batch_size
+            except RuntimeError:
+                # Most likely out of memory
+                break
+
+            if time_per_frame >= best_time_per_frame:
+                break
+            best_batch_size = batch_size
+            best_time_per_frame = time_per_frame
+            batch_size *= 2
+
+        return best_batch_size
+
+    def iter_batches(self, frames):
+        """
+        Lazily run all registered models over a stream of frames.
+
+        Args:
+            frames (iterable): Original video frames.
+
+        Yields:
+            dict: Mapping of model name to the list of Results of one batch, in frame order.
+        """
+        frames = iter(frames)
+
+        if self.batch_size is None:
+            sample = []
+            for frame in frames:
+                sample.append(frame)
+                if len(sample) == self.max_batch_size:
+                    break
+            if not sample:
+                return
+            self.batch_size = self.auto_tune_batch_size(sample)
+            frames = chain(sample, frames)
+
+        batch_frames = []
+        for frame in frames:
+            batch_frames.append(frame)
+            if len(batch_frames) == self.batch_size:
+                yield self.predict_batch(batch_frames, self.letterbox_batch(batch_frames))
+                batch_frames = []
+        if batch_frames:
+            yield self.predict_batch(batch_frames, self.letterbox_batch(batch_frames))
+
+    def run(self, frames):
+        """
+        Run all registered models over the frames.
+
+        Args:
+            frames (iterable): Original video frames.
+
+        Returns:
+            dict: Mapping of model name to the list of Results for every frame.
+        """
+        outputs = {name: [] for name in self.models}
+        for batch_outputs in self.iter_batches(frames):
+            for name, results in batch_outputs.items():
+                outputs[name] += results
+        return outputs
+
@@ -0,0 +1,90 @@
+"""
+Loading of YOLO models on different inference backends.
+
+"torch" is the default Ultralytics PyTorch path. "onnx" exports the weights to ONNX and
+runs them with ONNX Runtime, optionally with INT8 dynamically quantized weights.
+"openvino" exports to OpenVINO IR, optionally INT8 quantized with NNCF post-training
+quantization. All backends are loaded through the YOLO class, so predict() returns the
+same Results objects and downstream code does not change.
+
+Exported models are written next to the original weights and reused on later runs as
+long as they are newer than the weights.
+"""
+
+import os
+from ultralytics import YOLO
+
+SUPPORTED_BACKENDS = ("torch", "onnx", "openvino")
+
+
+def _is_up_to_date(exported_path, model_path):
+    return os.path.exists(exported_path) and os.path.getmtime(exported_path) >= os.path.getmtime(model_path)
+
+
+def export_model(model_path, backend, int8=False, imgsz=640, calibration_data=None):
+    """
+    Export YOLO weights to the given backend format, reusing a previous export if possible.
+
+    Args:
+        model_path (str): Path to the PyTorch (.pt) weights.
+        backend (str): "onnx" or "openvino".
+        int8 (bool): Whether to quantize the exported model to INT8.
+        imgsz (int): Input size the model is exported for.
+        calibration_data (str, optional): Dataset YAML used to calibrate OpenVINO INT8
+            quantization. Ultralytics falls back to its default dataset if None.
+
+    Returns:
+        str: Path of the exported model (file for ONNX, directory for OpenVINO).
+    """
+    base_path = os.path.splitext(model_path)[0]
+
+    if backend == "onnx":
+        onnx_path = base_path + ".onnx"
+        if not _is_up_to_date(onnx_path, model_path):
+            onnx_path = YOLO(model_path).export(format="onnx", imgsz=imgsz, dynamic=True, simplify=True)
+        if not int8:
+            return onnx_path
+
+        quantized_path = base_path + ".int8.onnx"
+        if not _is_up_to_date(quantized_path, onnx_path):
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+            quantize_dynamic(onnx_path, quantized_path, weight_type=QuantType.QUInt8)
+        return quantized_path
+
+    if backend == "openvino":
+        suffix = "_int8_openvino_model" if int8 else "_openvino_model"
+        openvino_path = base_path + suffix
+        if not _is_up_to_date(openvino_path, model_path):
+            export_kwargs = {"format": "openvino", "imgsz": imgsz, "dynamic": True, "int8": int8}
+            if int8 and calibration_data is not None:
+                export_kwargs["data"] = calibration_data
+            openvino_path = YOLO(model_path).export(**export_kwargs)
+        return openvino_path
+
+    raise ValueError(f"Unsupported backend '{backend}'. Expected one of {SUPPORTED_BACKENDS}.")
+
+
+def load_model(model_path, task, backend="torch", int8=False, imgsz=640, calibration_data=None):
+    """
+    Load a YOLO model on the requested backend.
+
+    Args:
+        model_path (str): Path to the PyTorch (.pt) weights.
+        task (str): Ultralytics task of the model, "detect" or "pose". Exported models
+            do not always carry it, so it is passed explicitly.
+        backend (str): One of SUPPORTED_BACKENDS.
+        int8 (bool): Whether to use an INT8 quantized model. Ignored for "torch".
+        imgsz (int): Input size the model is exported for.
+        calibration_data (str, optional): Dataset YAML for OpenVINO INT8 calibration.
+
+    Returns:
+        YOLO: The loaded model.
+    """
+    if backend not in SUPPORTED_BACKENDS:
+        raise ValueError(f"Unsupported backend '{backend}'. Expected one of {SUPPORTED_BACKENDS}.")
+
+    if backend == "torch":
+        return YOLO(model_path, task=task)
+
+    exported_path = export_model(model_path, backend, int8=int8, imgsz=imgsz, calibration_data=calibration_data)
+    return YOLO(exported_path, task=task)
@@ -1,9 +1,12 @@
 import os
+import json
+import argparse
 import cv2
 import pytesseract
-from utils.video_utils import read_video, save_video 
+from utils.video_utils import read_video
 from trackers.player_tracker import PlayerTracker
 from trackers.ball_tracker import BallTracker
+from trackers.track_table import TrackTable
 from drawers.player_tracks_drawer import PlayerTracksDrawer
 from drawers.ball_tracks_drawer import BallTracksDrawer
 from team_assigner.team_assigner import TeamAssigner
@@ -15,12 +18,22 @@ from court_keypoint_detector.court_keypoint_detector import CourtKeypointDetecto
 from drawers.court_keypoints_drawer import CourtKeypointDrawer
 from drawers.tactical_view_drawer import TacticalViewDrawer
 from tactical_view_convertor.tactical_view_converter import TacticalViewConverter
+from tactical_view_convertor.homography_tracker import HomographyTracker
+from tactical_view_convertor.homography_store import HomographyStore
+from tactical_view_convertor.court_zones import CourtZones
 from speed_and_distance_calculator.speed_and_distance_calculator import SpeedAndDistanceCalculator
 from drawers.frame_number_drawer import FrameNumberDrawer
 from drawers.speed_and_distance_drawer import SpeedAndDistanceDrawer
 from drawers.player_heatmap_generator import PlayerHeatmapGenerator
+from drawers.heatmap_overlay_drawer import HeatmapOverlayDrawer
+from drawers.frame_compositor import FrameCompositor
 from player_name_mapper import PlayerNameMapper
-from predictor import overlay_win_probability_on_frames
+from predictor import iter_win_probability_overlay
+from inference.inference_scheduler import InferenceScheduler
+from streaming_pipeline.streaming_pipeline import StreamingPipeline
+from streaming_pipeline.streaming_renderer import StreamingRenderer
+from streaming_pipeline.video_stream import read_video_stream, save_video_stream
+from artifact_cache.artifact_cache import ArtifactCache
 
 from configs.configs import (
     PLAYER_DETECTOR_PATH,
@@ -31,34 +44,169 @@ from configs.configs import (
 
 pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
 
-def main():
-    video_frames = read_video("input_videos/video_1.mp4")
+def create_inference_scheduler(player_tracker, ball_tracker, court_keypoint_detector, batch_size=None):
+    inference_scheduler = InferenceScheduler(batch_size=batch_size)
+    # In keyframe mode the player tracker decides itself which frames to detect
+    if player_tracker.keyframe_stride == 1:
+        inference_scheduler.register("players", player_tracker.model)
+    inference_scheduler.register("ball", ball_tracker.model)
+    inference_scheduler.register("court_keypoints", court_keypoint_detector.model)
+    return inference_scheduler
+
+def save_heatmaps(heat_gen, tactical_view_converter):
+    all_heatmaps = heat_gen.get_heatmaps()
+    for player_id, heat in all_heatmaps.items():
+        heat_img = heat_gen.heatmap_to_bgr(heat)
+        save_path = os.path.join("output_heatmaps", f"player_{player_id}.jpg")
+        cv2.imwrite(save_path, heat_img)
+
+    # Share of every player's presence per court zone
+    court_zones = CourtZones(
+        tactical_view_converter.width,
+        tactical_view_converter.height,
+        tactical_view_converter.actual_width_in_meters,
+        tactical_view_converter.actual_height_in_meters
+    )
+    with open(os.path.join("output_heatmaps", "zone_shares.json"), 'w', encoding="utf-8") as f:
+        json.dump(heat_gen.get_zone_shares(court_zones), f, indent=2)
+
+def create_heatmap_overlay(live_heatmap, tactical_view_converter):
+    # Live heatmap layer of all players or one team, None when disabled
+    if live_heatmap == "none":
+        return None
+    heatmap_generator = PlayerHeatmapGenerator(
+        court_w=tactical_view_converter.width,
+        court_h=tactical_view_converter.height
+    )
+    team_id = {"all": None, "team_1": 1, "team_2": 2}[live_heatmap]
+    return HeatmapOverlayDrawer(heatmap_generator, team_id=team_id)
+
+def save_pass_events(pass_events):
+    # Passes and interceptions with the players involved, next to the output video
+    with open(os.path.splitext(OUTPUT_VIDEO_PATH)[0] + "_pass_events.json", 'w', encoding="utf-8") as f:
+        json.dump(pass_events, f, indent=2)
+
+def main(batch_size=None, backend="torch", int8=False, keyframe_stride=1, cache_dir="stubs/cache", team_mode="clip", live_heatmap="none", render_workers=None):
+    video_path = "input_videos/video_1.mp4"
+    video_frames = read_video(video_path)
 
     # Trackers and detectors
-    player_tracker = PlayerTracker(PLAYER_DETECTOR_PATH)
-    ball_tracker = BallTracker(BALL_DETECTOR_PATH)
-    court_keypoint_detector = CourtKeypointDetector(COURT_KEYPOINT_DETECTOR_PATH)
+    player_tracker = PlayerTracker(PLAYER_DETECTOR_PATH, backend=backend, int8=int8, keyframe_stride=keyframe_stride)
+    ball_tracker = BallTracker(BALL_DETECTOR_PATH, backend=backend, int8=int8)
+    court_keypoint_detector = CourtKeypointDetector(COURT_KEYPOINT_DETECTOR_PATH, backend=backend, int8=int8)
+
+    # Every stage result is cached under a key built from the video and weight digests,
+    # the stage parameters and the keys of the stages it reads from
+    cache = ArtifactCache(cache_dir)
+    video_digest = cache.file_digest(video_path)
+    model_params = {"backend": backend, "int8": int8, "conf": 0.5}
+
+    player_tracks_key = cache.stage_key(
+        "player_tracks",
+        [video_digest, cache.file_digest(PLAYER_DETECTOR_PATH)],
+        dict(model_params, keyframe_stride=keyframe_stride)
+    )
+    ball_tracks_key = cache.stage_key("ball_tracks", [video_digest, cache.file_digest(BALL_DETECTOR_PATH)], model_params)
+    court_keypoints_key = cache.stage_key("court_keypoints", [video_digest, cache.file_digest(COURT_KEYPOINT_DETECTOR_PATH)], model_params)
+
+    player_tracks = cache.load("player_tracks", player_tracks_key, codec="tracks")
+    ball_tracks = cache.load("ball_tracks", ball_tracks_key, codec="tracks")
+    court_keypoints = cache.load("court_keypoints", court_keypoints_key, codec="keypoints")
 
-    player_tracks = player_tracker.get_object_tracks(video_frames, read_from_stub=False, stub_path="stubs/player_tracks_stubs.pkl")
-    ball_tracks = ball_tracker.get_object_tracks(video_frames, read_from_stub=False, stub_path="stubs/ball_tracks_stubs.pkl")
-    court_keypoints = court_keypoint_detector.get_court_keypoints(video_frames, read_from_stub=False, stub_path="stubs/court_keypoints_stubs.pkl")
+    # The models that are not cached share one pass of letterboxed batches over the frames
+    inference_scheduler = InferenceScheduler(batch_size=batch_size)
+    if player_tracks is None and player_tracker.keyframe_stride == 1:
+        inference_scheduler.register("players", player_tracker.model)
+    if ball_tracks is None:
+        inference_scheduler.register("ball", ball_tracker.model)
+    if court_keypoints is None:
+        inference_scheduler.register("court_keypoints", court_keypoint_detector.model)
+    detections = inference_scheduler.run(video_frames) if inference_scheduler.models else {}
+
+    if player_tracks is None:
+        if "players" in detections:
+            player_tracks = player_tracker.track_detections(detections["players"])
+        else:
+            player_tracks = player_tracker.track_frames(video_frames)
+        cache.save("player_tracks", player_tracks_key, player_tracks, codec="tracks")
+    if ball_tracks is None:
+        ball_tracks = ball_tracker.track_detections(detections["ball"])
+        cache.save("ball_tracks", ball_tracks_key, ball_tracks, codec="tracks")
+    if court_keypoints is None:
+        court_keypoints = court_keypoint_detector.keypoints_from_detections(detections["court_keypoints"])
+        cache.save("court_keypoints", court_keypoints_key, court_keypoints, codec="keypoints")
 
     ball_tracks = ball_tracker.remove_wrong_detections(ball_tracks)
     ball_tracks = ball_tracker.interpolate_ball_positions(ball_tracks)
 
-    team_assigner = TeamAssigner()
-    player_assignment = team_assigner.get_player_teams_across_frames(video_frames, player_tracks, read_from_stub=False, stub_path="stubs/player_assignment_stubs.pkl")
+    team_assigner = TeamAssigner(mode=team_mode)
+    player_assignment, _ = cache.cached(
+        "player_assignment",
+        [video_digest, player_tracks_key],
+        lambda: team_assigner.assign_teams(video_frames, player_tracks),
+        params={
+            "team_1": team_assigner.team_1_class_name,
+            "team_2": team_assigner.team_2_class_name,
+            "reset_interval": team_assigner.reset_interval,
+            "drift_threshold": team_assigner.drift_threshold,
+            "min_confidence": team_assigner.min_confidence,
+            "mode": team_assigner.mode,
+            "fit_frames": team_assigner.fit_frames,
+            "min_margin": team_assigner.min_margin
+        }
+    )
+    if team_assigner.num_color_crops:
+        print(f"Team colour model: {team_assigner.get_clip_fallback_fraction():.1%} of crops fell back to CLIP")
+
+    # The analytics below work on frames x slots arrays instead of per-frame dictionaries
+    player_table = TrackTable.from_tracks(player_tracks)
+    player_table.set_teams(player_assignment)
 
     ball_aquisition_detector = BallAquisitionDetector()
-    ball_aquisition = ball_aquisition_detector.detect_ball_possession(player_tracks, ball_tracks)
+    ball_aquisition, _ = cache.cached(
+        "ball_aquisition",
+        [player_tracks_key, ball_tracks_key],
+        lambda: ball_aquisition_detector.detect_possession_in_table(player_table, TrackTable.from_tracks(ball_tracks)).tolist(),
+        params=vars(ball_aquisition_detector)
+    )
 
     pass_and_interception_detector = PassAndInterceptionDetector()
-    passes = pass_and_interception_detector.detect_passes(ball_aquisition, player_assignment)
-    interceptions = pass_and_interception_detector.detect_interceptions(ball_aquisition, player_assignment)
+    passes = pass_and_interception_detector.detect_passes(ball_aquisition, player_table)
+    interceptions = pass_and_interception_detector.detect_interceptions(ball_aquisition, player_table)
+    pass_events = pass_and_interception_detector.detect_events(ball_aquisition, player_table)
 
-    tactical_view_converter = TacticalViewConverter("images/basketball_court.png")
-    court_keypoints_per_frame = tactical_view_converter.validate_keypoints(court_keypoints)
-    tactical_player_positions = tactical_view_converter.transform_players_to_tactical_view(court_keypoints_per_frame, player_tracks)
+    homography_tracker = HomographyTracker()
+    tactical_view_converter = TacticalViewConverter("images/basketball_court.png", homography_tracker=homography_tracker)
+    court_keypoints_xy = tactical_view_converter.keypoints_to_array(court_keypoints)
+    court_keypoint_mask, court_keypoint_mask_key = cache.cached(
+        "court_keypoint_mask",
+        [court_keypoints_key],
+        lambda: tactical_view_converter.validate_keypoints_mask(court_keypoints_xy),
+        params={"key_points": tactical_view_converter.key_points}
+    )
+    court_keypoints_per_frame = tactical_view_converter.apply_keypoint_mask(court_keypoints, court_keypoints_xy, court_keypoint_mask)
+    # Homographies are fitted once and shared by every tactical view consumer
+    court_homographies, court_homographies_key = cache.cached(
+        "court_homographies",
+        [court_keypoint_mask_key],
+        lambda: tactical_view_converter.compute_homographies_from_array(court_keypoints_xy, court_keypoint_mask),
+        params={
+            "key_points": tactical_view_converter.key_points,
+            "reuse_threshold": homography_tracker.reuse_threshold,
+            "smoothing_threshold": homography_tracker.smoothing_threshold,
+            "smoothing": homography_tracker.smoothing,
+            "max_dropout_frames": homography_tracker.max_dropout_frames,
+            "ransac_threshold": homography_tracker.ransac_threshold
+        }
+    )
+    homography_store = HomographyStore(court_homographies)
+    player_table.tactical_positions, _ = cache.cached(
+        "tactical_player_positions",
+        [court_homographies_key, player_tracks_key],
+        lambda: tactical_view_converter.project_table_to_tactical_view(homography_store, player_table),
+        stage_version=4
+    )
+    tactical_player_positions = player_table.tactical_positions_to_dicts()
 
     speed_and_distance_calculator = SpeedAndDistanceCalculator(
         tactical_view_converter.width,
@@ -66,8 +214,10 @@ def main():
         tactical_view_converter.actual_width_in_meters,
         tactical_view_converter.actual_height_in_meters
     )
-    player_distances_per_frame = speed_and_distance_calculator.calculate_distance(tactical_player_positions)
-    player_speed_per_frame = speed_and_distance_calculator.calculate_speed(player_distances_per_frame)
+    player_distances = speed_and_distance_calculator.calculate_distance_in_table(player_table)
+    player_distances_per_frame = player_table.column_to_dicts(player_distances)
+    player_speed_per_frame = player_table.column_to_dicts(speed_and_distance_calculator.calculate_speed_in_table(player_table, player_distances))
+    movement_ledger = speed_and_distance_calculator.build_movement_ledger(player_distances_per_frame, player_speed_per_frame, player_tracks)
 
     # Optional: player name mapping
     player_mapper = PlayerNameMapper("D:/basketball ml - Copy - Copy/real-player-data.basketball.json", "D:/basketball ml - Copy - Copy/real-player-stats.basketball.json")
@@ -85,43 +235,136 @@ def main():
     tactical_view_drawer = TacticalViewDrawer()
     speed_and_distance_drawer = SpeedAndDistanceDrawer()
 
-    output_video_frames = player_tracks_drawer.draw(video_frames, player_tracks, player_assignment, ball_aquisition)
-    output_video_frames = ball_tracks_drawer.draw(output_video_frames, ball_tracks)
-    output_video_frames = court_keypoint_drawer.draw(output_video_frames, court_keypoints_per_frame)
-    output_video_frames = frame_number_drawer.draw(output_video_frames)
-    output_video_frames = team_ball_control_drawer.draw(output_video_frames, player_assignment, ball_aquisition)
-    output_video_frames = pass_and_interceptions_drawer.draw(output_video_frames, passes, interceptions)
-    output_video_frames = speed_and_distance_drawer.draw(output_video_frames, player_tracks, player_distances_per_frame, player_speed_per_frame)
-    output_video_frames = tactical_view_drawer.draw(
-        output_video_frames,
-        tactical_view_converter.court_image_path,
-        tactical_view_converter.width,
-        tactical_view_converter.height,
+    # All drawers paint into a single output buffer per frame
+    compositor = FrameCompositor()
+    compositor.add_layer(player_tracks_drawer, player_tracks, player_assignment, ball_aquisition)
+    compositor.add_layer(ball_tracks_drawer, ball_tracks)
+    compositor.add_layer(court_keypoint_drawer, court_keypoints_per_frame)
+    compositor.add_layer(frame_number_drawer)
+    team_ball_control = team_ball_control_drawer.get_team_ball_control(player_assignment, ball_aquisition)
+    compositor.add_layer(team_ball_control_drawer, team_ball_control_drawer.get_ball_control_counts(team_ball_control))
+    compositor.add_layer(pass_and_interceptions_drawer, pass_and_interceptions_drawer.get_cumulative_stats(passes, interceptions))
+    compositor.add_layer(speed_and_distance_drawer, player_tracks, movement_ledger)
+    compositor.add_layer(
+        tactical_view_drawer,
+        tactical_view_drawer.load_court_image(
+            tactical_view_converter.court_image_path,
+            tactical_view_converter.width,
+            tactical_view_converter.height
+        ),
         tactical_view_converter.key_points,
         tactical_player_positions,
         player_assignment,
         ball_aquisition
     )
+    heatmap_overlay_drawer = create_heatmap_overlay(live_heatmap, tactical_view_converter)
+    if heatmap_overlay_drawer is not None:
+        compositor.add_layer(heatmap_overlay_drawer, tactical_player_positions, player_assignment)
 
-    # Win probability overlay
-    output_video_frames = overlay_win_probability_on_frames(output_video_frames, "D:/basketball ml - Copy - Copy/coefs.csv")
+    # Frames are rendered on a thread pool and encoded in order as they complete,
+    # with the win probability overlay drawn on the way
+    output_video_frames = compositor.render_parallel(video_frames, num_workers=render_workers)
+    output_video_frames = iter_win_probability_overlay(output_video_frames, "D:/basketball ml - Copy - Copy/coefs.csv")
+    save_video_stream(output_video_frames, OUTPUT_VIDEO_PATH)
+    save_pass_events(pass_events)
 
     # Heatmap generation
     heat_gen = PlayerHeatmapGenerator(
         court_w=tactical_view_converter.width,
         court_h=tactical_view_converter.height
     )
-    for tactical_pos in tactical_player_positions:
-        heat_gen.add_frame_positions(tactical_pos)
+    heat_gen.add_positions_batch(tactical_player_positions)
 
-    all_heatmaps = heat_gen.get_heatmaps()
-    for player_id, heat in all_heatmaps.items():
-        heat_img = heat_gen.heatmap_to_bgr(heat)
-        save_path = os.path.join("output_heatmaps", f"player_{player_id}.jpg")
-        cv2.imwrite(save_path, heat_img)
+    save_heatmaps(heat_gen, tactical_view_converter)
+
+def main_streaming(window_size=64, batch_size=None, backend="torch", int8=False, keyframe_stride=1, team_mode="clip", live_heatmap="none", render_workers=None):
+    """
+    Streaming variant of main(): frames are decoded, analysed, rendered and encoded one
+    window at a time, so memory depends on window_size and not on the video length.
+    """
+    player_tracker = PlayerTracker(PLAYER_DETECTOR_PATH, backend=backend, int8=int8, keyframe_stride=keyframe_stride)
+    ball_tracker = BallTracker(BALL_DETECTOR_PATH, backend=backend, int8=int8)
+    court_keypoint_detector = CourtKeypointDetector(COURT_KEYPOINT_DETECTOR_PATH, backend=backend, int8=int8)
+    tactical_view_converter = TacticalViewConverter("images/basketball_court.png", homography_tracker=HomographyTracker())
+    speed_and_distance_calculator = SpeedAndDistanceCalculator(
+        tactical_view_converter.width,
+        tactical_view_converter.height,
+        tactical_view_converter.actual_width_in_meters,
+        tactical_view_converter.actual_height_in_meters
+    )
+
+    team_assigner = TeamAssigner(mode=team_mode)
+    pipeline = StreamingPipeline(
+        player_tracker,
+        ball_tracker,
+        court_keypoint_detector,
+        team_assigner,
+        BallAquisitionDetector(),
+        PassAndInterceptionDetector(),
+        tactical_view_converter,
+        speed_and_distance_calculator,
+        window_size=window_size,
+        inference_scheduler=create_inference_scheduler(player_tracker, ball_tracker, court_keypoint_detector, batch_size)
+    )
+
+    player_mapper = PlayerNameMapper("D:/basketball ml - Copy - Copy/real-player-data.basketball.json", "D:/basketball ml - Copy - Copy/real-player-stats.basketball.json")
+    player_mapper.assign_player_to_yolo_id(9, "jamesle01")
+
+    renderer = StreamingRenderer(
+        PlayerTracksDrawer(player_mapper=player_mapper),
+        BallTracksDrawer(),
+        CourtKeypointDrawer(),
+        FrameNumberDrawer(),
+        TeamBallControlDrawer(),
+        PassInterceptionDrawer(),
+        SpeedAndDistanceDrawer(),
+        TacticalViewDrawer(),
+        tactical_view_converter,
+        heatmap_overlay_drawer=create_heatmap_overlay(live_heatmap, tactical_view_converter),
+        num_workers=render_workers
+    )
 
-    # Save video
-    save_video(output_video_frames, OUTPUT_VIDEO_PATH)
+    heat_gen = PlayerHeatmapGenerator(
+        court_w=tactical_view_converter.width,
+        court_h=tactical_view_converter.height
+    )
+
+    pass_events = []
+
+    def output_frames():
+        windows = pipeline.stream_windows(read_video_stream("input_videos/video_1.mp4"))
+        for window in windows:
+            pass_events.extend(window["pass_events"])
+            heat_gen.add_positions_batch(window["tactical_player_positions"])
+
+            yield from renderer.render_window(window)
+
+    # Frames are encoded as soon as their window is rendered. The overlay wraps the whole
+    # stream so its score and time reader keeps its cache across windows
+    output_video_frames = iter_win_probability_overlay(output_frames(), "D:/basketball ml - Copy - Copy/coefs.csv")
+    save_video_stream(output_video_frames, OUTPUT_VIDEO_PATH)
+    save_pass_events(pass_events)
+    if team_assigner.num_color_crops:
+        print(f"Team colour model: {team_assigner.get_clip_fallback_fraction():.1%} of crops fell back to CLIP")
+
+    os.makedirs("output_heatmaps", exist_ok=True)
+    save_heatmaps(heat_gen, tactical_view_converter)
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stream", action="store_true", help="Process the video window by window with bounded memory")
+    parser.add_argument("--window-size", type=int, default=64, help="Number of frames per window in streaming mode")
+    parser.add_argument("--batch-size", type=int, default=None, help="Inference batch size, auto-tuned if omitted")
+    parser.add_argument("--backend", default="torch", choices=["torch", "onnx", "openvino"], help="Inference backend for the detectors")
+    parser.add_argument("--int8", action="store_true", help="Use INT8 quantized models with the onnx/openvino backends")
+    parser.add_argument("--keyframe-stride", type=int, default=1, help="Run the player detector every N frames and propagate boxes with optical flow in between")
+    parser.add_argument("--cache-dir", default="stubs/cache", help="Directory of the content-addressed stage cache")
+    parser.add_argument("--live-heatmap", default="none", choices=["none", "all", "team_1", "team_2"], help="Draw a live heatmap of all players or one team into the video")
+    parser.add_argument("--render-workers", type=int, default=None, help="Number of threads rendering the output frames, the CPU count if omitted")
+    parser.add_argument("--team-mode", default="clip", choices=["clip", "color"], help="Classify jerseys with CLIP only, or with colour clustering and CLIP for ambiguous crops")
+    args = parser.parse_args()
+
+    if args.stream:
+        main_streaming(window_size=args.window_size, batch_size=args.batch_size, backend=args.backend, int8=args.int8, keyframe_stride=args.keyframe_stride, team_mode=args.team_mode, live_heatmap=args.live_heatmap, render_workers=args.render_workers)
+    else:
+        main(batch_size=args.batch_size, backend=args.backend, int8=args.int8, keyframe_stride=args.keyframe_stride, cache_dir=args.cache_dir, team_mode=args.team_mode, live_heatmap=args.live_heatmap, render_workers=args.render_workers)
@@ -1,4 +1,7 @@
-from copy import deepcopy
+import sys
+import numpy as np
+sys.path.append('../')
+from trackers.track_table import TrackTable
 
 class PassAndInterceptionDetector():
     """
@@ -7,42 +10,71 @@ class PassAndInterceptionDetector():
     def __init__(self):
         pass 
 
+    def detect_possession_changes(self,ball_acquisition,player_assignment):
+        """
+        Finds every frame where the ball goes from one player to another and the teams involved.
+
+        The previous holder of a frame is the last player with possession in any earlier
+        frame, so frames without a holder in between do not break a transfer.
+
+        Args:
+            ball_acquisition (list): A list indicating which player has possession of the ball in each frame.
+            player_assignment (list or TrackTable): Per-frame dictionaries of team assignments,
+                or a track table with its team column filled.
+
+        Returns:
+            tuple: (frames, previous_holders, current_holders, previous_teams, current_teams)
+                arrays with one entry per change of possession. Teams are -1 when unknown.
+        """
+        holders = np.asarray(ball_acquisition, dtype=np.int64).reshape(-1)
+        frame_indices = np.arange(len(holders))
+
+        # Last frame strictly before each frame that had a holder
+        last_held = np.maximum.accumulate(np.where(holders != -1, frame_indices, -1))
+        previous_frames = np.concatenate([[-1], last_held[:-1]])[:len(holders)]
+        previous_holders = np.where(previous_frames >= 0, holders[np.maximum(previous_frames, 0)], -1)
+
+        changes = (previous_holders != -1) & (holders != -1) & (previous_holders != holders)
+        frames = frame_indices[changes]
+        previous_frames = previous_frames[changes]
+        previous_holders = previous_holders[changes]
+        current_holders = holders[changes]
+
+        if isinstance(player_assignment, TrackTable):
+            previous_teams = player_assignment.team_of(previous_frames, previous_holders)
+            current_teams = player_assignment.team_of(frames, current_holders)
+        else:
+            # Changes of possession are rare, so only their frames are looked up
+            previous_teams = np.array([
+                player_assignment[frame].get(holder, -1)
+                for frame, holder in zip(previous_frames.tolist(), previous_holders.tolist())
+            ], dtype=np.int64)
+            current_teams = np.array([
+                player_assignment[frame].get(holder, -1)
+                for frame, holder in zip(frames.tolist(), current_holders.tolist())
+            ], dtype=np.int64)
+
+        return frames, previous_holders, current_holders, previous_teams, current_teams
+
     def detect_passes(self,ball_acquisition,player_assignment):
         """
         Detects successful passes between players of the same team.
 
         Args:
             ball_acquisition (list): A list indicating which player has possession of the ball in each frame.
-            player_assignment (list): A list of dictionaries indicating team assignments for each player
-                in the corresponding frame.
+            player_assignment (list or TrackTable): A list of dictionaries indicating team assignments
+                for each player in the corresponding frame, or a track table with teams.
 
         Returns:
             list: A list where each element indicates if a pass occurred in that frame
                 (-1: no pass, 1: Team 1 pass, 2: Team 2 pass).
         """
-        
-        passes = [-1] * len(ball_acquisition)
-        prev_holder=-1
-        previous_frame=-1
-
-        for frame in range(1, len(ball_acquisition)):
-            if ball_acquisition[frame - 1] != -1:
-                prev_holder = ball_acquisition[frame - 1]
-                previous_frame= frame - 1
-            
-            current_holder = ball_acquisition[frame]
-            
-            if prev_holder != -1 and current_holder != -1 and prev_holder != current_holder:
-                prev_id = prev_holder
-                current_id = current_holder
-
-                prev_team = player_assignment[previous_frame].get(prev_id, -1)
-                current_team = player_assignment[frame].get(current_id, -1)
-                
-                if prev_team == current_team and prev_team != -1:
-                    passes[frame] = prev_team
-
-        return passes
+        passes = np.full(len(ball_acquisition), -1, dtype=np.int64)
+        frames, _, _, previous_teams, current_teams = self.detect_possession_changes(ball_acquisition, player_assignment)
+
+        is_pass = (previous_teams == current_teams) & (previous_teams != -1)
+        passes[frames[is_pass]] = previous_teams[is_pass]
+        return passes.tolist()
 
     def detect_interceptions(self,ball_acquisition,player_assignment):
         """
@@ -50,31 +82,55 @@ class PassAndInterceptionDetector():
 
         Args:
             ball_acquisition (list): A list indicating which player has possession of the ball in each frame.
-            player_assignment (list): A list of dictionaries indicating team assignments for each player
-                in the corresponding frame.
+            player_assignment (list or TrackTable): A list of dictionaries indicating team assignments
+                for each player in the corresponding frame, or a track table with teams.
 
         Returns:
             list: A list where each element indicates if an interception occurred in that frame
                 (-1: no interception, 1: Team 1 interception, 2: Team 2 interception).
         """
-        interceptions = [-1] * len(ball_acquisition)
-        prev_holder=-1
-        previous_frame=-1
-        
-        for frame in range(1, len(ball_acquisition)):
-            if ball_acquisition[frame - 1] != -1:
-                prev_holder = ball_acquisition[frame - 1]
-                previous_frame= frame - 1
-
-            current_holder = ball_acquisition[frame]
-            
-            if prev_holder != -1 and current_holder != -1 and prev_holder != current_holder:
-                prev_id = prev_holder
-                current_id = current_holder
-
-                prev_team = player_assignment[previous_frame].get(prev_id, -1)
-                current_team = player_assignment[frame].get(current_id, -1)    
-                if prev_team != current_team and prev_team != -1 and current_team != -1:
-                    interceptions[frame] = current_team
-        
-        return interceptions
\ No newline at end of file
+        interceptions = np.full(len(ball_acquisition), -1, dtype=np.int64)
+        frames, _, _, previous_teams, current_teams = self.detect_possession_changes(ball_acquisition, player_assignment)
+
+        is_interception = (previous_teams != current_teams) & (previous_teams != -1) & (current_teams != -1)
+        interceptions[frames[is_interception]] = current_teams[is_interception]
+        return interceptions.tolist()
+
+    def detect_events(self,ball_acquisition,player_assignment,start_frame=0):
+        """
+        Lists every pass and interception with the players involved.
+
+        Args:
+            ball_acquisition (list): A list indicating which player has possession of the ball in each frame.
+            player_assignment (list or TrackTable): A list of dictionaries indicating team assignments
+                for each player in the corresponding frame, or a track table with teams.
+            start_frame (int): Video frame number of the first entry of ball_acquisition.
+
+        Returns:
+            list: One dictionary per event, in frame order, with the keys "frame", "type"
+                ("pass" or "interception"), "team" (the team that got the ball),
+                "from_player" and "to_player".
+        """
+        frames, previous_holders, current_holders, previous_teams, current_teams = self.detect_possession_changes(ball_acquisition, player_assignment)
+
+        is_pass = (previous_teams == current_teams) & (previous_teams != -1)
+        is_interception = (previous_teams != current_teams) & (previous_teams != -1) & (current_teams != -1)
+
+        events = []
+        for frame, from_player, to_player, team, pass_event, interception_event in zip(
+            frames.tolist(),
+            previous_holders.tolist(),
+            current_holders.tolist(),
+            current_teams.tolist(),
+            is_pass.tolist(),
+            is_interception.tolist()
+        ):
+            if pass_event or interception_event:
+                events.append({
+                    "frame": start_frame + frame,
+                    "type": "pass" if pass_event else "interception",
+                    "team": team,
+                    "from_player": from_player,
+                    "to_player": to_player,
+                })
+        return events
@@ -1,7 +1,8 @@
+import itertools
 import cv2
 import numpy as np
 import pandas as pd
-from collections import deque, Counter
+from collections import deque, Counter, OrderedDict
 import pytesseract
 pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
 
@@ -57,13 +58,28 @@ def parse_clock_to_seconds(clk_str):
 # ========== OCR Extractor ==========
 
 class ScoreTimeExtractor:
-    def __init__(self, score_bbox_1, score_bbox_2, clock_bbox, quarter_bbox, use_easyocr=False):
+    # The scoreboard rarely changes between frames, so OCR only runs when an ROI changed:
+    # a ROI whose thresholded crop barely moved since the last frame reuses its last text,
+    # and otherwise the text is looked up in an LRU cache keyed by a hash of that crop.
+    # Both checks work on the CLAHE + Otsu binary crop, so sensor noise and compression
+    # artifacts in the raw pixels do not count as a change.
+    def __init__(self, score_bbox_1, score_bbox_2, clock_bbox, quarter_bbox, use_easyocr=False,
+                 cache_size=256, change_threshold=2.0, hash_size=(32, 16)):
         self.score_bbox_1 = score_bbox_1
         self.score_bbox_2 = score_bbox_2
         self.clock_bbox = clock_bbox
         self.quarter_bbox = quarter_bbox
         self.use_easyocr = use_easyocr and EASY_OCR_AVAILABLE
 
+        self.cache_size = cache_size
+        self.change_threshold = change_threshold  # mean absolute difference of crop thumbnails
+        self.hash_size = hash_size
+        self.ocr_cache = OrderedDict()  # (config, crop hash) -> text
+        self.last_results = {}  # (bbox, config) -> (crop thumbnail, text)
+        self.num_ocr_calls = 0
+        self.num_cache_hits = 0
+        self.num_unchanged = 0
+
     def enhance_and_crop(self, frame, bbox):
         x1, y1, x2, y2 = bbox
         roi = frame[y1:y2, x1:x2]
@@ -76,14 +92,50 @@ class ScoreTimeExtractor:
         _, thresh = cv2.threshold(enhanced, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
         return roi, thresh
 
-    def extract_text(self, frame, bbox, config):
-        roi, thresh = self.enhance_and_crop(frame, bbox)
+    def roi_thumbnail(self, thresh):
+        # Downscaled thresholded crop, averaging away single-pixel noise
+        return cv2.resize(thresh, self.hash_size, interpolation=cv2.INTER_AREA)
+
+    def roi_hash(self, thumbnail):
+        return np.packbits(thumbnail > 127).tobytes()
+
+    def roi_unchanged(self, thumbnail, last_thumbnail):
+        if last_thumbnail is None:
+            return False
+        return cv2.absdiff(thumbnail, last_thumbnail).mean() < self.change_threshold
+
+    def run_ocr(self, roi, thresh, config):
+        self.num_ocr_calls += 1
         if self.use_easyocr:
             result = easyocr_reader.readtext(roi)
             return result[0][1].strip() if result else ""
         else:
             return pytesseract.image_to_string(thresh, config=config).strip()
 
+    def extract_text(self, frame, bbox, config):
+        roi, thresh = self.enhance_and_crop(frame, bbox)
+        thumbnail = self.roi_thumbnail(thresh)
+
+        # Unchanged crop: reuse the last text without a cache lookup
+        last_thumbnail, last_text = self.last_results.get((bbox, config), (None, None))
+        if self.roi_unchanged(thumbnail, last_thumbnail):
+            self.num_unchanged += 1
+            return last_text
+
+        key = (config, self.roi_hash(thumbnail))
+        text = self.ocr_cache.get(key)
+        if text is not None:
+            self.num_cache_hits += 1
+            self.ocr_cache.move_to_end(key)
+        else:
+            text = self.run_ocr(roi, thresh, config)
+            self.ocr_cache[key] = text
+            if len(self.ocr_cache) > self.cache_size:
+                self.ocr_cache.popitem(last=False)
+
+        self.last_results[(bbox, config)] = (thumbnail, text)
+        return text
+
     def extract(self, frame):
         s1 = self.extract_text(frame, self.score_bbox_1, "--psm 7 -c tessedit_char_whitelist=0123456789")
         s2 = self.extract_text(frame, self.score_bbox_2, "--psm 7 -c tessedit_char_whitelist=0123456789")
@@ -119,9 +171,17 @@ class LogisticWinProbabilityModel:
 def overlay_win_probability_on_frames(video_frames, coef_csv_path, team1_abbr="LAL", team2_abbr="LAC"):
     if not video_frames:
         return []
+    return list(iter_win_probability_overlay(video_frames, coef_csv_path, team1_abbr, team2_abbr))
+
+def iter_win_probability_overlay(video_frames, coef_csv_path, team1_abbr="LAL", team2_abbr="LAC"):
+    # Lazy variant for frame streams: frames are drawn on and yielded one at a time
+    video_frames = iter(video_frames)
+    first_frame = next(video_frames, None)
+    if first_frame is None:
+        return
 
     ref_width, ref_height = 1920, 1080
-    h, w = video_frames[0].shape[:2]
+    h, w = first_frame.shape[:2]
     scale_x = w / ref_width
     scale_y = h / ref_height
 
@@ -145,7 +205,7 @@ def overlay_win_probability_on_frames(video_frames, coef_csv_path, team1_abbr="L
     buffer_len = 5
     s1_deque, s2_deque, clk_deque, qtr_deque = deque(maxlen=buffer_len), deque(maxlen=buffer_len), deque(maxlen=buffer_len), deque(maxlen=buffer_len)
 
-    for i, frame in enumerate(video_frames):
+    for i, frame in enumerate(itertools.chain([first_frame], video_frames)):
         try:
             s1, s2, clock, qtr = extractor.extract(frame)
             s1_deque.append(s1)
@@ -184,7 +244,7 @@ def overlay_win_probability_on_frames(video_frames, coef_csv_path, team1_abbr="L
             print(f"Frame {i} OCR error: {e}")
             cv2.putText(frame, "OCR FAIL", (30, 50), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 0, 255), 2)
 
-    return video_frames
+        yield frame
 # Add this at the end of predictor.py
 def extract_game_context_from_frame(frame, coeff_path):
     raw_bboxes = {
@@ -1 +1,2 @@
-from .speed_and_distance_calculator import SpeedAndDistanceCalculator
\ No newline at end of file
+from .speed_and_distance_calculator import SpeedAndDistanceCalculator
+from .movement_ledger import MovementLedger
\ No newline at end of file
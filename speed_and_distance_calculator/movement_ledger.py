@@ -0,0 +1,141 @@
+class MovementLedger:
+    """
+    Per-player cumulative movement statistics, updated once per frame.
+
+    The ledger keeps a running record of every player (total distance, current and maximum
+    speed, time on court and number of sprints) and a snapshot of the players seen in each
+    frame, so the statistics at any frame index are a single lookup. The speed and distance
+    calculator fills it and the drawer and reports read from it, instead of each of them
+    summing the per-frame distances again.
+
+    Attributes:
+        fps (float): Frames per second of the video, used for the time on court.
+        sprint_speed (float): Speed in km/h above which a player is sprinting. Every time a
+            player goes above it counts as one sprint.
+        start_frame (int): Frame index of the oldest snapshot still kept.
+        players (dict): Latest statistics of every player seen so far.
+    """
+    def __init__(self, fps=30, sprint_speed=20.0):
+        self.fps = fps
+        self.sprint_speed = sprint_speed
+        self.start_frame = 0
+        self.players = {}
+        self.snapshots = []
+
+    def __len__(self):
+        """Number of frames recorded so far."""
+        return self.start_frame + len(self.snapshots)
+
+    def update(self, frame_distances, frame_speeds, player_ids=()):
+        """
+        Record the next frame.
+
+        Args:
+            frame_distances (dict): Distance in meters per player covered in this frame.
+            frame_speeds (dict): Speed in km/h per player in this frame.
+            player_ids (iterable): Further players on court in this frame, e.g. the tracked
+                players that could not be projected. They count towards time on court and
+                get a snapshot if they have been seen before.
+
+        Returns:
+            int: The index of the recorded frame.
+        """
+        frame_player_ids = set(player_ids) | frame_distances.keys() | frame_speeds.keys()
+        snapshot = {}
+
+        for player_id in frame_player_ids:
+            stats = self.players.get(player_id)
+            if stats is None:
+                if player_id not in frame_distances:
+                    continue
+                stats = self.players[player_id] = {
+                    "total_distance": 0.0,
+                    "speed": None,
+                    "last_speed": None,
+                    "max_speed": 0.0,
+                    "frames_on_court": 0,
+                    "sprints": 0,
+                }
+
+            stats["total_distance"] += frame_distances.get(player_id, 0.0)
+            stats["frames_on_court"] += 1
+
+            speed = frame_speeds.get(player_id)
+            if speed is not None:
+                # Compare with the last known speed, so frames without a speed (e.g. a
+                # homography dropout) do not split one sprint into two
+                if speed > self.sprint_speed and (stats["last_speed"] or 0) <= self.sprint_speed:
+                    stats["sprints"] += 1
+                stats["max_speed"] = max(stats["max_speed"], speed)
+                stats["last_speed"] = speed
+            stats["speed"] = speed
+
+            snapshot[player_id] = (
+                stats["total_distance"],
+                speed,
+                stats["max_speed"],
+                stats["frames_on_court"],
+                stats["sprints"],
+            )
+
+        self.snapshots.append(snapshot)
+        return len(self) - 1
+
+    def get(self, frame_idx, player_id):
+        """
+        Statistics of a player as of a frame.
+
+        Args:
+            frame_idx (int): Frame index.
+            player_id (int): Track ID of the player.
+
+        Returns:
+            dict or None: "total_distance" (m), "speed" (km/h, None without a speed in that
+                frame), "max_speed" (km/h), "time_on_court" (s) and "sprints", or None if the
+                player was not recorded in that frame.
+        """
+        index = frame_idx - self.start_frame
+        if not 0 <= index < len(self.snapshots):
+            return None
+        snapshot = self.snapshots[index].get(player_id)
+        if snapshot is None:
+            return None
+
+        total_distance, speed, max_speed, frames_on_court, sprints = snapshot
+        return {
+            "total_distance": total_distance,
+            "speed": speed,
+            "max_speed": max_speed,
+            "time_on_court": frames_on_court / self.fps,
+            "sprints": sprints,
+        }
+
+    def summary(self):
+        """
+        Latest statistics of every player, e.g. for end of game reports.
+
+        Returns:
+            dict: Mapping of player_id to a dictionary with the keys of get.
+        """
+        return {
+            player_id: {
+                "total_distance": stats["total_distance"],
+                "speed": stats["speed"],
+                "max_speed": stats["max_speed"],
+                "time_on_court": stats["frames_on_court"] / self.fps,
+                "sprints": stats["sprints"],
+            }
+            for player_id, stats in self.players.items()
+        }
+
+    def forget_before(self, frame_idx):
+        """
+        Drop the snapshots of frames before frame_idx to bound memory in streaming mode.
+        The running statistics of the players are kept.
+
+        Args:
+            frame_idx (int): First frame index whose snapshot must stay available.
+        """
+        num_dropped = min(max(frame_idx - self.start_frame, 0), len(self.snapshots))
+        del self.snapshots[:num_dropped]
+        self.start_frame += num_dropped
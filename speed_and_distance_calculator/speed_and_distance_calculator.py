@@ -3,7 +3,11 @@ import sys
 import pathlib
 folder_path = pathlib.Path(__file__).parent.resolve()
 sys.path.append(os.path.join(folder_path,"../"))
+from collections import deque
+import numpy as np
 from utils.bbox_utils import measure_distance
+from trackers.track_table import TrackTable
+from .movement_ledger import MovementLedger
 
 
 class SpeedAndDistanceCalculator():
@@ -20,25 +24,73 @@ class SpeedAndDistanceCalculator():
         self.width_in_meters = width_in_meters
         self.height_in_meters= height_in_meters
 
+        # Speeds look back over the last speed_window_frames frames and need at least
+        # min_speed_frames distances inside that window
+        self.min_speed_frames = 5
+        self.speed_window_frames = self.min_speed_frames * 3
+
     def calculate_distance(self,
-                            tactical_player_positions
+                            tactical_player_positions,
+                            previous_players_position=None
                             ):
-        previous_players_position = {}
-        output_distances =[]
+        # previous_players_position can be passed in to carry the last known
+        # positions across consecutive chunks of a video
+        player_table = TrackTable.from_positions(tactical_player_positions)
+        distances = self.calculate_distance_in_table(player_table, previous_players_position)
+        return player_table.column_to_dicts(distances)
 
-        for frame_number, tactical_player_position_frame in enumerate(tactical_player_positions):
-            output_distances.append({})
+    def calculate_distance_in_table(self, player_table, previous_players_position=None):
+        """
+        Distance covered by every player since their previous tactical position.
 
-            for player_id, current_player_position in tactical_player_position_frame.items():
-                # Calculate distance
-                if player_id in previous_players_position:
-                    previous_position = previous_players_position[player_id]
-                    meter_distance = self.calculate_meter_distance(previous_position, current_player_position)
-                    output_distances[frame_number][player_id] = meter_distance
+        All positions are sorted by player and frame once, so the distance of every row
+        is the step from the row before it of the same player.
 
-                previous_players_position[player_id]=current_player_position
-        
-        return output_distances
+        Args:
+            player_table (TrackTable): Player tracks with the tactical position column filled.
+            previous_players_position (dict, optional): Last known tactical position of each
+                player before the first frame. Updated in place with the last positions.
+
+        Returns:
+            numpy.ndarray: Distances in meters of shape (F, S), NaN where the player has no
+                position or no earlier position.
+        """
+        if previous_players_position is None:
+            previous_players_position = {}
+
+        positions = player_table.tactical_positions
+        present = player_table.valid & ~np.isnan(positions).any(axis=2)
+        frames, slots = np.nonzero(present)
+        player_ids = player_table.track_ids[frames, slots]
+        pixel_positions = positions[frames, slots]
+
+        # Carried positions act as rows of frame -1
+        if previous_players_position:
+            carried_ids = np.array(list(previous_players_position.keys()), dtype=np.int64)
+            carried_positions = np.array(list(previous_players_position.values()), dtype=np.float64).reshape(-1, 2)
+            frames = np.concatenate([np.full(len(carried_ids), -1), frames])
+            slots = np.concatenate([np.full(len(carried_ids), -1), slots])
+            player_ids = np.concatenate([carried_ids, player_ids])
+            pixel_positions = np.concatenate([carried_positions, pixel_positions])
+
+        order = np.lexsort((frames, player_ids))
+        player_ids = player_ids[order]
+        meter_positions = pixel_positions[order] * np.array([self.width_in_meters, self.height_in_meters]) / np.array([self.width_in_pixels, self.height_in_pixels])
+
+        same_player = player_ids[1:] == player_ids[:-1]
+        steps = meter_positions[1:] - meter_positions[:-1]
+        meter_distances = np.sqrt(steps[:, 0] ** 2 + steps[:, 1] ** 2) * 0.4
+
+        distances = np.full(player_table.track_ids.shape, np.nan)
+        later_rows = order[1:][same_player]
+        distances[frames[later_rows], slots[later_rows]] = meter_distances[same_player]
+
+        # Remember the last position of every player for the next chunk
+        last_rows = np.append(~same_player, True) if len(player_ids) else np.zeros(0, dtype=bool)
+        for player_id, position in zip(player_ids[last_rows].tolist(), pixel_positions[order][last_rows].tolist()):
+            previous_players_position[player_id] = position
+
+        return distances
 
     def calculate_meter_distance(self,previous_pixel_position, current_pixel_position):
          # using width_in_pixels,height_in_pixels and width_in_meters,height_in_meters Calculate the meter distance betweent current position and previous position
@@ -60,7 +112,7 @@ class SpeedAndDistanceCalculator():
 
     def calculate_speed(self, distances, fps=30):
         """
-        Calculate player speeds based on distances covered over the last 5 frames.
+        Calculate player speeds based on distances covered over the last 15 frames.
         
         Args:
             distances (list): List of dictionaries containing distance per player per frame,
@@ -71,42 +123,125 @@ class SpeedAndDistanceCalculator():
             list: List of dictionaries where each dictionary maps player_id to their
                 speed in km/h at that frame.
         """
-        speeds = []
-        window_size = 5  # Look at last 5 frames for speed calculation
-        
-        # Calculate speed for each frame and player
-        for frame_idx in range(len(distances)):
-            speeds.append({})
-            # For each player in current frame
-            for player_id in distances[frame_idx].keys():
-                # Look back window_size frames or fewer if at the beginning
-                start_frame = max(0, frame_idx - (window_size * 3) + 1)
-                
-                total_distance = 0
-                frames_present = 0
-                last_frame_present = None
-                
-                # Calculate total distance in the window
-                for i in range(start_frame, frame_idx + 1):
-                    if player_id in distances[i]:
-                        if last_frame_present is not None:
-                            total_distance += distances[i][player_id]
-                            frames_present += 1
-                        last_frame_present = i
-                
-                # Calculate speed only if player was present in at least two frames
-                if frames_present >= window_size:
-                    # Calculate time in hours (convert frames to hours)
-                    time_in_seconds = frames_present / fps
-                    time_in_hours = time_in_seconds / 3600
-                    
-                    # Calculate speed in km/h
-                    if time_in_hours > 0:
-                        speed_kmh = (total_distance / 1000) / time_in_hours
-                        speeds[frame_idx][player_id] = speed_kmh
-                    else:
-                        speeds[frame_idx][player_id] = 0
-                else:
-                    speeds[frame_idx][player_id] = 0
-        
-        return speeds
\ No newline at end of file
+        player_table, distance_column = TrackTable.from_column_dicts(distances)
+        speeds = self.calculate_speed_in_table(player_table, distance_column, fps)
+        return player_table.column_to_dicts(speeds)
+
+    def calculate_speed_in_table(self, player_table, distances, fps=30):
+        """
+        Speed of every player from per-player prefix sums of their distances.
+
+        The distances are sorted by player and frame, so the window of a row is a range of
+        rows of the same player found with one binary search, and its total distance is a
+        difference of cumulative sums. The first distance of each window is left out, as
+        in the original frame-by-frame scan.
+
+        Args:
+            player_table (TrackTable): Player tracks the distances belong to.
+            distances (numpy.ndarray): Distances in meters of shape (F, S) from
+                calculate_distance_in_table, NaN where the player has no distance.
+            fps (float): Frames per second of the video, used to calculate elapsed time.
+
+        Returns:
+            numpy.ndarray: Speeds in km/h of shape (F, S), 0 where the player has fewer than
+                min_speed_frames distances in the window and NaN where it has no distance.
+        """
+        present = player_table.valid & ~np.isnan(distances)
+        frames, slots = np.nonzero(present)
+        player_ids = player_table.track_ids[frames, slots]
+
+        order = np.lexsort((frames, player_ids))
+        frames, slots = frames[order], slots[order]
+        _, player_ranks = np.unique(player_ids[order], return_inverse=True)
+        cumulative_distances = np.concatenate([[0.0], np.cumsum(distances[frames, slots])])
+
+        # Rows are sorted by this key, so every window is one contiguous range of rows
+        keys = player_ranks * (player_table.num_frames + 1) + frames
+        window_starts = np.maximum(frames - self.speed_window_frames + 1, 0)
+        first_rows = np.searchsorted(keys, player_ranks * (player_table.num_frames + 1) + window_starts, side='left')
+
+        rows = np.arange(len(keys))
+        frames_present = rows - first_rows
+        total_distance = cumulative_distances[rows + 1] - cumulative_distances[first_rows + 1]
+
+        # Calculate time in hours (convert frames to hours) and speed in km/h
+        time_in_hours = frames_present / fps / 3600
+        with np.errstate(divide='ignore', invalid='ignore'):
+            row_speeds = np.where(frames_present >= self.min_speed_frames, (total_distance / 1000) / time_in_hours, 0.0)
+
+        speeds = np.full(distances.shape, np.nan)
+        speeds[frames, slots] = row_speeds
+        return speeds
+
+    def calculate_speed_online(self, frame_distances, speed_state, fps=30):
+        """
+        Speeds of one new frame, updating per-player running windows in constant time.
+
+        Gives the same speeds as calculate_speed for live use, where frames arrive one at
+        a time and the whole distance history is not kept.
+
+        Args:
+            frame_distances (dict): Distance per player of the new frame, as one entry of the
+                output of calculate_distance.
+            speed_state (dict): State carried between frames, initially
+                {"frame": 0, "windows": {}}. Updated in place.
+            fps (float): Frames per second of the video, used to calculate elapsed time.
+
+        Returns:
+            dict: Mapping of player_id to their speed in km/h at the new frame.
+        """
+        frame_idx = speed_state["frame"]
+        windows = speed_state["windows"]
+        speeds = {}
+
+        for player_id, distance in frame_distances.items():
+            # Window of (frame, distance) entries and their running sum
+            window = windows.setdefault(player_id, [deque(), 0.0])
+            entries = window[0]
+            entries.append((frame_idx, distance))
+            window[1] += distance
+            while entries[0][0] <= frame_idx - self.speed_window_frames:
+                window[1] -= entries.popleft()[1]
+
+            frames_present = len(entries) - 1
+            if frames_present >= self.min_speed_frames:
+                time_in_hours = frames_present / fps / 3600
+                total_distance = window[1] - entries[0][1]
+                speeds[player_id] = (total_distance / 1000) / time_in_hours
+            else:
+                speeds[player_id] = 0
+
+        # Drop the windows of players that left, their entries would all be popped anyway
+        stale_ids = [
+            player_id for player_id, (entries, _) in windows.items()
+            if entries[-1][0] <= frame_idx - self.speed_window_frames
+        ]
+        for player_id in stale_ids:
+            del windows[player_id]
+
+        speed_state["frame"] = frame_idx + 1
+        return speeds
+
+    def build_movement_ledger(self, player_distances_per_frame, player_speed_per_frame, player_tracks=None, fps=30, movement_ledger=None):
+        """
+        Record per-frame distances and speeds in a movement ledger, one update per frame.
+
+        Args:
+            player_distances_per_frame (list): Distance per player per frame from calculate_distance.
+            player_speed_per_frame (list): Speed per player per frame from calculate_speed.
+            player_tracks (list, optional): Player tracks per frame. Tracked players count
+                towards time on court even in frames without a distance.
+            fps (float): Frames per second of the video.
+            movement_ledger (MovementLedger, optional): Ledger to extend, e.g. across chunks
+                of a video. A new one is created if None.
+
+        Returns:
+            MovementLedger: The updated ledger.
+        """
+        if movement_ledger is None:
+            movement_ledger = MovementLedger(fps)
+
+        for frame_num, (frame_distances, frame_speeds) in enumerate(zip(player_distances_per_frame, player_speed_per_frame)):
+            player_ids = player_tracks[frame_num].keys() if player_tracks is not None else ()
+            movement_ledger.update(frame_distances, frame_speeds, player_ids)
+        return movement_ledger
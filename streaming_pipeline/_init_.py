@@ -0,0 +1,3 @@
+from .streaming_pipeline import StreamingPipeline
+from .streaming_renderer import StreamingRenderer
+from .video_stream import read_video_stream, save_video_stream, iter_frame_windows
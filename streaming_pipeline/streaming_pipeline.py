@@ -0,0 +1,246 @@
+import sys
+sys.path.append('../')
+from trackers.track_table import TrackTable
+from speed_and_distance_calculator.movement_ledger import MovementLedger
+from .video_stream import iter_frame_windows
+
+
+class StreamingPipeline:
+    """
+    Runs detection, tracking, team assignment, possession and tactical analysis over a
+    video as a chain of generators.
+
+    Frames are pulled through the stages one window at a time, so memory is bounded by
+    the window size instead of the video length. Every stage carries the small amount of
+    state it needs across window boundaries (ByteTrack state, last ball position,
+    possession streaks, last ball holder, last tactical positions), so the results match
+    the whole-video methods as closely as possible. Speeds are updated online one frame at
+    a time.
+
+    If an InferenceScheduler is given, the three detectors share its letterboxed batches.
+    Its models must be registered as "ball" and "court_keypoints", and as "players" unless
+    the player tracker runs in keyframe mode and detects on its own.
+
+    Attributes:
+        window_size (int): Number of frames processed together by each stage.
+        movement_ledger (MovementLedger): Running movement statistics of every player,
+            updated once per frame by the tactical stage.
+    """
+    def __init__(self,
+                 player_tracker,
+                 ball_tracker,
+                 court_keypoint_detector,
+                 team_assigner,
+                 ball_aquisition_detector,
+                 pass_and_interception_detector,
+                 tactical_view_converter,
+                 speed_and_distance_calculator,
+                 window_size=64,
+                 fps=30,
+                 inference_scheduler=None):
+        """
+        Initialize the StreamingPipeline with the per-stage components.
+
+        Args:
+            player_tracker (PlayerTracker): Player detector and tracker.
+            ball_tracker (BallTracker): Ball detector.
+            court_keypoint_detector (CourtKeypointDetector): Court keypoint detector.
+            team_assigner (TeamAssigner): Jersey based team assigner.
+            ball_aquisition_detector (BallAquisitionDetector): Possession detector.
+            pass_and_interception_detector (PassAndInterceptionDetector): Pass and interception detector.
+            tactical_view_converter (TacticalViewConverter): Converter to tactical view coordinates.
+            speed_and_distance_calculator (SpeedAndDistanceCalculator): Speed and distance calculator.
+            window_size (int): Number of frames processed together by each stage.
+            fps (float): Frames per second of the video, used for speed calculation.
+            inference_scheduler (InferenceScheduler, optional): Shared batched inference for
+                the three detectors. If None, each detector runs its own model.
+        """
+        self.player_tracker = player_tracker
+        self.ball_tracker = ball_tracker
+        self.court_keypoint_detector = court_keypoint_detector
+        self.team_assigner = team_assigner
+        self.ball_aquisition_detector = ball_aquisition_detector
+        self.pass_and_interception_detector = pass_and_interception_detector
+        self.tactical_view_converter = tactical_view_converter
+        self.speed_and_distance_calculator = speed_and_distance_calculator
+        self.inference_scheduler = inference_scheduler
+
+        self.window_size = window_size
+        self.fps = fps
+        self.movement_ledger = MovementLedger(fps)
+
+    def stream_windows(self, frames):
+        """
+        Pull a stream of frames through every analysis stage.
+
+        Args:
+            frames (iterable): Iterable of video frames, e.g. from read_video_stream.
+
+        Yields:
+            dict: One analysed window with the keys "start_frame", "frames", "player_tracks",
+                "ball_tracks", "court_keypoints", "player_assignment", "ball_aquisition",
+                "passes", "interceptions", "pass_events", "court_keypoints_per_frame", "homography_store",
+                "tactical_player_positions", "player_distances_per_frame",
+                "player_speed_per_frame" and "movement_ledger". Every per-frame list has one
+                entry per frame of the window.
+        """
+        windows = iter_frame_windows(frames, self.window_size)
+        windows = self.detection_stage(windows)
+        windows = self.team_assignment_stage(windows)
+        windows = self.possession_stage(windows)
+        windows = self.tactical_stage(windows)
+        return windows
+
+    def detection_stage(self, windows):
+        """
+        Detect and track players, the ball and the court keypoints for each window.
+
+        The ball is cleaned with remove_wrong_detections and interpolate_ball_positions,
+        using the last ball position of the previous window as an anchor.
+
+        Args:
+            windows (iterable): Iterable of (start_frame, frames) tuples.
+
+        Yields:
+            dict: Window with "start_frame", "frames", "player_tracks", "ball_tracks"
+                and "court_keypoints".
+        """
+        last_ball_track = None
+        for start_frame, frames in windows:
+            if self.inference_scheduler is not None:
+                detections = self.inference_scheduler.run(frames)
+                if "players" in detections:
+                    player_tracks = self.player_tracker.track_detections(detections["players"])
+                else:
+                    player_tracks = self.player_tracker.track_frames(frames)
+                ball_tracks = self.ball_tracker.track_detections(detections["ball"])
+                court_keypoints = self.court_keypoint_detector.keypoints_from_detections(detections["court_keypoints"])
+            else:
+                player_tracks = self.player_tracker.track_frames(frames)
+                ball_tracks = self.ball_tracker.track_frames(frames)
+                court_keypoints = self.court_keypoint_detector.detect_keypoints(frames)
+
+            if last_ball_track is not None:
+                ball_tracks = [last_ball_track] + ball_tracks
+            ball_tracks = self.ball_tracker.remove_wrong_detections(ball_tracks)
+            ball_tracks = self.ball_tracker.interpolate_ball_positions(ball_tracks)
+            if last_ball_track is not None:
+                ball_tracks = ball_tracks[1:]
+            last_ball_track = ball_tracks[-1]
+
+            yield {
+                "start_frame": start_frame,
+                "frames": frames,
+                "player_tracks": player_tracks,
+                "ball_tracks": ball_tracks,
+                "court_keypoints": court_keypoints,
+            }
+
+    def team_assignment_stage(self, windows):
+        """
+        Assign every tracked player of each window to a team.
+
+        Args:
+            windows (iterable): Iterable of windows from detection_stage.
+
+        Yields:
+            dict: The same window with "player_assignment" added.
+        """
+        self.team_assigner.load_model()
+        for window in windows:
+            window["player_assignment"] = self.team_assigner.get_player_teams_for_frames(
+                window["frames"],
+                window["player_tracks"],
+                window["start_frame"]
+            )
+            yield window
+
+    def possession_stage(self, windows):
+        """
+        Detect ball possession, passes and interceptions for each window.
+
+        Passes and interceptions look at the previous ball holder, so the last holder of the
+        previous window and its team are prepended as a single anchor frame.
+
+        Args:
+            windows (iterable): Iterable of windows from team_assignment_stage.
+
+        Yields:
+            dict: The same window with "ball_aquisition", "passes", "interceptions" and
+                "pass_events" added. Pass events carry video frame numbers.
+        """
+        possession_state = {"candidate": -1, "count": 0}
+        last_holder = -1
+        last_holder_assignment = {}
+        for window in windows:
+            ball_aquisition = self.ball_aquisition_detector.detect_possession_in_table(
+                TrackTable.from_tracks(window["player_tracks"]),
+                TrackTable.from_tracks(window["ball_tracks"]),
+                possession_state
+            ).tolist()
+
+            anchored_aquisition = [last_holder] + ball_aquisition
+            anchored_assignment = [last_holder_assignment] + window["player_assignment"]
+            passes = self.pass_and_interception_detector.detect_passes(anchored_aquisition, anchored_assignment)
+            interceptions = self.pass_and_interception_detector.detect_interceptions(anchored_aquisition, anchored_assignment)
+            # The anchor frame sits just before the window
+            pass_events = self.pass_and_interception_detector.detect_events(anchored_aquisition, anchored_assignment, window["start_frame"] - 1)
+
+            for holder, assignment in zip(ball_aquisition, window["player_assignment"]):
+                if holder != -1:
+                    last_holder = holder
+                    last_holder_assignment = {holder: assignment.get(holder, -1)}
+
+            window["ball_aquisition"] = ball_aquisition
+            window["passes"] = passes[1:]
+            window["interceptions"] = interceptions[1:]
+            window["pass_events"] = pass_events
+            yield window
+
+    def tactical_stage(self, windows):
+        """
+        Convert players to tactical view coordinates and compute distances and speeds.
+
+        Args:
+            windows (iterable): Iterable of windows from possession_stage.
+
+        Yields:
+            dict: The same window with "court_keypoints_per_frame", "homography_store",
+                "tactical_player_positions", "player_distances_per_frame",
+                "player_speed_per_frame" and "movement_ledger" added.
+        """
+        previous_players_position = {}
+        speed_state = {"frame": 0, "windows": {}}
+        first_window = True
+        for window in windows:
+            court_keypoints_per_frame = self.tactical_view_converter.validate_keypoints(window["court_keypoints"])
+            # Only the first window starts a new video, the others continue the tracked homography
+            homography_store = self.tactical_view_converter.build_homography_store(
+                court_keypoints_per_frame,
+                window["start_frame"],
+                reset=first_window
+            )
+            first_window = False
+            player_table = TrackTable.from_tracks(window["player_tracks"])
+            self.tactical_view_converter.project_table_to_tactical_view(homography_store, player_table)
+            tactical_player_positions = player_table.tactical_positions_to_dicts()
+
+            player_distances_per_frame = player_table.column_to_dicts(
+                self.speed_and_distance_calculator.calculate_distance_in_table(
+                    player_table,
+                    previous_players_position=previous_players_position
+                )
+            )
+            player_speed_per_frame = []
+            for frame_distances, frame_tracks in zip(player_distances_per_frame, window["player_tracks"]):
+                frame_speeds = self.speed_and_distance_calculator.calculate_speed_online(frame_distances, speed_state, fps=self.fps)
+                self.movement_ledger.update(frame_distances, frame_speeds, frame_tracks.keys())
+                player_speed_per_frame.append(frame_speeds)
+
+            window["court_keypoints_per_frame"] = court_keypoints_per_frame
+            window["homography_store"] = homography_store
+            window["tactical_player_positions"] = tactical_player_positions
+            window["player_distances_per_frame"] = player_distances_per_frame
+            window["player_speed_per_frame"] = player_speed_per_frame
+            window["movement_ledger"] = self.movement_ledger
+            yield window
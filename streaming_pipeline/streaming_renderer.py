@@ -0,0 +1,134 @@
+import sys
+sys.path.append('../')
+from drawers.frame_compositor import FrameCompositor
+
+
+class StreamingRenderer:
+    """
+    Draws the analysis overlays on windows produced by StreamingPipeline.
+
+    All drawers are registered as layers of a FrameCompositor, so each frame is copied
+    once. Stateless drawers get the window's data. Drawers that show values accumulated
+    since the start of the game (ball control, passes) get the accumulated state kept
+    here, so the output matches the whole-video drawing. Ball control, passes and
+    interceptions only carry the last rows of their cumulative counts, never per-frame
+    history. Distances and speeds are read from the pipeline's MovementLedger, whose
+    per-frame snapshots are dropped once a window is drawn.
+    """
+    def __init__(self,
+                 player_tracks_drawer,
+                 ball_tracks_drawer,
+                 court_keypoint_drawer,
+                 frame_number_drawer,
+                 team_ball_control_drawer,
+                 pass_and_interceptions_drawer,
+                 speed_and_distance_drawer,
+                 tactical_view_drawer,
+                 tactical_view_converter,
+                 heatmap_overlay_drawer=None,
+                 num_workers=1):
+        self.player_tracks_drawer = player_tracks_drawer
+        self.ball_tracks_drawer = ball_tracks_drawer
+        self.court_keypoint_drawer = court_keypoint_drawer
+        self.frame_number_drawer = frame_number_drawer
+        self.team_ball_control_drawer = team_ball_control_drawer
+        self.pass_and_interceptions_drawer = pass_and_interceptions_drawer
+        self.speed_and_distance_drawer = speed_and_distance_drawer
+        self.tactical_view_drawer = tactical_view_drawer
+        self.tactical_view_converter = tactical_view_converter
+        # Optional live heatmap layer, it keeps its own running heatmap across windows
+        self.heatmap_overlay_drawer = heatmap_overlay_drawer
+        # Number of threads rendering the frames of a window, see FrameCompositor.render_parallel
+        self.num_workers = num_workers
+
+        self.ball_control_counts = None
+        self.pass_and_interception_counts = None
+
+        self.court_image = self.tactical_view_drawer.load_court_image(
+            self.tactical_view_converter.court_image_path,
+            self.tactical_view_converter.width,
+            self.tactical_view_converter.height
+        )
+
+    def render(self, windows):
+        """
+        Render every analysed window.
+
+        Args:
+            windows (iterable): Iterable of windows from StreamingPipeline.stream_windows.
+
+        Yields:
+            list: The rendered frames of each window.
+        """
+        for window in windows:
+            yield self.render_window(window)
+
+    def render_window(self, window):
+        """
+        Draw all overlays on the frames of a single window.
+
+        Args:
+            window (dict): An analysed window from StreamingPipeline.stream_windows.
+
+        Returns:
+            list: The rendered frames of the window.
+        """
+        start_frame = window["start_frame"]
+
+        ball_control_counts = self.team_ball_control_drawer.get_ball_control_counts(
+            self.team_ball_control_drawer.get_team_ball_control(
+                window["player_assignment"],
+                window["ball_aquisition"]
+            ),
+            self.ball_control_counts
+        )
+        if len(ball_control_counts):
+            self.ball_control_counts = ball_control_counts[-1]
+        pass_and_interception_counts = self.pass_and_interceptions_drawer.get_cumulative_stats(
+            window["passes"],
+            window["interceptions"],
+            self.pass_and_interception_counts
+        )
+        if len(pass_and_interception_counts):
+            self.pass_and_interception_counts = pass_and_interception_counts[-1]
+
+        # Window data is indexed from start_frame, accumulated data from frame 0
+        compositor = FrameCompositor()
+        compositor.add_layer(
+            self.player_tracks_drawer,
+            window["player_tracks"],
+            window["player_assignment"],
+            window["ball_aquisition"],
+            frame_offset=start_frame
+        )
+        compositor.add_layer(self.ball_tracks_drawer, window["ball_tracks"], frame_offset=start_frame)
+        compositor.add_layer(self.court_keypoint_drawer, window["court_keypoints_per_frame"], frame_offset=start_frame)
+        compositor.add_layer(self.frame_number_drawer)
+        compositor.add_layer(self.team_ball_control_drawer, ball_control_counts, frame_offset=start_frame)
+        compositor.add_layer(self.pass_and_interceptions_drawer, pass_and_interception_counts, frame_offset=start_frame)
+        compositor.add_layer(
+            self.speed_and_distance_drawer,
+            window["player_tracks"],
+            window["movement_ledger"],
+            ledger_frame_offset=start_frame,
+            frame_offset=start_frame
+        )
+        compositor.add_layer(
+            self.tactical_view_drawer,
+            self.court_image,
+            self.tactical_view_converter.key_points,
+            window["tactical_player_positions"],
+            window["player_assignment"],
+            window["ball_aquisition"],
+            frame_offset=start_frame
+        )
+        if self.heatmap_overlay_drawer is not None:
+            compositor.add_layer(
+                self.heatmap_overlay_drawer,
+                window["tactical_player_positions"],
+                window["player_assignment"],
+                frame_offset=start_frame
+            )
+        output_frames = compositor.draw(window["frames"], start_frame=start_frame, num_workers=self.num_workers)
+        window["movement_ledger"].forget_before(start_frame + len(window["frames"]))
+        return output_frames
@@ -0,0 +1,94 @@
+"""
+Generator based video input/output helpers.
+
+Unlike read_video/save_video, these never hold more than one frame (or one window of
+frames) in memory, which makes it possible to process full games.
+"""
+
+import os
+import cv2
+
+
+def read_video_stream(video_path):
+    """
+    Lazily decode a video file frame by frame.
+
+    Args:
+        video_path (str): Path to the input video.
+
+    Yields:
+        numpy.ndarray: The next decoded BGR frame.
+    """
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise FileNotFoundError(f"Could not open video at {video_path}")
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            yield frame
+    finally:
+        cap.release()
+
+
+def iter_frame_windows(frames, window_size):
+    """
+    Group a stream of frames into consecutive windows.
+
+    Args:
+        frames (iterable): Iterable of video frames.
+        window_size (int): Maximum number of frames per window.
+
+    Yields:
+        tuple: (start_frame, window) where start_frame is the index of the first frame
+            of the window in the whole video and window is a list of frames.
+    """
+    if window_size < 1:
+        raise ValueError("window_size must be at least 1.")
+
+    window = []
+    start_frame = 0
+    for frame in frames:
+        window.append(frame)
+        if len(window) == window_size:
+            yield start_frame, window
+            start_frame += len(window)
+            window = []
+    if window:
+        yield start_frame, window
+
+
+def save_video_stream(frames, output_video_path, fps=24):
+    """
+    Encode frames to a video file as they are produced.
+
+    The writer is opened on the first frame, so the output resolution always matches
+    the rendered frames.
+
+    Args:
+        frames (iterable): Iterable of BGR frames to write.
+        output_video_path (str): Path of the output video.
+        fps (int): Frame rate of the output video.
+
+    Returns:
+        int: Number of frames written.
+    """
+    output_dir = os.path.dirname(output_video_path)
+    if output_dir and not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    fourcc = cv2.VideoWriter_fourcc(*'XVID')
+    out = None
+    num_frames = 0
+    try:
+        for frame in frames:
+            if out is None:
+                height, width = frame.shape[:2]
+                out = cv2.VideoWriter(output_video_path, fourcc, fps, (width, height))
+            out.write(frame)
+            num_frames += 1
+    finally:
+        if out is not None:
+            out.release()
+    return num_frames
@@ -1 +1,4 @@
-from .tactical_view_converter import TacticalViewConverter
\ No newline at end of file
+from .tactical_view_converter import TacticalViewConverter
+from .homography_tracker import HomographyTracker
+from .court_zones import CourtZones
+from .homography_store import HomographyStore
\ No newline at end of file
@@ -0,0 +1,143 @@
+import numpy as np
+
+# Zone labels of the raster maps
+UNKNOWN = 0
+PAINT = 1
+MID_RANGE = 2
+CORNER_THREE = 3
+ABOVE_THE_BREAK_THREE = 4
+BACKCOURT = 5
+
+ZONE_NAMES = {
+    UNKNOWN: "unknown",
+    PAINT: "paint",
+    MID_RANGE: "mid-range",
+    CORNER_THREE: "corner three",
+    ABOVE_THE_BREAK_THREE: "above the break three",
+    BACKCOURT: "backcourt",
+}
+
+
+class CourtZones:
+    """
+    Precomputed court zone label maps in tactical view pixels.
+
+    For each attacking side ("left" or "right") a label map of the size of the tactical
+    view assigns every pixel to the paint, mid-range, corner three, above the break three
+    or backcourt zone. Any batch of tactical positions is classified with one array index.
+
+    The geometry follows the tactical court of TacticalViewConverter: the paint goes from
+    the baseline to the free throw line at 5.79 m and from 5.18 m to 10 m across, the
+    corner three lines are at 0.91 m and 14.1 m, and the three point arc has a radius of
+    6.75 m around the hoop, 1.575 m from the baseline.
+
+    Attributes:
+        width (int): Width of the tactical view in pixels.
+        height (int): Height of the tactical view in pixels.
+        label_maps (dict): Label map of shape (height, width) per attacking side.
+    """
+    hoop_distance_from_baseline = 1.575
+    three_point_radius = 6.75
+    corner_three_line = 0.91
+    free_throw_line = 5.79
+    paint_top = 5.18
+    paint_bottom = 10
+
+    def __init__(self, width=300, height=161, width_in_meters=28, height_in_meters=15):
+        self.width = width
+        self.height = height
+        self.width_in_meters = width_in_meters
+        self.height_in_meters = height_in_meters
+        self.label_maps = {side: self.build_label_map(side) for side in ("left", "right")}
+
+    def build_label_map(self, hoop_side):
+        """
+        Rasterize the zones of one attacking side.
+
+        Args:
+            hoop_side (str): "left" or "right", the side of the hoop being attacked.
+
+        Returns:
+            numpy.ndarray: uint8 labels of shape (height, width).
+        """
+        # Pixel centres in meters, with x measured from the attacked baseline
+        x = (np.arange(self.width) + 0.5) * self.width_in_meters / self.width
+        y = (np.arange(self.height) + 0.5) * self.height_in_meters / self.height
+        if hoop_side == "right":
+            x = self.width_in_meters - x
+        x, y = np.meshgrid(x, y)
+
+        hoop_y = self.height_in_meters / 2
+        distance_to_hoop = np.hypot(x - self.hoop_distance_from_baseline, y - hoop_y)
+
+        # Where the arc meets the straight corner lines
+        corner_length = self.hoop_distance_from_baseline + np.sqrt(self.three_point_radius ** 2 - (hoop_y - self.corner_three_line) ** 2)
+        in_corner_band = (y < self.corner_three_line) | (y > self.height_in_meters - self.corner_three_line)
+
+        corner_three = in_corner_band & (x <= corner_length)
+        above_the_break_three = ~corner_three & (distance_to_hoop > self.three_point_radius)
+        paint = (x <= self.free_throw_line) & (y >= self.paint_top) & (y <= self.paint_bottom)
+
+        label_map = np.full((self.height, self.width), MID_RANGE, dtype=np.uint8)
+        label_map[paint] = PAINT
+        label_map[corner_three] = CORNER_THREE
+        label_map[above_the_break_three] = ABOVE_THE_BREAK_THREE
+        label_map[x > self.width_in_meters / 2] = BACKCOURT
+        return label_map
+
+    def classify(self, positions, hoop_side="right"):
+        """
+        Look up the zone of tactical view positions.
+
+        Args:
+            positions (numpy.ndarray): Positions of shape (..., 2) in tactical view pixels.
+            hoop_side (str): "left" or "right", the side of the hoop being attacked.
+
+        Returns:
+            numpy.ndarray: Zone labels of shape (...), UNKNOWN for NaN positions.
+        """
+        positions = np.asarray(positions, dtype=np.float64)
+        known = ~np.isnan(positions).any(axis=-1)
+        columns = np.clip(np.nan_to_num(positions[..., 0]), 0, self.width - 1).astype(int)
+        rows = np.clip(np.nan_to_num(positions[..., 1]), 0, self.height - 1).astype(int)
+        labels = self.label_maps[hoop_side][rows, columns]
+        return np.where(known, labels, UNKNOWN)
+
+    def is_three_point_area(self, positions, hoop_side="right"):
+        """
+        Whether tactical view positions are behind the three point line of the attacked hoop.
+
+        Args:
+            positions (numpy.ndarray): Positions of shape (..., 2) in tactical view pixels.
+            hoop_side (str): "left" or "right", the side of the hoop being attacked.
+
+        Returns:
+            numpy.ndarray: Boolean array of shape (...).
+        """
+        labels = self.classify(positions, hoop_side)
+        return (labels == CORNER_THREE) | (labels == ABOVE_THE_BREAK_THREE)
+
+    def zone_shares(self, heatmap, hoop_side="right"):
+        """
+        Share of a heatmap falling in each zone.
+
+        Args:
+            heatmap (numpy.ndarray): Non-negative weights on a grid covering the tactical view.
+            hoop_side (str): "left" or "right", the side of the hoop being attacked.
+
+        Returns:
+            dict: Zone name to the fraction of the total weight in that zone.
+        """
+        grid_y, grid_x = heatmap.shape
+        # Zone of the centre of every grid cell
+        cell_x = (np.arange(grid_x) + 0.5) * self.width / grid_x
+        cell_y = (np.arange(grid_y) + 0.5) * self.height / grid_y
+        cell_positions = np.stack(np.meshgrid(cell_x, cell_y), axis=-1)
+        labels = self.classify(cell_positions, hoop_side)
+
+        totals = np.bincount(labels.ravel(), weights=heatmap.ravel(), minlength=len(ZONE_NAMES))
+        total = totals.sum()
+        return {
+            ZONE_NAMES[label]: float(totals[label] / total) if total > 0 else 0.0
+            for label in ZONE_NAMES if label != UNKNOWN
+        }
@@ -26,5 +26,26 @@ class Homography:
         return points.reshape(-1, 2).astype(np.float32)
 
 
+def transform_points_batch(matrices: np.ndarray, points: np.ndarray) -> np.ndarray:
+    """
+    Apply one homography per frame to all points of that frame at once.
 
+    Args:
+        matrices (np.ndarray): Homographies of shape (F, 3, 3). Frames without a homography
+            are NaN.
+        points (np.ndarray): Points of shape (F, N, 2).
 
+    Returns:
+        np.ndarray: Transformed points of shape (F, N, 2) as float32, NaN for frames without
+            a homography or NaN input points.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    homogeneous = np.concatenate([points, np.ones(points.shape[:-1] + (1,))], axis=-1)
+    projected = np.einsum('fij,fnj->fni', matrices, homogeneous)
+
+    w = projected[..., 2:3]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        transformed = np.where(np.abs(w) > np.finfo(np.float64).eps, projected[..., :2] / w, 0.0)
+    # Keep NaN frames and points NaN after the comparison above
+    transformed[np.isnan(w[..., 0])] = np.nan
+    return transformed.astype(np.float32)
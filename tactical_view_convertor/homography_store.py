@@ -0,0 +1,68 @@
+import numpy as np
+from .homography import transform_points_batch
+
+
+class HomographyStore:
+    """
+    Image to tactical view homographies of a run of frames, fitted once and shared.
+
+    TacticalViewConverter builds the store from the court keypoints. Player projection and
+    score detection then both project through the same matrices instead of fitting their
+    own homography per frame.
+
+    Attributes:
+        matrices (numpy.ndarray): Homographies of shape (F, 3, 3), NaN for frames without one.
+        start_frame (int): Video frame number of the first matrix.
+    """
+    def __init__(self, matrices, start_frame=0):
+        self.matrices = np.asarray(matrices, dtype=np.float64).reshape(-1, 3, 3)
+        self.start_frame = start_frame
+
+    def __len__(self):
+        return len(self.matrices)
+
+    def has_homography(self, frame_idx):
+        """
+        Whether a frame has a usable homography.
+
+        Args:
+            frame_idx (int): Video frame number.
+
+        Returns:
+            bool: True if the frame is in the store and its homography is not NaN.
+        """
+        index = frame_idx - self.start_frame
+        return 0 <= index < len(self.matrices) and not np.isnan(self.matrices[index]).any()
+
+    def project(self, frame_idx, points):
+        """
+        Project points of one frame to the tactical view.
+
+        Args:
+            frame_idx (int): Video frame number.
+            points (array-like): Points of shape (N, 2) or a single (x, y) point in frame pixels.
+
+        Returns:
+            numpy.ndarray: Tactical view points of the same shape as float32, NaN if the
+                frame has no homography.
+        """
+        points = np.asarray(points, dtype=np.float64)
+        if not self.has_homography(frame_idx):
+            return np.full(points.shape, np.nan, dtype=np.float32)
+
+        matrix = self.matrices[frame_idx - self.start_frame]
+        projected = transform_points_batch(matrix[None], points.reshape(1, -1, 2))
+        return projected.reshape(points.shape)
+
+    def project_frames(self, points):
+        """
+        Project the points of all frames of the store in one batched operation.
+
+        Args:
+            points (numpy.ndarray): Points of shape (F, N, 2), one row per frame of the store.
+
+        Returns:
+            numpy.ndarray: Tactical view points of shape (F, N, 2) as float32, NaN for frames
+                without a homography or NaN input points.
+        """
+        return transform_points_batch(self.matrices[:len(points)], points)
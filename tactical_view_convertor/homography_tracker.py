@@ -0,0 +1,119 @@
+import numpy as np
+import cv2
+
+
+class HomographyTracker:
+    """
+    Fits the court homography frame by frame, exploiting that broadcast cameras mostly hold
+    still or pan slowly.
+
+    When the detected keypoints barely moved since the last fit, the previous matrix is
+    reused without fitting. When they moved a little, a new RANSAC fit is blended with the
+    previous matrix to remove jitter. Large motion gives a fresh RANSAC fit. Frames with
+    fewer than 4 keypoints keep the last good matrix for up to max_dropout_frames frames.
+
+    Attributes:
+        reuse_threshold (float): Mean keypoint displacement in pixels below which the
+            previous matrix is reused.
+        smoothing_threshold (float): Mean displacement below which new fits are blended
+            with the previous matrix.
+        smoothing (float): Weight of the new fit when blending.
+        max_dropout_frames (int): Number of frames the last matrix is carried without keypoints.
+        ransac_threshold (float): Maximum reprojection error in tactical pixels of RANSAC inliers.
+        num_fits (int): Number of homographies fitted.
+        num_reused (int): Number of frames that reused the previous matrix.
+        num_carried (int): Number of frames without enough keypoints that got the last matrix.
+    """
+    def __init__(self, reuse_threshold=1.5, smoothing_threshold=8.0, smoothing=0.5, max_dropout_frames=15, ransac_threshold=5.0):
+        self.reuse_threshold = reuse_threshold
+        self.smoothing_threshold = smoothing_threshold
+        self.smoothing = smoothing
+        self.max_dropout_frames = max_dropout_frames
+        self.ransac_threshold = ransac_threshold
+
+        self.num_fits = 0
+        self.num_reused = 0
+        self.num_carried = 0
+        self.reset()
+
+    def reset(self):
+        """
+        Forget the previous matrix, e.g. at a camera cut or the start of a new video.
+        """
+        self.matrix = None
+        self.reference_points = {}
+        self.frames_since_matrix = 0
+
+    def mean_displacement(self, keypoint_indices, source_points):
+        """
+        Mean displacement of the keypoints that were also detected at the last fit.
+
+        Returns:
+            float: Mean displacement in pixels, inf if fewer than 4 keypoints are shared.
+        """
+        shared = [(self.reference_points[i], point) for i, point in zip(keypoint_indices, source_points) if i in self.reference_points]
+        if len(shared) < 4:
+            return float('inf')
+        previous, current = np.array(shared, dtype=np.float32).transpose(1, 0, 2)
+        return float(np.linalg.norm(current - previous, axis=1).mean())
+
+    def update(self, keypoint_indices, source_points, target_points):
+        """
+        Get the homography of the next frame.
+
+        Args:
+            keypoint_indices (list): Indices of the detected keypoints in the court model.
+            source_points (numpy.ndarray): Detected keypoints in the frame, shape (N, 2).
+            target_points (numpy.ndarray): The same keypoints in the tactical view, shape (N, 2).
+
+        Returns:
+            numpy.ndarray or None: The 3x3 homography, or None if there is no usable one.
+        """
+        if len(keypoint_indices) < 4:
+            return self.carry()
+
+        displacement = float('inf')
+        if self.matrix is not None:
+            displacement = self.mean_displacement(keypoint_indices, source_points)
+            if displacement < self.reuse_threshold:
+                self.num_reused += 1
+                self.frames_since_matrix = 0
+                return self.matrix
+
+        try:
+            matrix, _ = cv2.findHomography(
+                np.asarray(source_points, dtype=np.float32),
+                np.asarray(target_points, dtype=np.float32),
+                cv2.RANSAC,
+                self.ransac_threshold
+            )
+        except cv2.error:
+            matrix = None
+        if matrix is None:
+            return self.carry()
+        self.num_fits += 1
+
+        if displacement < self.smoothing_threshold:
+            # Slow pan: blend with the previous matrix to remove jitter
+            matrix = self.smoothing * matrix / matrix[2, 2] + (1 - self.smoothing) * self.matrix / self.matrix[2, 2]
+
+        self.matrix = matrix
+        self.reference_points = {i: tuple(point) for i, point in zip(keypoint_indices, source_points)}
+        self.frames_since_matrix = 0
+        return self.matrix
+
+    def carry(self):
+        """
+        Return the last matrix for a frame without a usable fit, within max_dropout_frames.
+
+        Returns:
+            numpy.ndarray or None: The last homography, or None after too long a dropout.
+        """
+        if self.matrix is None:
+            return None
+        self.frames_since_matrix += 1
+        if self.frames_since_matrix > self.max_dropout_frames:
+            self.reset()
+            return None
+        self.num_carried += 1
+        return self.matrix
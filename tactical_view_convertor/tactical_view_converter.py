@@ -3,16 +3,18 @@ import sys
 import pathlib
 import numpy as np
 import cv2
-from copy import deepcopy
 from .homography import Homography
+from .homography_store import HomographyStore
 
 folder_path = pathlib.Path(__file__).parent.resolve()
 sys.path.append(os.path.join(folder_path,"../"))
-from utils.bbox_utils import get_foot_position,measure_distance
+from trackers.track_table import TrackTable
 
 class TacticalViewConverter:
-    def __init__(self, court_image_path):
+    def __init__(self, court_image_path, homography_tracker=None):
         self.court_image_path = court_image_path
+        # Optional HomographyTracker that reuses and smooths homographies between frames
+        self.homography_tracker = homography_tracker
         self.width = 300
         self.height= 161
 
@@ -55,64 +57,114 @@ class TacticalViewConverter:
         to the tactical view keypoints.
         
         Args:
-            keypoints_list (List[List[Tuple[float, float]]]): A list containing keypoints for each frame.
-                Each outer list represents a frame.
-                Each inner list contains keypoints as (x, y) tuples.
+            keypoints_list (list): Ultralytics Keypoints of every frame.
                 A keypoint of (0, 0) indicates that the keypoint is not detected for that frame.
         
         Returns:
-            List[bool]: A list indicating whether each frame's keypoints are valid.
+            list: The keypoints of every frame, with invalid keypoints set to (0, 0). Frames
+                without invalid keypoints are returned as is, the others as modified copies.
         """
+        keypoints_xy = self.keypoints_to_array(keypoints_list)
+        keypoint_mask = self.validate_keypoints_mask(keypoints_xy)
+        return self.apply_keypoint_mask(keypoints_list, keypoints_xy, keypoint_mask)
 
-        keypoints_list = deepcopy(keypoints_list)
+    def keypoints_to_array(self, keypoints_list):
+        """
+        Stacks the keypoints of the first detected court of every frame.
+
+        Args:
+            keypoints_list (list): Ultralytics Keypoints of every frame.
 
+        Returns:
+            numpy.ndarray: Keypoints of shape (F, K, 2), (0, 0) for undetected keypoints and
+                frames without a detected court.
+        """
+        keypoints_xy = np.zeros((len(keypoints_list), len(self.key_points), 2), dtype=np.float32)
         for frame_idx, frame_keypoints in enumerate(keypoints_list):
-            frame_keypoints = frame_keypoints.xy.tolist()[0]
-            
-            # Get indices of detected keypoints (not (0, 0))
-            detected_indices = [i for i, kp in enumerate(frame_keypoints) if kp[0] >0 and kp[1]>0]
-            
-            # Need at least 3 detected keypoints to validate proportions
-            if len(detected_indices) < 3:
+            xy = frame_keypoints.xy
+            if len(xy) == 0:
                 continue
-            
-            invalid_keypoints = []
-            # Validate each detected keypoint
-            for i in detected_indices:
-                # Skip if this is (0, 0)
-                if frame_keypoints[i][0] == 0 and frame_keypoints[i][1] == 0:
-                    continue
-
-                # Choose two other random detected keypoints
-                other_indices = [idx for idx in detected_indices if idx != i and idx not in invalid_keypoints]
-                if len(other_indices) < 2:
-                    continue
-
-                # Take first two other indices for simplicity
-                j, k = other_indices[0], other_indices[1]
-
-                # Calculate distances between detected keypoints
-                d_ij = measure_distance(frame_keypoints[i], frame_keypoints[j])
-                d_ik = measure_distance(frame_keypoints[i], frame_keypoints[k])
-                
-                # Calculate distances between corresponding tactical keypoints
-                t_ij = measure_distance(self.key_points[i], self.key_points[j])
-                t_ik = measure_distance(self.key_points[i], self.key_points[k])
-
-                # Calculate and compare proportions with 50% error margin
-                if t_ij > 0 and t_ik > 0:
-                    prop_detected = d_ij / d_ik if d_ik > 0 else float('inf')
-                    prop_tactical = t_ij / t_ik if t_ik > 0 else float('inf')
-
-                    error = (prop_detected - prop_tactical) / prop_tactical
-                    error = abs(error)
-
-                    if error >0.8:  # 80% error margin                        
-                        keypoints_list[frame_idx].xy[0][i] *= 0
-                        keypoints_list[frame_idx].xyn[0][i] *= 0
-                        invalid_keypoints.append(i)
-            
-        return keypoints_list
+            xy = xy[0].cpu().numpy()
+            keypoints_xy[frame_idx, :len(xy)] = xy
+        return keypoints_xy
+
+    def validate_keypoints_mask(self, keypoints_xy):
+        """
+        Finds the detected keypoints whose proportions agree with the tactical view.
+
+        Every detected keypoint i of a frame with at least 3 detected keypoints is compared
+        with the first two other detected keypoints j and k that were not rejected yet. It
+        is rejected if the ratio of its distances to j and k differs by more than 80% from
+        the same ratio in the tactical view. Keypoints are processed in order, each one for
+        all frames at once.
+
+        Args:
+            keypoints_xy (numpy.ndarray): Keypoints of shape (F, K, 2) from keypoints_to_array.
+
+        Returns:
+            numpy.ndarray: Boolean mask of shape (F, K) of the detected and valid keypoints.
+        """
+        num_frames, num_keypoints = keypoints_xy.shape[:2]
+        keypoints_xy = keypoints_xy.astype(np.float64)
+        detected = (keypoints_xy[..., 0] > 0) & (keypoints_xy[..., 1] > 0)
+        rejected = np.zeros_like(detected)
+
+        # Need at least 3 detected keypoints to validate proportions
+        active = detected.sum(axis=1) >= 3
+
+        reference = np.array(self.key_points[:num_keypoints], dtype=np.float64)
+        reference_distances = np.linalg.norm(reference[:, None] - reference[None, :], axis=-1)
+
+        frames = np.arange(num_frames)
+        for i in range(num_keypoints):
+            candidates = detected & ~rejected
+            candidates[:, i] = False
+            num_candidates = np.cumsum(candidates, axis=1)
+
+            # First two other detected and not rejected keypoints of every frame
+            checked = active & detected[:, i] & (num_candidates[:, -1] >= 2)
+            frame_indices = frames[checked]
+            j = np.argmax(num_candidates[checked] >= 1, axis=1)
+            k = np.argmax(num_candidates[checked] >= 2, axis=1)
+
+            d_ij = np.linalg.norm(keypoints_xy[frame_indices, i] - keypoints_xy[frame_indices, j], axis=1)
+            d_ik = np.linalg.norm(keypoints_xy[frame_indices, i] - keypoints_xy[frame_indices, k], axis=1)
+            t_ij = reference_distances[i, j]
+            t_ik = reference_distances[i, k]
+
+            # Calculate and compare proportions with 80% error margin
+            with np.errstate(divide='ignore', invalid='ignore'):
+                prop_detected = np.where(d_ik > 0, d_ij / d_ik, np.inf)
+                prop_tactical = t_ij / t_ik
+                error = np.abs((prop_detected - prop_tactical) / prop_tactical)
+
+            invalid = (t_ij > 0) & (t_ik > 0) & (error > 0.8)
+            rejected[frame_indices[invalid], i] = True
+
+        return detected & ~rejected
+
+    def apply_keypoint_mask(self, keypoints_list, keypoints_xy, keypoint_mask):
+        """
+        Sets the rejected keypoints of every frame to (0, 0).
+
+        Args:
+            keypoints_list (list): Ultralytics Keypoints of every frame.
+            keypoints_xy (numpy.ndarray): Keypoints of shape (F, K, 2) from keypoints_to_array.
+            keypoint_mask (numpy.ndarray): Mask of shape (F, K) from validate_keypoints_mask.
+
+        Returns:
+            list: The keypoints of every frame. Only frames with rejected keypoints are copied.
+        """
+        detected = (keypoints_xy[..., 0] > 0) & (keypoints_xy[..., 1] > 0)
+        rejected = detected & ~keypoint_mask
+
+        validated_keypoints = list(keypoints_list)
+        for frame_idx in np.nonzero(rejected.any(axis=1))[0]:
+            frame_keypoints = keypoints_list[frame_idx]
+            data = frame_keypoints.data.clone()
+            data[0, np.nonzero(rejected[frame_idx])[0].tolist(), :2] = 0
+            validated_keypoints[frame_idx] = type(frame_keypoints)(data, frame_keypoints.orig_shape)
+        return validated_keypoints
 
     def transform_players_to_tactical_view(self, keypoints_list, player_tracks):
         """
@@ -127,56 +179,141 @@ class TacticalViewConverter:
             list: List of dictionaries where each dictionary maps player IDs to their (x, y) positions
                 in the tactical view coordinate system. The list index corresponds to the frame number.
         """
-        tactical_player_positions = []
-        
-        for frame_idx, (frame_keypoints, frame_tracks) in enumerate(zip(keypoints_list, player_tracks)):
-            # Initialize empty dictionary for this frame
-            tactical_positions = {}
+        player_table = TrackTable.from_tracks(player_tracks[:len(keypoints_list)])
+        self.transform_table_to_tactical_view(keypoints_list, player_table)
+        return player_table.tactical_positions_to_dicts()
+
+    def transform_table_to_tactical_view(self, keypoints_list, player_table, reset=True):
+        """
+        Fill the tactical position column of a player track table.
+
+        Args:
+            keypoints_list (list): List of detected court keypoints for each frame.
+            player_table (TrackTable): Player tracks, one row per frame of keypoints_list.
+            reset (bool): Reset the homography tracker first, see compute_homographies_from_array.
+
+        Returns:
+            numpy.ndarray: Tactical positions of shape (F, S, 2), NaN for players that could
+                not be projected or fall outside the tactical view.
+        """
+        homography_store = self.build_homography_store(keypoints_list[:player_table.num_frames], reset=reset)
+        return self.project_table_to_tactical_view(homography_store, player_table)
+
+    def build_homography_store(self, keypoints_list, start_frame=0, reset=True):
+        """
+        Fit the homographies of a run of frames once, for every consumer to share.
+
+        Args:
+            keypoints_list (list): List of detected court keypoints for each frame.
+            start_frame (int): Video frame number of the first entry of keypoints_list.
+            reset (bool): Reset the homography tracker first, see compute_homographies_from_array.
+
+        Returns:
+            HomographyStore: The per-frame homographies.
+        """
+        return HomographyStore(self.compute_homographies(keypoints_list, reset=reset), start_frame)
+
+    def compute_homographies(self, keypoints_list, reset=True):
+        """
+        Fit the image to tactical view homography of every frame.
 
-            frame_keypoints = frame_keypoints.xy.tolist()[0]
+        Args:
+            keypoints_list (list): List of detected court keypoints for each frame.
+            reset (bool): Reset the homography tracker first, see compute_homographies_from_array.
+
+        Returns:
+            numpy.ndarray: Homographies of shape (F, 3, 3), see compute_homographies_from_array.
+        """
+        keypoints_xy = self.keypoints_to_array(keypoints_list)
+        keypoint_mask = (keypoints_xy[..., 0] > 0) & (keypoints_xy[..., 1] > 0)
+        return self.compute_homographies_from_array(keypoints_xy, keypoint_mask, reset=reset)
 
-            # Skip frames with insufficient keypoints
-            if frame_keypoints is None or len(frame_keypoints) == 0:
-                tactical_player_positions.append(tactical_positions)
+    def compute_homographies_from_array(self, keypoints_xy, keypoint_mask, reset=True):
+        """
+        Fit the image to tactical view homography of every frame from stacked keypoints.
+
+        Args:
+            keypoints_xy (numpy.ndarray): Keypoints of shape (F, K, 2) from keypoints_to_array.
+            keypoint_mask (numpy.ndarray): Mask of shape (F, K) of the keypoints to use.
+            reset (bool): Reset the homography tracker before the first frame, so no matrix
+                carries over from a previous video. Pass False when keypoints_xy continues
+                the frames of the previous call, e.g. the next window of a stream.
+
+        Returns:
+            numpy.ndarray: Homographies of shape (F, 3, 3), NaN for frames with fewer than
+                4 usable keypoints or where the fit failed. With a homography tracker,
+                frames may reuse or carry the matrix of earlier frames instead.
+        """
+        homographies = np.full((len(keypoints_xy), 3, 3), np.nan)
+        target_keypoints = np.array(self.key_points, dtype=np.float32)
+        if reset and self.homography_tracker is not None:
+            self.homography_tracker.reset()
+
+        for frame_idx, (frame_keypoints, frame_mask) in enumerate(zip(keypoints_xy, keypoint_mask)):
+            valid_indices = np.nonzero(frame_mask)[0]
+            source_points = frame_keypoints[valid_indices]
+            target_points = target_keypoints[valid_indices]
+
+            if self.homography_tracker is not None:
+                matrix = self.homography_tracker.update(valid_indices.tolist(), source_points, target_points)
+                if matrix is not None:
+                    homographies[frame_idx] = matrix
                 continue
-            
-            # Get detected keypoints for this frame
-            detected_keypoints = frame_keypoints
-            
-            # Filter out undetected keypoints (those with coordinates (0,0))
-            valid_indices = [i for i, kp in enumerate(detected_keypoints) if kp[0] > 0 and kp[1] > 0]
-            
+
             # Need at least 4 points for a reliable homography
             if len(valid_indices) < 4:
-                tactical_player_positions.append(tactical_positions)
                 continue
-            
-            # Create source and target point arrays for homography
-            source_points = np.array([detected_keypoints[i] for i in valid_indices], dtype=np.float32)
-            target_points = np.array([self.key_points[i] for i in valid_indices], dtype=np.float32)
-            
+
             try:
-                # Create homography transformer
-                homography = Homography(source_points, target_points)
-                
-                # Transform each player's position
-                for player_id, player_data in frame_tracks.items():
-                    bbox = player_data["bbox"]
-                    # Use bottom center of bounding box as player position
-                    player_position = np.array([get_foot_position(bbox)])
-                    # Transform to tactical view coordinates
-                    tactical_position = homography.transform_points(player_position)
-
-                    # If tactical position is not in the tactical view, skip
-                    if tactical_position[0][0] < 0 or tactical_position[0][0] > self.width or tactical_position[0][1] < 0 or tactical_position[0][1] > self.height:
-                        continue
-
-                    tactical_positions[player_id] = tactical_position[0].tolist()
-                    
+                homographies[frame_idx] = Homography(source_points, target_points).m
             except (ValueError, cv2.error) as e:
-                # If homography fails, continue with empty dictionary
+                # If homography fails, leave the frame without a homography
                 pass
-            
-            tactical_player_positions.append(tactical_positions)
-        
-        return tactical_player_positions
+
+        return homographies
+
+    def project_table_to_tactical_view(self, homography_store, player_table):
+        """
+        Project the foot positions of all players of all frames in one batched operation.
+
+        Args:
+            homography_store (HomographyStore): Homographies of F frames from build_homography_store.
+            player_table (TrackTable): Player tracks with at least F frames.
+
+        Returns:
+            numpy.ndarray: Tactical positions of shape (F, S, 2), NaN for players that could
+                not be projected or fall outside the tactical view. Also stored in the
+                table's tactical position column.
+        """
+        bboxes = player_table.bboxes
+        # Bottom center of the boxes, truncated like get_foot_position
+        foot_positions = np.stack([np.trunc((bboxes[..., 0] + bboxes[..., 2]) / 2), np.trunc(bboxes[..., 3])], axis=-1)
+
+        tactical_positions = self.project_points_to_tactical_view(homography_store, foot_positions, player_table.valid)
+        player_table.tactical_positions = tactical_positions
+        return tactical_positions
+
+    def project_points_to_tactical_view(self, homography_store, points, valid):
+        """
+        Project per-slot frame points and keep the ones that land on the tactical court.
+
+        Args:
+            homography_store (HomographyStore): Homographies of F frames.
+            points (numpy.ndarray): Frame points of shape (F', S, 2) with F' >= F.
+            valid (numpy.ndarray): Mask of shape (F', S) of the occupied slots.
+
+        Returns:
+            numpy.ndarray: Tactical positions of shape (F', S, 2), NaN for slots that are empty,
+                have no homography or fall outside the tactical view.
+        """
+        num_frames = min(len(homography_store), len(points))
+        projected = homography_store.project_frames(points[:num_frames])
+
+        # Points outside of the tactical view are skipped
+        with np.errstate(invalid='ignore'):
+            inside = (projected[..., 0] >= 0) & (projected[..., 0] <= self.width) & (projected[..., 1] >= 0) & (projected[..., 1] <= self.height)
+        inside &= valid[:num_frames]
+
+        tactical_positions = np.full(points.shape, np.nan)
+        tactical_positions[:num_frames][inside] = projected[inside]
+        return tactical_positions
@@ -1,5 +1,7 @@
 from PIL import Image
 import cv2
+import numpy as np
+import torch
 from transformers import CLIPProcessor, CLIPModel
 
 import sys 
@@ -18,10 +20,35 @@ class TeamAssigner:
         player_team_dict (dict): Dictionary mapping player IDs to their team assignments.
         team_1_class_name (str): Description of Team 1's jersey appearance.
         team_2_class_name (str): Description of Team 2's jersey appearance.
+        batch_size (int): Maximum number of player crops embedded in one forward pass.
+        reset_interval (int or None): If set, forget all assignments every reset_interval
+            frames. If None, a player is only classified again when its jersey drifts.
+        drift_threshold (float or None): Bhattacharyya distance between the torso colour histogram
+            of a player and the one it was classified with above which it is classified again.
+        min_confidence (float): Classifications less confident than this are redone at half
+            the drift threshold.
+        player_cache (dict): Per player ID, the team, its confidence and the torso
+            histogram it was classified with.
+        num_classified_crops (int): Number of crops sent to CLIP so far.
+        mode (str): "clip" classifies every crop with CLIP. "color" classifies crops with a
+            two-cluster model of torso colours and uses CLIP only for ambiguous crops.
+        fit_frames (int): Number of first frames the colour model is fitted on.
+        min_margin (float): Relative margin between the distances to the two colour
+            clusters below which a crop is sent to CLIP.
+        color_centers (numpy.ndarray or None): Lab colours of team 1 and team 2 once fitted.
+        num_color_crops (int): Number of crops considered by the colour model.
+        num_clip_fallbacks (int): Number of those crops that had to be sent to CLIP.
     """
     def __init__(self,
                  team_1_class_name= "white shirt",
                  team_2_class_name= "dark blue shirt",
+                 batch_size=64,
+                 reset_interval=None,
+                 drift_threshold=0.35,
+                 min_confidence=0.7,
+                 mode="clip",
+                 fit_frames=30,
+                 min_margin=0.2,
                  ):
         """
         Initialize the TeamAssigner with specified team jersey descriptions.
@@ -29,50 +56,311 @@ class TeamAssigner:
         Args:
             team_1_class_name (str): Description of Team 1's jersey appearance.
             team_2_class_name (str): Description of Team 2's jersey appearance.
+            batch_size (int): Maximum number of player crops embedded in one forward pass.
+            reset_interval (int or None): Forget all assignments every reset_interval frames.
+                None re-classifies on drift only. reset_interval=50 with drift_threshold=None
+                reproduces the original fixed refresh.
+            drift_threshold (float or None): Histogram distance that triggers a
+                re-classification. None disables drift detection.
+            min_confidence (float): Confidence below which the drift threshold is halved.
+            mode (str): "clip" or "color".
+            fit_frames (int): Number of first frames the colour model is fitted on.
+            min_margin (float): Colour cluster margin below which CLIP decides.
         """
+        if mode not in ("clip", "color"):
+            raise ValueError(f"Unsupported mode '{mode}'. Expected 'clip' or 'color'.")
+
         self.team_colors = {}
         self.player_team_dict = {}        
     
         self.team_1_class_name = team_1_class_name
         self.team_2_class_name = team_2_class_name
+        self.batch_size = batch_size
+
+        self.reset_interval = reset_interval
+        self.drift_threshold = drift_threshold
+        self.min_confidence = min_confidence
+        self.player_cache = {}
+        self.num_classified_crops = 0
+
+        self.mode = mode
+        self.fit_frames = fit_frames
+        self.min_margin = min_margin
+        self.color_centers = None
+        self.num_color_crops = 0
+        self.num_clip_fallbacks = 0
 
     def load_model(self):
         """
-        Loads the pre-trained vision model for jersey color classification.
+        Loads the pre-trained vision model for jersey color classification and encodes
+        the team descriptions once.
         """
         self.model = CLIPModel.from_pretrained("patrickjohncyh/fashion-clip")
         self.processor = CLIPProcessor.from_pretrained("patrickjohncyh/fashion-clip")
 
-    def get_player_color(self,frame,bbox):
+        classes = [self.team_1_class_name, self.team_2_class_name]
+        text_inputs = self.processor(text=classes, return_tensors="pt", padding=True)
+        with torch.no_grad():
+            text_embeddings = self.model.get_text_features(**text_inputs)
+        self.text_embeddings = text_embeddings / text_embeddings.norm(dim=-1, keepdim=True)
+
+    def get_player_crop(self,frame,bbox):
         """
-        Analyzes the jersey color of a player within the given bounding box.
+        Cuts a player out of a frame.
 
         Args:
             frame (numpy.ndarray): The video frame containing the player.
             bbox (tuple): Bounding box coordinates of the player.
 
         Returns:
-            str: The classified jersey color/description.
+            PIL.Image.Image: The RGB crop of the player.
         """
         image = frame[int(bbox[1]):int(bbox[3]),int(bbox[0]):int(bbox[2])]
 
         # Convert to PIL Image
         rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        pil_image = Image.fromarray(rgb_image)
-        image = pil_image
+        return Image.fromarray(rgb_image)
 
+    def get_player_color(self,frame,bbox):
+        """
+        Analyzes the jersey color of a player within the given bounding box.
+
+        Args:
+            frame (numpy.ndarray): The video frame containing the player.
+            bbox (tuple): Bounding box coordinates of the player.
+
+        Returns:
+            str: The classified jersey color/description.
+        """
+        return self.get_player_colors([self.get_player_crop(frame,bbox)])[0]
+
+    def get_player_colors(self,crops):
+        """
+        Classifies the jersey color of many player crops in batched forward passes.
+
+        Args:
+            crops (list): PIL images of the players.
+
+        Returns:
+            list: The classified jersey color/description of every crop.
+        """
+        return self.get_player_colors_with_confidence(crops)[0]
+
+    def get_player_colors_with_confidence(self,crops):
+        """
+        Classifies the jersey color of many player crops in batched forward passes.
+
+        Args:
+            crops (list): PIL images of the players.
+
+        Returns:
+            tuple: (class_names, confidences) with the classified jersey description of
+                every crop and the probability CLIP gives to it.
+        """
         classes = [self.team_1_class_name, self.team_2_class_name]
 
-        inputs = self.processor(text=classes, images=image, return_tensors="pt", padding=True)
+        class_names = []
+        confidences = []
+        for i in range(0, len(crops), self.batch_size):
+            image_inputs = self.processor(images=crops[i:i+self.batch_size], return_tensors="pt")
+            with torch.no_grad():
+                image_embeddings = self.model.get_image_features(**image_inputs)
+            image_embeddings = image_embeddings / image_embeddings.norm(dim=-1, keepdim=True)
+
+            logits_per_image = self.model.logit_scale.exp() * image_embeddings @ self.text_embeddings.T
+            probs = logits_per_image.softmax(dim=1)
+            batch_confidences, class_indices = probs.max(dim=1)
+            class_names += [classes[class_index] for class_index in class_indices.tolist()]
+            confidences += batch_confidences.tolist()
+
+        self.num_classified_crops += len(crops)
+        return class_names, confidences
+
+    def get_torso(self,frame,bbox):
+        """
+        Cuts the torso region, the upper body without the head and the legs, out of a frame.
+
+        Args:
+            frame (numpy.ndarray): The video frame containing the player.
+            bbox (tuple): Bounding box coordinates of the player.
 
-        outputs = self.model(**inputs)
-        logits_per_image = outputs.logits_per_image
-        probs = logits_per_image.softmax(dim=1) 
+        Returns:
+            numpy.ndarray: The BGR torso region, or None if it is empty.
+        """
+        x1, y1, x2, y2 = bbox
+        width, height = x2 - x1, y2 - y1
+        torso = frame[max(int(y1 + 0.2*height), 0):max(int(y1 + 0.6*height), 0),
+                      max(int(x1 + 0.25*width), 0):max(int(x1 + 0.75*width), 0)]
+        if torso.size == 0:
+            return None
+        return torso
 
+    def get_torso_histogram(self,frame,bbox):
+        """
+        Computes a cheap colour signature of a player's jersey.
 
-        class_name=  classes[probs.argmax(dim=1)[0]]
+        Args:
+            frame (numpy.ndarray): The video frame containing the player.
+            bbox (tuple): Bounding box coordinates of the player.
 
-        return class_name
+        Returns:
+            numpy.ndarray: Normalised hue-saturation histogram of the torso region, or None
+                if the region is empty.
+        """
+        torso = self.get_torso(frame,bbox)
+        if torso is None:
+            return None
+
+        hsv = cv2.cvtColor(torso, cv2.COLOR_BGR2HSV)
+        histogram = cv2.calcHist([hsv], [0, 1], None, [16, 8], [0, 180, 0, 256])
+        return cv2.normalize(histogram, histogram).flatten()
+
+    def get_torso_color(self,frame,bbox):
+        """
+        Computes the colour feature used by the colour clustering model.
+
+        Args:
+            frame (numpy.ndarray): The video frame containing the player.
+            bbox (tuple): Bounding box coordinates of the player.
+
+        Returns:
+            numpy.ndarray: Median Lab colour of the torso region, or None if it is empty.
+        """
+        torso = self.get_torso(frame,bbox)
+        if torso is None:
+            return None
+        lab = cv2.cvtColor(torso, cv2.COLOR_BGR2LAB).reshape(-1, 3)
+        return np.median(lab, axis=0).astype(np.float32)
+
+    def fit_color_model(self,frames,player_tracks,samples_per_cluster=8):
+        """
+        Fits the two-cluster colour model on the torso colours of the first fit_frames frames.
+
+        The clusters are named by classifying the crops closest to each cluster centre with
+        CLIP, so the model needs the CLIP model to be loaded.
+
+        Args:
+            frames (list): Consecutive video frames.
+            player_tracks (list): Player tracking information for each of the frames.
+            samples_per_cluster (int): Number of crops per cluster classified with CLIP.
+
+        Returns:
+            bool: Whether the model could be fitted.
+        """
+        features = []
+        samples = []
+        for frame, player_track in zip(frames[:self.fit_frames], player_tracks[:self.fit_frames]):
+            for track in player_track.values():
+                feature = self.get_torso_color(frame, track['bbox'])
+                if feature is not None:
+                    features.append(feature)
+                    samples.append((frame, track['bbox']))
+
+        if len(features) < 2:
+            return False
+
+        features = np.array(features, dtype=np.float32)
+        criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 50, 0.5)
+        _, labels, centers = cv2.kmeans(features, 2, None, criteria, 5, cv2.KMEANS_PP_CENTERS)
+        labels = labels.ravel()
+
+        # Fraction of CLIP "team 1" votes among the crops closest to each centre
+        team_1_votes = []
+        for cluster in range(2):
+            cluster_indices = np.nonzero(labels == cluster)[0]
+            distances = np.linalg.norm(features[cluster_indices] - centers[cluster], axis=1)
+            nearest = cluster_indices[np.argsort(distances)[:samples_per_cluster]]
+            player_colors = self.get_player_colors([self.get_player_crop(*samples[i]) for i in nearest])
+            team_1_votes.append(np.mean([color == self.team_1_class_name for color in player_colors]) if player_colors else 0)
+
+        self.color_centers = centers if team_1_votes[0] >= team_1_votes[1] else centers[::-1]
+        return True
+
+    def classify_by_color(self,feature):
+        """
+        Classifies a torso colour with the fitted colour model.
+
+        Args:
+            feature (numpy.ndarray): Torso colour from get_torso_color.
+
+        Returns:
+            tuple: (team_id, margin) where margin is the difference of the distances to the
+                two cluster centres relative to their sum, between 0 and 1.
+        """
+        distances = np.linalg.norm(self.color_centers - feature, axis=1)
+        margin = abs(distances[0] - distances[1]) / max(distances[0] + distances[1], 1e-6)
+        team_id = 1 if distances[0] <= distances[1] else 2
+        return team_id, float(margin)
+
+    def get_clip_fallback_fraction(self):
+        """
+        Fraction of the crops considered by the colour model that were sent to CLIP.
+
+        Returns:
+            float: Value between 0 and 1, 0 if no crop was considered.
+        """
+        if self.num_color_crops == 0:
+            return 0.0
+        return self.num_clip_fallbacks / self.num_color_crops
+
+    def get_color_team(self,frame,bbox):
+        """
+        Classifies a player with the colour model when it is confident enough.
+
+        Args:
+            frame (numpy.ndarray): The video frame containing the player.
+            bbox (tuple): Bounding box coordinates of the player.
+
+        Returns:
+            int or None: Team ID, or None if the crop must be classified with CLIP.
+        """
+        if self.mode != "color" or self.color_centers is None:
+            return None
+
+        self.num_color_crops += 1
+        feature = self.get_torso_color(frame, bbox)
+        if feature is not None:
+            team_id, margin = self.classify_by_color(feature)
+            if margin >= self.min_margin:
+                return team_id
+
+        self.num_clip_fallbacks += 1
+        return None
+
+    def needs_classification(self,player_id,histogram):
+        """
+        Decides whether a player must be sent to CLIP.
+
+        Args:
+            player_id (int): Unique identifier for the player.
+            histogram (numpy.ndarray): Current torso histogram of the player, or None.
+
+        Returns:
+            bool: True for new players and players whose jersey colours drifted.
+        """
+        cached = self.player_cache.get(player_id)
+        if cached is None:
+            return True
+        if self.drift_threshold is None or histogram is None or cached["histogram"] is None:
+            return False
+
+        drift = cv2.compareHist(cached["histogram"], histogram, cv2.HISTCMP_BHATTACHARYYA)
+        threshold = self.drift_threshold
+        if cached["confidence"] < self.min_confidence:
+            threshold /= 2
+        return drift > threshold
+
+    def get_team_id(self,player_color):
+        """
+        Maps a classified jersey description to a team ID.
+
+        Args:
+            player_color (str): The classified jersey color/description.
+
+        Returns:
+            int: Team ID (1 or 2).
+        """
+        return 1 if player_color==self.team_1_class_name else 2
 
     def get_player_team(self,frame,player_bbox,player_id):
         """
@@ -90,10 +378,7 @@ class TeamAssigner:
           return self.player_team_dict[player_id]
 
         player_color = self.get_player_color(frame,player_bbox)
-
-        team_id=2
-        if player_color==self.team_1_class_name:
-            team_id=1
+        team_id = self.get_team_id(player_color)
 
         self.player_team_dict[player_id] = team_id
         return team_id
@@ -117,21 +402,118 @@ class TeamAssigner:
             if len(player_assignment) == len(video_frames):
                 return player_assignment
 
+        player_assignment = self.assign_teams(video_frames, player_tracks)
+        
+        save_stub(stub_path,player_assignment)
+
+        return player_assignment
+
+    def assign_teams(self,video_frames,player_tracks):
+        """
+        Assigns teams to the players of every frame without any caching.
+
+        Args:
+            video_frames (list): List of video frames to process.
+            player_tracks (list): List of player tracking information for each frame.
+
+        Returns:
+            list: List of dictionaries mapping player IDs to team assignments for each frame.
+        """
         self.load_model()
+        return self.get_player_teams_for_frames(video_frames, player_tracks)
+
+    def get_player_teams_for_frame(self,frame,player_track,frame_num):
+        """
+        Assigns teams to every player of a single frame. The model must already be loaded.
+
+        Args:
+            frame (numpy.ndarray): The video frame containing the players.
+            player_track (dict): Mapping of player IDs to their tracking information for this frame.
+            frame_num (int): Index of the frame in the whole video, used to periodically
+                refresh the cached team assignments.
+
+        Returns:
+            dict: Mapping of player IDs to team assignments for this frame.
+        """
+        return self.get_player_teams_for_frames([frame], [player_track], frame_num)[0]
+
+    def get_player_teams_for_frames(self,frames,player_tracks,start_frame=0):
+        """
+        Assigns teams to the players of consecutive frames. The model must already be loaded.
+
+        A player is classified when it is new, when the colour histogram of its torso
+        drifted from the one it was classified with, or after a reset if reset_interval is
+        set. The crops to classify are collected and sent to CLIP together, in batches of
+        batch_size.
+
+        Args:
+            frames (list): Consecutive video frames.
+            player_tracks (list): Player tracking information for each of the frames.
+            start_frame (int): Index of the first frame in the whole video.
+
+        Returns:
+            list: List of dictionaries mapping player IDs to team assignments for each frame.
+        """
+        if self.mode == "color" and self.color_centers is None:
+            self.fit_color_model(frames, player_tracks)
+
+        player_assignment = []
+        # Per frame, (player_id, team) pairs where team is None until its crop is classified
+        pending_frames = []
+        pending_crops = []
+        pending_players = []
 
-        player_assignment=[]
-        for frame_num, player_track in enumerate(player_tracks):        
-            player_assignment.append({})
-            
-            if frame_num %50 ==0:
+        def classify_pending():
+            class_names, confidences = self.get_player_colors_with_confidence(pending_crops)
+            teams = {}
+            for (player_id, histogram), class_name, confidence in zip(pending_players, class_names, confidences):
+                team_id = self.get_team_id(class_name)
+                self.player_cache[player_id] = {"team": team_id, "confidence": confidence, "histogram": histogram}
+                self.player_team_dict[player_id] = team_id
+                teams[player_id] = team_id
+            for frame_pairs in pending_frames:
+                player_assignment.append({
+                    player_id: team if team is not None else teams[player_id]
+                    for player_id, team in frame_pairs
+                })
+            pending_frames.clear()
+            pending_crops.clear()
+            pending_players.clear()
+
+        for i, (frame, player_track) in enumerate(zip(frames, player_tracks)):
+            if self.reset_interval and (start_frame + i) % self.reset_interval == 0:
+                # Assignments from before a reset are not reused after it
+                if pending_crops:
+                    classify_pending()
+                self.player_cache = {}
                 self.player_team_dict = {}
 
+            pending_ids = {player_id for player_id, _ in pending_players}
+            frame_pairs = []
             for player_id, track in player_track.items():
-                team = self.get_player_team(video_frames[frame_num],   
-                                                    track['bbox'],
-                                                    player_id)
-                player_assignment[frame_num][player_id] = team
-        
-        save_stub(stub_path,player_assignment)
+                if player_id in pending_ids:
+                    frame_pairs.append((player_id, None))
+                    continue
+
+                histogram = self.get_torso_histogram(frame, track['bbox'])
+                if self.needs_classification(player_id, histogram):
+                    team_id = self.get_color_team(frame, track['bbox'])
+                    if team_id is not None:
+                        self.player_cache[player_id] = {"team": team_id, "confidence": 1.0, "histogram": histogram}
+                        self.player_team_dict[player_id] = team_id
+                        frame_pairs.append((player_id, team_id))
+                        continue
+
+                    pending_crops.append(self.get_player_crop(frame, track['bbox']))
+                    pending_players.append((player_id, histogram))
+                    pending_ids.add(player_id)
+                    frame_pairs.append((player_id, None))
+                else:
+                    frame_pairs.append((player_id, self.player_cache[player_id]["team"]))
+            pending_frames.append(frame_pairs)
+
+            if len(pending_crops) >= self.batch_size:
+                classify_pending()
 
-        return player_assignment
\ No newline at end of file
+        classify_pending()
+        return player_assignment
@@ -0,0 +1,46 @@
+import numpy as np
+from drawers.frame_compositor import FrameCompositor
+
+
+class FillDrawer:
+    """Paints a square of one colour, so overlapping layers reveal their painting order."""
+    def __init__(self, color, top_left):
+        self.color = color
+        self.top_left = top_left
+
+    def draw_frame(self, frame, frame_num):
+        x, y = self.top_left
+        frame[y:y + 20, x:x + 20] = self.color
+        return frame
+
+
+class CountingDrawer:
+    """Stateful layer that paints how many frames it has seen."""
+    sequential = True
+
+    def __init__(self):
+        self.num_frames = 0
+
+    def draw_frame(self, frame, frame_num):
+        self.num_frames += 1
+        frame[5:25, 5:25] = self.num_frames
+        return frame
+
+
+def build_compositor():
+    compositor = FrameCompositor()
+    compositor.add_layer(FillDrawer((255, 0, 0), (0, 0)))
+    compositor.add_layer(CountingDrawer())
+    compositor.add_layer(FillDrawer((0, 0, 255), (10, 10)))
+    return compositor
+
+
+def test_render_parallel_keeps_layer_order():
+    video_frames = [np.full((40, 40, 3), i, dtype=np.uint8) for i in range(20)]
+
+    expected = list(build_compositor().render(video_frames))
+    rendered = list(build_compositor().render_parallel(video_frames, num_workers=4))
+
+    assert len(rendered) == len(expected)
+    for rendered_frame, expected_frame in zip(rendered, expected):
+        np.testing.assert_array_equal(rendered_frame, expected_frame)
@@ -0,0 +1,23 @@
+from speed_and_distance_calculator.movement_ledger import MovementLedger
+
+
+def test_sprint_survives_frame_without_speed():
+    ledger = MovementLedger(sprint_speed=20.0)
+
+    ledger.update({7: 0.2}, {7: 25.0})
+    # Tracked but not projected, so no distance and no speed in this frame
+    ledger.update({}, {}, player_ids=[7])
+    frame_idx = ledger.update({7: 0.2}, {7: 25.0})
+
+    assert ledger.get(frame_idx, 7)["sprints"] == 1
+    assert ledger.get(frame_idx - 1, 7)["speed"] is None
+
+
+def test_new_sprint_after_slowing_down():
+    ledger = MovementLedger(sprint_speed=20.0)
+
+    for speed in [25.0, None, 10.0, None, 25.0]:
+        frame_speeds = {} if speed is None else {7: speed}
+        ledger.update({7: 0.1}, frame_speeds)
+
+    assert ledger.summary()[7]["sprints"] == 2
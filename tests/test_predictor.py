@@ -0,0 +1,53 @@
+import numpy as np
+from predictor import ScoreTimeExtractor
+
+BBOX = (10, 10, 90, 50)
+CONFIG = "--psm 7 -c tessedit_char_whitelist=0123456789"
+
+
+def make_extractor(monkeypatch, texts):
+    extractor = ScoreTimeExtractor(BBOX, BBOX, BBOX, BBOX, use_easyocr=False)
+    ocr_calls = []
+
+    def fake_ocr(roi, thresh, config):
+        ocr_calls.append(config)
+        return texts[len(ocr_calls) - 1]
+
+    monkeypatch.setattr(extractor, "run_ocr", fake_ocr)
+    return extractor, ocr_calls
+
+
+def make_frame(bars):
+    # Light bars on a dark scoreboard, standing in for digits
+    frame = np.full((60, 100, 3), 40, dtype=np.uint8)
+    for x in bars:
+        frame[15:45, x:x + 6] = 210
+    return frame
+
+
+def test_noise_only_change_is_served_from_cache(monkeypatch):
+    extractor, ocr_calls = make_extractor(monkeypatch, ["12"])
+    frame = make_frame([20, 40, 60])
+
+    rng = np.random.default_rng(0)
+    noise = rng.integers(-8, 9, size=frame.shape)
+    noisy_frame = (frame.astype(np.int16) + noise).astype(np.uint8)
+    # The raw pixels differ by far more than the change threshold
+    assert np.abs(noisy_frame.astype(np.int16) - frame).mean() > extractor.change_threshold
+
+    assert extractor.extract_text(frame, BBOX, CONFIG) == "12"
+    assert extractor.extract_text(noisy_frame, BBOX, CONFIG) == "12"
+    assert len(ocr_calls) == 1
+    assert extractor.num_unchanged == 1
+
+
+def test_changed_roi_runs_ocr_and_known_roi_hits_cache(monkeypatch):
+    extractor, ocr_calls = make_extractor(monkeypatch, ["12", "13"])
+    frame = make_frame([20, 40, 60])
+    changed_frame = make_frame([20, 50])
+
+    assert extractor.extract_text(frame, BBOX, CONFIG) == "12"
+    assert extractor.extract_text(changed_frame, BBOX, CONFIG) == "13"
+    assert extractor.extract_text(frame, BBOX, CONFIG) == "12"
+    assert len(ocr_calls) == 2
+    assert extractor.num_cache_hits == 1
@@ -0,0 +1,46 @@
+import pytest
+from speed_and_distance_calculator.speed_and_distance_calculator import SpeedAndDistanceCalculator
+
+
+def make_calculator():
+    return SpeedAndDistanceCalculator(300, 161, 28, 15)
+
+
+def test_online_speed_drops_departed_players():
+    calculator = make_calculator()
+    speed_state = {"frame": 0, "windows": {}}
+
+    # A new player enters every 10 frames and each one stays on court for 20 frames
+    for frame_idx in range(200):
+        frame_distances = {
+            player_id: 0.1
+            for player_id in range(frame_idx // 10 + 1)
+            if frame_idx < player_id * 10 + 20
+        }
+        calculator.calculate_speed_online(frame_distances, speed_state)
+
+        oldest_kept = frame_idx - calculator.speed_window_frames
+        for entries, _ in speed_state["windows"].values():
+            assert entries[-1][0] > oldest_kept
+
+    # Player 17 left at frame 189, still within the last speed window
+    assert set(speed_state["windows"]) == {17, 18, 19}
+
+
+def test_online_speed_matches_batch_speed_with_returning_player():
+    calculator = make_calculator()
+    # Player 2 leaves for longer than the speed window and comes back
+    player_distances_per_frame = [
+        {1: 0.2, **({2: 0.3} if frame_idx < 10 or frame_idx >= 40 else {})}
+        for frame_idx in range(60)
+    ]
+
+    speed_state = {"frame": 0, "windows": {}}
+    online_speeds = [
+        calculator.calculate_speed_online(frame_distances, speed_state)
+        for frame_distances in player_distances_per_frame
+    ]
+
+    batch_speeds = calculator.calculate_speed(player_distances_per_frame)
+    for online_frame_speeds, batch_frame_speeds in zip(online_speeds, batch_speeds):
+        assert online_frame_speeds == pytest.approx(batch_frame_speeds)
@@ -1,2 +1,4 @@
 from .player_tracker import PlayerTracker
-from .ball_tracker import BallTracker
\ No newline at end of file
+from .ball_tracker import BallTracker
+from .keyframe_propagator import KeyframePropagator
+from .track_table import TrackTable
\ No newline at end of file
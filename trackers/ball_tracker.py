@@ -1,10 +1,10 @@
-from ultralytics import YOLO
 import supervision as sv
 import numpy as np
 import pandas as pd
 import sys 
 sys.path.append('../')
 from utils.stubs_utils import read_stub, save_stub
+from inference.model_backend import load_model
 
 
 class BallTracker:
@@ -14,8 +14,16 @@ class BallTracker:
     This class provides methods to detect the ball in video frames, process detections
     in batches, and refine tracking results through filtering and interpolation.
     """
-    def __init__(self, model_path):
-        self.model = YOLO(model_path) 
+    def __init__(self, model_path, backend="torch", int8=False):
+        """
+        Initialize the BallTracker with a YOLO model.
+
+        Args:
+            model_path (str): Path to the YOLO model weights.
+            backend (str): Inference backend, "torch", "onnx" or "openvino".
+            int8 (bool): Whether to use an INT8 quantized model on the ONNX/OpenVINO backends.
+        """
+        self.model = load_model(model_path, "detect", backend=backend, int8=int8)
 
     def detect_frames(self, frames):
         """
@@ -51,8 +59,36 @@ class BallTracker:
             if len(tracks) == len(frames):
                 return tracks
 
+        tracks = self.track_frames(frames)
+
+        save_stub(stub_path,tracks)
+        
+        return tracks
+
+    def track_frames(self, frames):
+        """
+        Detect the ball in a sequence of frames without any caching, keeping the most
+        confident ball detection per frame.
+
+        Args:
+            frames (list): List of video frames to process.
+
+        Returns:
+            list: List of dictionaries containing ball tracking information for each frame.
+        """
         detections = self.detect_frames(frames)
+        return self.track_detections(detections)
 
+    def track_detections(self, detections):
+        """
+        Select the ball from precomputed YOLO detections, e.g. from an InferenceScheduler.
+
+        Args:
+            detections (list): YOLO detection results for each frame, in frame order.
+
+        Returns:
+            list: List of dictionaries containing ball tracking information for each frame.
+        """
         tracks=[]
 
         for frame_num, detection in enumerate(detections):
@@ -79,8 +115,6 @@ class BallTracker:
             if chosen_bbox is not None:
                 tracks[frame_num][1] = {"bbox":chosen_bbox}
 
-        save_stub(stub_path,tracks)
-        
         return tracks
 
     def remove_wrong_detections(self,ball_positions):
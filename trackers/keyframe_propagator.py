@@ -0,0 +1,150 @@
+import cv2
+import numpy as np
+
+
+class KeyframePropagator:
+    """
+    Propagates keyframe detections to the following frames with sparse optical flow.
+
+    On a keyframe a few feature points are sampled inside each bounding box. On the next
+    frames the points are followed with pyramidal Lucas-Kanade flow and every box is moved
+    by the median displacement of its surviving points. Boxes that keep too few points
+    are dropped, and the fraction of dropped boxes is reported so the caller can decide to
+    detect again.
+
+    Attributes:
+        points_per_box (int): Maximum number of feature points sampled per box.
+        min_points_per_box (int): Minimum surviving points for a box to be propagated.
+        motion_scale (float): Downscale factor of the frames compared for global motion.
+    """
+    def __init__(self, points_per_box=12, min_points_per_box=3, motion_scale=0.25):
+        self.points_per_box = points_per_box
+        self.min_points_per_box = min_points_per_box
+        self.motion_scale = motion_scale
+        self.lk_params = dict(
+            winSize=(21, 21),
+            maxLevel=3,
+            criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 20, 0.03)
+        )
+
+        self.previous_gray = None
+        self.keyframe_small = None
+        self.boxes = np.zeros((0, 4), dtype=np.float32)
+        self.box_indices = np.zeros(0, dtype=int)
+        self.num_keyframe_boxes = 0
+        self.points = np.zeros((0, 1, 2), dtype=np.float32)
+        self.point_owner = np.zeros(0, dtype=int)
+
+    def reset(self, gray, boxes):
+        """
+        Start propagating the boxes of a new keyframe.
+
+        Args:
+            gray (numpy.ndarray): The keyframe in grayscale.
+            boxes (numpy.ndarray): Keyframe boxes of shape (N, 4) as (x1, y1, x2, y2).
+        """
+        self.previous_gray = gray
+        self.keyframe_small = cv2.resize(gray, None, fx=self.motion_scale, fy=self.motion_scale, interpolation=cv2.INTER_AREA)
+        self.boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4).copy()
+        self.box_indices = np.arange(len(self.boxes))
+        self.num_keyframe_boxes = len(self.boxes)
+
+        points = []
+        owners = []
+        height, width = gray.shape[:2]
+        for box_index, (x1, y1, x2, y2) in enumerate(self.boxes):
+            x1, y1 = int(max(x1, 0)), int(max(y1, 0))
+            x2, y2 = int(min(x2, width)), int(min(y2, height))
+            if x2 - x1 < 2 or y2 - y1 < 2:
+                continue
+
+            box_points = cv2.goodFeaturesToTrack(
+                gray[y1:y2, x1:x2],
+                maxCorners=self.points_per_box,
+                qualityLevel=0.01,
+                minDistance=3
+            )
+            if box_points is None or len(box_points) < self.min_points_per_box:
+                # Textureless box, fall back to a small grid
+                grid_x, grid_y = np.meshgrid(np.linspace(0.25, 0.75, 3) * (x2 - x1), np.linspace(0.2, 0.8, 4) * (y2 - y1))
+                box_points = np.stack([grid_x.ravel(), grid_y.ravel()], axis=1).reshape(-1, 1, 2)
+
+            box_points = box_points.astype(np.float32) + np.array([x1, y1], dtype=np.float32)
+            points.append(box_points)
+            owners.append(np.full(len(box_points), box_index))
+
+        if points:
+            self.points = np.concatenate(points).astype(np.float32)
+            self.point_owner = np.concatenate(owners)
+        else:
+            self.points = np.zeros((0, 1, 2), dtype=np.float32)
+            self.point_owner = np.zeros(0, dtype=int)
+
+    def global_motion(self, gray):
+        """
+        Mean absolute intensity difference between a frame and the last keyframe.
+
+        A large value means a camera cut or a fast pan, when propagated boxes are unreliable.
+
+        Args:
+            gray (numpy.ndarray): The current frame in grayscale.
+
+        Returns:
+            float: Mean absolute difference on a 0-255 scale.
+        """
+        if self.keyframe_small is None:
+            return float('inf')
+        small = cv2.resize(gray, (self.keyframe_small.shape[1], self.keyframe_small.shape[0]), interpolation=cv2.INTER_AREA)
+        return float(cv2.absdiff(small, self.keyframe_small).mean())
+
+    def lost_ratio(self):
+        """
+        Fraction of the keyframe boxes that could no longer be propagated.
+
+        Returns:
+            float: Value between 0 and 1.
+        """
+        if self.num_keyframe_boxes == 0:
+            return 0.0
+        return 1 - len(self.boxes) / self.num_keyframe_boxes
+
+    def propagate(self, gray):
+        """
+        Move the current boxes to the next frame.
+
+        Args:
+            gray (numpy.ndarray): The next frame in grayscale.
+
+        Returns:
+            tuple: (boxes, box_indices) where boxes has shape (M, 4) and box_indices are the
+                indices of the surviving boxes in the keyframe boxes.
+        """
+        if len(self.points) == 0 or len(self.boxes) == 0:
+            self.previous_gray = gray
+            self.boxes = np.zeros((0, 4), dtype=np.float32)
+            self.box_indices = np.zeros(0, dtype=int)
+            return self.boxes, self.box_indices
+
+        next_points, status, _ = cv2.calcOpticalFlowPyrLK(self.previous_gray, gray, self.points, None, **self.lk_params)
+        status = status.ravel().astype(bool)
+        displacement = (next_points - self.points).reshape(-1, 2)
+
+        keep_boxes = np.zeros(len(self.boxes), dtype=bool)
+        for box_index in range(len(self.boxes)):
+            box_points = status & (self.point_owner == box_index)
+            if box_points.sum() < self.min_points_per_box:
+                continue
+            dx, dy = np.median(displacement[box_points], axis=0)
+            self.boxes[box_index] += np.array([dx, dy, dx, dy], dtype=np.float32)
+            keep_boxes[box_index] = True
+
+        # Drop lost points and boxes, and renumber the point owners
+        keep_points = status & keep_boxes[self.point_owner]
+        new_box_index = np.cumsum(keep_boxes) - 1
+        self.points = next_points[keep_points]
+        self.point_owner = new_box_index[self.point_owner[keep_points]]
+        self.boxes = self.boxes[keep_boxes]
+        self.box_indices = self.box_indices[keep_boxes]
+        self.previous_gray = gray
+
+        return self.boxes, self.box_indices
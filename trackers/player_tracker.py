@@ -1,8 +1,10 @@
-from ultralytics import YOLO
+import cv2
 import supervision as sv
 import sys 
 sys.path.append('../')
 from utils.stubs_utils import read_stub, save_stub
+from inference.model_backend import load_model
+from .keyframe_propagator import KeyframePropagator
 
 class PlayerTracker:
     """
@@ -10,17 +12,41 @@ class PlayerTracker:
 
     This class combines YOLO object detection with ByteTrack tracking to maintain consistent
     player identities across frames while processing detections in batches.
+
+    With keyframe_stride > 1 the detector only runs on keyframes. In between, the keyframe
+    boxes are moved with sparse optical flow and fed to ByteTrack like regular detections,
+    so track IDs stay consistent. A new keyframe is forced early when the image changes a
+    lot (camera cut or fast pan) or when too many boxes could not be propagated.
+    keyframe_stride is the speed/accuracy knob: larger values detect less often.
     """
-    def __init__(self, model_path):
+    def __init__(self, model_path, backend="torch", int8=False, keyframe_stride=1, motion_threshold=20.0, max_lost_ratio=0.3):
         """
         Initialize the PlayerTracker with YOLO model and ByteTrack tracker.
 
         Args:
             model_path (str): Path to the YOLO model weights.
+            backend (str): Inference backend, "torch", "onnx" or "openvino".
+            int8 (bool): Whether to use an INT8 quantized model on the ONNX/OpenVINO backends.
+            keyframe_stride (int): Maximum number of frames between two detector runs.
+                1 runs the detector on every frame.
+            motion_threshold (float or None): Mean absolute grayscale difference to the last
+                keyframe above which a new keyframe is detected. None disables the trigger.
+            max_lost_ratio (float): Fraction of keyframe boxes lost by the optical flow above
+                which a new keyframe is detected.
         """
-        self.model = YOLO(model_path) 
+        self.model = load_model(model_path, "detect", backend=backend, int8=int8)
         self.tracker = sv.ByteTrack()
 
+        self.keyframe_stride = keyframe_stride
+        self.motion_threshold = motion_threshold
+        self.max_lost_ratio = max_lost_ratio
+        self.propagator = KeyframePropagator()
+        self.keyframe_detections = None
+        self.cls_names = None
+        self.frames_since_keyframe = 0
+        self.num_keyframes = 0
+        self.num_tracked_frames = 0
+
     def detect_frames(self, frames):
         """
         Detect players in a sequence of frames using batch processing.
@@ -56,29 +82,128 @@ class PlayerTracker:
             if len(tracks) == len(frames):
                 return tracks
 
+        tracks = self.track_frames(frames)
+        
+        save_stub(stub_path,tracks)
+        return tracks
+
+    def track_frames(self, frames):
+        """
+        Detect and track players in a sequence of frames without any caching.
+
+        The ByteTrack state lives on the instance, so calling this method on consecutive
+        chunks of a video keeps the same track IDs as a single call over the whole video.
+
+        Args:
+            frames (list): List of video frames to process.
+
+        Returns:
+            list: List of dictionaries containing player tracking information for each frame,
+                where each dictionary maps player IDs to their bounding box coordinates.
+        """
+        if self.keyframe_stride > 1:
+            return self.track_frames_adaptive(frames)
+
         detections = self.detect_frames(frames)
+        return self.track_detections(detections)
+
+    def track_frames_adaptive(self, frames):
+        """
+        Track players running the detector on keyframes only and optical flow in between.
+
+        Args:
+            frames (list): List of video frames to process.
 
+        Returns:
+            list: List of dictionaries containing player tracking information for each frame,
+                where each dictionary maps player IDs to their bounding box coordinates.
+        """
         tracks=[]
+        for frame in frames:
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+            is_keyframe = (
+                self.keyframe_detections is None
+                or self.frames_since_keyframe >= self.keyframe_stride
+                or self.propagator.lost_ratio() > self.max_lost_ratio
+                or (self.motion_threshold is not None and self.propagator.global_motion(gray) > self.motion_threshold)
+            )
+
+            if is_keyframe:
+                detection = self.model.predict(frame,conf=0.5)[0]
+                self.cls_names = detection.names
+                detection_supervision = sv.Detections.from_ultralytics(detection)
+
+                self.keyframe_detections = detection_supervision
+                self.propagator.reset(gray, detection_supervision.xyxy)
+                self.frames_since_keyframe = 1
+                self.num_keyframes += 1
+            else:
+                boxes, box_indices = self.propagator.propagate(gray)
+                detection_supervision = self.keyframe_detections[box_indices]
+                detection_supervision.xyxy = boxes.copy()
+                self.frames_since_keyframe += 1
+
+            self.num_tracked_frames += 1
+            tracks.append(self.update_tracks(detection_supervision, self.cls_names))
+
+        return tracks
+
+    def get_keyframe_ratio(self):
+        """
+        Fraction of the tracked frames on which the detector actually ran.
+
+        Returns:
+            float: Value between 0 and 1, the inverse of the detection speed-up.
+        """
+        if self.num_tracked_frames == 0:
+            return 0.0
+        return self.num_keyframes / self.num_tracked_frames
+
+    def track_detections(self, detections):
+        """
+        Track players from precomputed YOLO detections, e.g. from an InferenceScheduler.
 
-        for frame_num, detection in enumerate(detections):
-            cls_names = detection.names
-            cls_names_inv = {v:k for k,v in cls_names.items()}
+        Args:
+            detections (list): YOLO detection results for each frame, in frame order.
+
+        Returns:
+            list: List of dictionaries containing player tracking information for each frame,
+                where each dictionary maps player IDs to their bounding box coordinates.
+        """
+        tracks=[]
 
+        for detection in detections:
             # Covert to supervision Detection format
             detection_supervision = sv.Detections.from_ultralytics(detection)
+            tracks.append(self.update_tracks(detection_supervision, detection.names))
+        
+        return tracks
+
+    def update_tracks(self, detection_supervision, cls_names):
+        """
+        Update ByteTrack with the detections of one frame.
+
+        Args:
+            detection_supervision (sv.Detections): Detections of the frame.
+            cls_names (dict): Mapping of class IDs to class names.
 
-            # Track Objects
-            detection_with_tracks = self.tracker.update_with_detections(detection_supervision)
+        Returns:
+            dict: Mapping of player IDs to their bounding box coordinates for this frame.
+        """
+        cls_names_inv = {v:k for k,v in cls_names.items()}
 
-            tracks.append({})
+        # Track Objects
+        detection_with_tracks = self.tracker.update_with_detections(detection_supervision)
 
-            for frame_detection in detection_with_tracks:
-                bbox = frame_detection[0].tolist()
-                cls_id = frame_detection[3]
-                track_id = frame_detection[4]
+        frame_tracks = {}
 
-                if cls_id == cls_names_inv['Player']:
-                    tracks[frame_num][track_id] = {"bbox":bbox}
-        
-        save_stub(stub_path,tracks)
-        return tracks
\ No newline at end of file
+        for frame_detection in detection_with_tracks:
+            bbox = frame_detection[0].tolist()
+            cls_id = frame_detection[3]
+            track_id = frame_detection[4]
+
+            if cls_id == cls_names_inv['Player']:
+                frame_tracks[track_id] = {"bbox":bbox}
+
+        return frame_tracks
\ No newline at end of file
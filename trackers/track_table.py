@@ -0,0 +1,194 @@
+import numpy as np
+
+
+class TrackTable:
+    """
+    Struct-of-arrays representation of per-frame tracks.
+
+    Every frame has the same number of slots. The objects of a frame fill its first slots
+    in the order of the original track dictionary, and unused slots have a track ID of -1.
+    Columns are NumPy arrays indexed by [frame, slot], so analytics can work on all frames
+    at once instead of walking nested dictionaries.
+
+    Attributes:
+        track_ids (numpy.ndarray): Track IDs of shape (F, S), -1 for empty slots.
+        bboxes (numpy.ndarray): Boxes (x1, y1, x2, y2) of shape (F, S, 4), NaN for empty slots.
+        teams (numpy.ndarray): Team of each slot of shape (F, S), -1 when unknown.
+        tactical_positions (numpy.ndarray): Tactical view (x, y) of shape (F, S, 2), NaN
+            when the object could not be projected.
+    """
+    def __init__(self, track_ids, bboxes):
+        self.track_ids = np.asarray(track_ids, dtype=np.int64)
+        self.bboxes = np.asarray(bboxes, dtype=np.float64)
+        self.teams = np.full(self.track_ids.shape, -1, dtype=np.int64)
+        self.tactical_positions = np.full(self.track_ids.shape + (2,), np.nan)
+
+    @classmethod
+    def from_tracks(cls, tracks):
+        """
+        Build a table from the per-frame track dictionaries.
+
+        Args:
+            tracks (list): One dictionary per frame mapping track IDs to {"bbox": [...]}.
+
+        Returns:
+            TrackTable: The table, with as many slots as the most crowded frame.
+        """
+        num_slots = max((len(frame_tracks) for frame_tracks in tracks), default=0)
+        track_ids = np.full((len(tracks), num_slots), -1, dtype=np.int64)
+        bboxes = np.full((len(tracks), num_slots, 4), np.nan)
+
+        for frame_num, frame_tracks in enumerate(tracks):
+            for slot, (track_id, track) in enumerate(frame_tracks.items()):
+                bbox = track.get("bbox", [])
+                if len(bbox) != 4:
+                    continue
+                track_ids[frame_num, slot] = track_id
+                bboxes[frame_num, slot] = bbox
+
+        return cls(track_ids, bboxes)
+
+    @classmethod
+    def from_positions(cls, tactical_player_positions):
+        """
+        Build a table holding only tactical positions, without boxes.
+
+        Args:
+            tactical_player_positions (list): One dictionary per frame mapping track IDs to
+                their (x, y) tactical view position.
+
+        Returns:
+            TrackTable: The table with its tactical position column filled.
+        """
+        num_slots = max((len(frame_positions) for frame_positions in tactical_player_positions), default=0)
+        track_ids = np.full((len(tactical_player_positions), num_slots), -1, dtype=np.int64)
+        positions = np.full((len(tactical_player_positions), num_slots, 2), np.nan)
+
+        for frame_num, frame_positions in enumerate(tactical_player_positions):
+            for slot, (track_id, position) in enumerate(frame_positions.items()):
+                track_ids[frame_num, slot] = track_id
+                positions[frame_num, slot] = position
+
+        table = cls(track_ids, np.full((len(tactical_player_positions), num_slots, 4), np.nan))
+        table.tactical_positions = positions
+        return table
+
+    @classmethod
+    def from_column_dicts(cls, values_per_frame):
+        """
+        Build a table and a per-slot column from per-frame dictionaries, the inverse of
+        column_to_dicts.
+
+        Args:
+            values_per_frame (list): One dictionary per frame mapping track IDs to numbers.
+
+        Returns:
+            tuple: The table, without boxes, and the column of shape (F, S), NaN for empty slots.
+        """
+        num_slots = max((len(frame_values) for frame_values in values_per_frame), default=0)
+        track_ids = np.full((len(values_per_frame), num_slots), -1, dtype=np.int64)
+        values = np.full((len(values_per_frame), num_slots), np.nan)
+
+        for frame_num, frame_values in enumerate(values_per_frame):
+            for slot, (track_id, value) in enumerate(frame_values.items()):
+                track_ids[frame_num, slot] = track_id
+                values[frame_num, slot] = value
+
+        table = cls(track_ids, np.full((len(values_per_frame), num_slots, 4), np.nan))
+        return table, values
+
+    @property
+    def num_frames(self):
+        return self.track_ids.shape[0]
+
+    @property
+    def valid(self):
+        """Boolean mask of shape (F, S) of the occupied slots."""
+        return self.track_ids >= 0
+
+    def to_tracks(self):
+        """
+        Convert the table back to per-frame track dictionaries.
+
+        Returns:
+            list: One dictionary per frame mapping track IDs to {"bbox": [...]}.
+        """
+        tracks = []
+        for frame_ids, frame_bboxes in zip(self.track_ids.tolist(), self.bboxes.tolist()):
+            tracks.append({
+                track_id: {"bbox": bbox}
+                for track_id, bbox in zip(frame_ids, frame_bboxes)
+                if track_id >= 0
+            })
+        return tracks
+
+    def set_teams(self, player_assignment):
+        """
+        Fill the team column from per-frame team assignments.
+
+        Args:
+            player_assignment (list): One dictionary per frame mapping track IDs to teams.
+        """
+        for frame_num, (frame_ids, frame_assignment) in enumerate(zip(self.track_ids.tolist(), player_assignment)):
+            for slot, track_id in enumerate(frame_ids):
+                if track_id >= 0:
+                    self.teams[frame_num, slot] = frame_assignment.get(track_id, -1)
+
+    def team_of(self, frames, track_ids):
+        """
+        Look up the team of given tracks in given frames.
+
+        Args:
+            frames (numpy.ndarray): Frame indices of shape (N,).
+            track_ids (numpy.ndarray): Track IDs of shape (N,).
+
+        Returns:
+            numpy.ndarray: Teams of shape (N,), -1 where the track is not in the frame.
+        """
+        frames = np.asarray(frames, dtype=np.int64)
+        track_ids = np.asarray(track_ids, dtype=np.int64)
+        if len(frames) == 0 or self.track_ids.shape[1] == 0:
+            return np.full(len(frames), -1, dtype=np.int64)
+
+        matches = (self.track_ids[frames] == track_ids[:, None]) & (track_ids[:, None] >= 0)
+        slots = matches.argmax(axis=1)
+        teams = self.teams[frames, slots]
+        return np.where(matches.any(axis=1), teams, -1)
+
+    def tactical_positions_to_dicts(self):
+        """
+        Convert the tactical position column to per-frame dictionaries.
+
+        Returns:
+            list: One dictionary per frame mapping track IDs to [x, y] in the tactical view,
+                for the objects that could be projected.
+        """
+        projected = self.valid & ~np.isnan(self.tactical_positions).any(axis=2)
+        positions = []
+        for frame_ids, frame_positions, frame_projected in zip(self.track_ids.tolist(), self.tactical_positions.tolist(), projected.tolist()):
+            positions.append({
+                track_id: position
+                for track_id, position, is_projected in zip(frame_ids, frame_positions, frame_projected)
+                if is_projected
+            })
+        return positions
+
+    def column_to_dicts(self, values):
+        """
+        Convert a per-slot column to per-frame dictionaries keyed by track ID.
+
+        Args:
+            values (numpy.ndarray): Column of shape (F, S). NaN entries are left out.
+
+        Returns:
+            list: One dictionary per frame mapping track IDs to values.
+        """
+        present = self.valid & ~np.isnan(values)
+        output = []
+        for frame_ids, frame_values, frame_present in zip(self.track_ids.tolist(), values.tolist(), present.tolist()):
+            output.append({
+                track_id: value
+                for track_id, value, is_present in zip(frame_ids, frame_values, frame_present)
+                if is_present
+            })
+        return output